@@ -0,0 +1,35 @@
+import pytest
+
+import ragna
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--num-chunks",
+        default="10000",
+        help=(
+            "Comma-separated corpus sizes in number of chunks for the source storage "
+            "benchmarks, e.g. 10000,100000,1000000."
+        ),
+    )
+
+
+def pytest_generate_tests(metafunc):
+    if "num_chunks" in metafunc.fixturenames:
+        metafunc.parametrize(
+            "num_chunks",
+            [
+                int(num_chunks)
+                for num_chunks in metafunc.config.getoption("--num-chunks").split(",")
+            ],
+            scope="module",
+        )
+
+
+@pytest.fixture(autouse=True, scope="session")
+def tmp_local_root(tmp_path_factory):
+    old = ragna.local_root()
+    try:
+        yield ragna.local_root(tmp_path_factory.mktemp("ragna"))
+    finally:
+        ragna.local_root(old)
@@ -0,0 +1,86 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from ragna.deploy import Config
+from ragna.deploy._auth import SessionMiddleware
+from ragna.deploy._core import make_app
+
+
+@pytest.fixture(scope="module")
+def client(tmp_local_root):
+    config = Config(local_root=tmp_local_root / "deploy")
+
+    with TestClient(
+        make_app(
+            config,
+            api=True,
+            ui=False,
+            ignore_unavailable_components=False,
+            open_browser=False,
+        )
+    ) as client:
+        client.get("/login", follow_redirects=True).raise_for_status()
+        assert SessionMiddleware._COOKIE_NAME in client.cookies
+        yield client
+
+
+@pytest.fixture(scope="module")
+def document(client, tmp_local_root):
+    document_path = tmp_local_root / "document.txt"
+    document_path.write_text("Ragna is a RAG orchestration framework.\n")
+
+    document = (
+        client.post("/api/documents", json=[{"name": document_path.name}])
+        .raise_for_status()
+        .json()[0]
+    )
+    with open(document_path, "rb") as file:
+        client.put(
+            "/api/documents", files={"documents": (document["id"], file)}
+        ).raise_for_status()
+
+    return document
+
+
+def make_chat(client, document):
+    components = client.get("/api/components").raise_for_status().json()
+    chat = (
+        client.post(
+            "/api/chats",
+            json={
+                "name": "benchmark",
+                "input": [document["id"]],
+                "source_storage": components["source_storages"][0]["title"],
+                "assistant": components["assistants"][0]["title"],
+            },
+        )
+        .raise_for_status()
+        .json()
+    )
+    client.post(f"/api/chats/{chat['id']}/prepare").raise_for_status()
+    return chat
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_answer(benchmark, client, document, stream):
+    def setup():
+        # Every chat gets a fresh history. Otherwise, later rounds would be slower due
+        # to a growing number of messages that are loaded from the database.
+        return (make_chat(client, document),), {}
+
+    def answer(chat):
+        if stream:
+            with client.stream(
+                "POST",
+                f"/api/chats/{chat['id']}/answer",
+                json={"prompt": "What is Ragna?", "stream": True},
+            ) as response:
+                response.raise_for_status()
+                for _ in response.iter_lines():
+                    pass
+        else:
+            client.post(
+                f"/api/chats/{chat['id']}/answer", json={"prompt": "What is Ragna?"}
+            ).raise_for_status()
+
+    benchmark.pedantic(answer, setup=setup, rounds=50)
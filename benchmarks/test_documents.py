@@ -0,0 +1,87 @@
+import pytest
+
+from ragna.core import (
+    DocxDocumentHandler,
+    LocalDocument,
+    PdfDocumentHandler,
+    PlainTextDocumentHandler,
+    PptxDocumentHandler,
+)
+from ragna.core._artifact_cache import ARTIFACT_CACHE
+
+from .utils import InMemoryDocument, make_docx, make_pdf, make_pptx, make_text
+
+NUM_PAGES = 50
+WORDS_PER_PAGE = 400
+
+
+@pytest.mark.parametrize(
+    ("handler_cls", "suffix", "make_content"),
+    [
+        pytest.param(
+            PlainTextDocumentHandler,
+            ".txt",
+            lambda pages: "\n".join(pages).encode(),
+            id="txt",
+        ),
+        pytest.param(PdfDocumentHandler, ".pdf", make_pdf, id="pdf"),
+        pytest.param(DocxDocumentHandler, ".docx", make_docx, id="docx"),
+        pytest.param(PptxDocumentHandler, ".pptx", make_pptx, id="pptx"),
+    ],
+)
+def test_extract_pages(benchmark, handler_cls, suffix, make_content):
+    if not handler_cls.is_available():
+        pytest.skip(f"{handler_cls.__name__} is not available")
+
+    pages = [make_text(WORDS_PER_PAGE, seed=seed) for seed in range(NUM_PAGES)]
+    handler = handler_cls()
+    document = InMemoryDocument(
+        make_content(pages), name=f"document{suffix}", handler=handler
+    )
+
+    extracted_pages = benchmark(lambda: list(handler.extract_pages(document)))
+
+    assert extracted_pages
+
+
+@pytest.mark.parametrize("cached", [False, True])
+def test_extract_pages_cached(benchmark, mocker, cached):
+    if not PdfDocumentHandler.is_available():
+        pytest.skip("PdfDocumentHandler is not available")
+
+    if not cached:
+        mocker.patch.object(ARTIFACT_CACHE, "max_size", 0)
+
+    pages = [make_text(WORDS_PER_PAGE, seed=seed) for seed in range(NUM_PAGES)]
+    document = InMemoryDocument(make_pdf(pages), name="document.pdf")
+    # Populate the cache outside of the measurement.
+    list(document.extract_pages())
+
+    extracted_pages = benchmark(lambda: list(document.extract_pages()))
+
+    assert len(extracted_pages) == NUM_PAGES
+
+
+@pytest.mark.parametrize("num_processes", [0, 4])
+def test_extract_pdf_pages_parallel(
+    benchmark, tmp_path, monkeypatch, mocker, num_processes
+):
+    if not PdfDocumentHandler.is_available():
+        pytest.skip("PdfDocumentHandler is not available")
+
+    mocker.patch.object(ARTIFACT_CACHE, "max_size", 0)
+    monkeypatch.setenv("RAGNA_PDF_EXTRACTION_PROCESSES", str(num_processes))
+
+    num_pages = 400
+    pages = [make_text(WORDS_PER_PAGE, seed=seed) for seed in range(num_pages)]
+    path = tmp_path / "document.pdf"
+    path.write_bytes(make_pdf(pages))
+    document = LocalDocument.from_path(path)
+    # Start the worker processes outside of the measurement.
+    list(document.extract_pages())
+
+    extracted_pages = benchmark.pedantic(
+        lambda: list(document.extract_pages()), rounds=3, iterations=1
+    )
+
+    assert len(extracted_pages) == num_pages
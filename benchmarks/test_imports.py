@@ -0,0 +1,25 @@
+import subprocess
+import sys
+
+import pytest
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        pytest.param("import ragna", id="ragna"),
+        pytest.param("from ragna import Rag", id="Rag"),
+        pytest.param("from ragna.source_storages import Chroma", id="Chroma"),
+        pytest.param("from ragna.deploy import Config", id="Config"),
+    ],
+)
+def test_import_time(benchmark, code):
+    # Imports are cached by the interpreter. Thus, each round needs a fresh process.
+    # The interpreter startup is included, but constant across the parameters.
+    benchmark.pedantic(
+        subprocess.run,
+        args=([sys.executable, "-c", code],),
+        kwargs={"check": True},
+        rounds=5,
+        warmup_rounds=1,
+    )
@@ -0,0 +1,31 @@
+import pytest
+
+from ragna import Rag
+from ragna.assistants import RagnaDemoAssistant
+from ragna.core import MetadataFilter
+from ragna.source_storages import RagnaDemoSourceStorage
+
+from .utils import make_text_documents
+
+
+@pytest.mark.parametrize("input", ["corpus", "metadata_filter", "documents"])
+def test_chat_construction(benchmark, input):
+    rag = Rag()
+    if input == "corpus":
+        input = None
+    elif input == "metadata_filter":
+        input = MetadataFilter.or_(
+            [
+                MetadataFilter.eq("document_name", f"document{idx}.txt")
+                for idx in range(100)
+            ]
+        )
+    else:
+        input = make_text_documents(100, num_words=10)
+
+    benchmark(
+        rag.chat,
+        input,
+        source_storage=RagnaDemoSourceStorage,
+        assistant=RagnaDemoAssistant,
+    )
@@ -0,0 +1,304 @@
+import asyncio
+import datetime
+import inspect
+import itertools
+import os
+
+import pytest
+
+import ragna
+from ragna.core import MetadataFilter, Page
+from ragna.core._artifact_cache import ARTIFACT_CACHE
+from ragna.source_storages import Chroma, LanceDB, Qdrant, RagnaDemoSourceStorage
+
+from .utils import make_text, make_text_documents
+
+# Small chunks keep the amount of text, and thus the time to build the large corpora,
+# manageable while still resulting in the requested number of rows.
+CHUNK_SIZE = 64
+CHUNKS_PER_DOCUMENT = 100
+PROMPT = "Which state made the most work in the world?"
+
+VECTOR_DATABASES = [Chroma, LanceDB, Qdrant]
+
+
+def run(fn, *args, **kwargs):
+    result = fn(*args, **kwargs)
+    if inspect.isawaitable(result):
+        result = asyncio.run(result)
+    return result
+
+
+def make_source_storage(source_storage_cls):
+    if not source_storage_cls.is_available():
+        pytest.skip(f"{source_storage_cls.display_name()} is not available")
+
+    source_storage = source_storage_cls()
+    if source_storage_cls in VECTOR_DATABASES:
+        try:
+            # The embedding model and tokenizer are downloaded on first use
+            source_storage._embed_prompts(["?"])
+            source_storage._tokenizer.encode("?")
+        except Exception as exc:
+            pytest.skip(
+                f"The models of {source_storage_cls.display_name()} are not "
+                f"available offline: {exc}"
+            )
+    return source_storage
+
+
+def store_kwargs(source_storage_cls):
+    if source_storage_cls is RagnaDemoSourceStorage:
+        return {}
+    return {"chunk_size": CHUNK_SIZE, "chunk_overlap": 0}
+
+
+def make_documents(source_storage_cls, num_chunks):
+    # The demo source storage stores a single source per document
+    if source_storage_cls is RagnaDemoSourceStorage:
+        return make_text_documents(num_chunks, num_words=CHUNK_SIZE)
+
+    return make_text_documents(
+        max(num_chunks // CHUNKS_PER_DOCUMENT, 1),
+        num_words=CHUNK_SIZE * CHUNKS_PER_DOCUMENT,
+    )
+
+
+@pytest.fixture(scope="module")
+def source_storages():
+    # Local Qdrant and Chroma instances lock their directory. Thus, we need to reuse
+    # them for the whole module.
+    cache = {}
+
+    def get(source_storage_cls):
+        if source_storage_cls not in cache:
+            cache[source_storage_cls] = make_source_storage(source_storage_cls)
+        return cache[source_storage_cls]
+
+    return get
+
+
+@pytest.fixture(scope="module")
+def corpuses(source_storages):
+    cache = {}
+
+    def get(source_storage_cls, num_chunks):
+        key = (source_storage_cls, num_chunks)
+        if key not in cache:
+            source_storage = source_storages(source_storage_cls)
+            corpus_name = f"retrieve-{num_chunks}"
+            run(
+                source_storage.store,
+                corpus_name,
+                make_documents(source_storage_cls, num_chunks),
+                **store_kwargs(source_storage_cls),
+            )
+            cache[key] = (source_storage, corpus_name)
+        return cache[key]
+
+    return get
+
+
+@pytest.mark.parametrize("chunk_size", [128, 512])
+def test_chunk_pages(benchmark, source_storages, chunk_size):
+    source_storage = source_storages(Chroma)
+    pages = [Page(text=make_text(500, seed=seed), number=seed) for seed in range(100)]
+
+    chunks = benchmark(
+        source_storage._chunk_pages,
+        pages,
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_size // 2,
+    )
+
+    assert chunks
+
+
+@pytest.mark.parametrize("batch_size", [1, 8, 32, 128])
+def test_embedding_throughput(benchmark, source_storages, batch_size):
+    source_storage = source_storages(Chroma)
+    texts = [make_text(CHUNK_SIZE, seed=seed) for seed in range(batch_size)]
+
+    benchmark.extra_info["batch_size"] = batch_size
+    embeddings = benchmark(source_storage._embedding_function, texts)
+
+    assert len(embeddings) == batch_size
+
+
+@pytest.mark.parametrize(
+    "source_storage_cls", [RagnaDemoSourceStorage, *VECTOR_DATABASES]
+)
+def test_store(benchmark, source_storages, source_storage_cls, num_chunks, mocker):
+    # The documents are stored multiple times. Without disabling the artifact cache,
+    # we would only measure the first store without it.
+    mocker.patch.object(ARTIFACT_CACHE, "max_size", 0)
+    source_storage = source_storages(source_storage_cls)
+    documents = make_documents(source_storage_cls, num_chunks)
+    corpus_names = (f"store-{num_chunks}-{idx}" for idx in itertools.count())
+
+    benchmark.extra_info["num_chunks"] = num_chunks
+    # Storing is too slow for many rounds, but every round needs a fresh corpus.
+    benchmark.pedantic(
+        lambda: run(
+            source_storage.store,
+            next(corpus_names),
+            documents,
+            **store_kwargs(source_storage_cls),
+        ),
+        rounds=1,
+        iterations=1,
+    )
+
+
+@pytest.mark.parametrize("metadata_filter", ["none", "small", "large"])
+@pytest.mark.parametrize(
+    "source_storage_cls", [RagnaDemoSourceStorage, *VECTOR_DATABASES]
+)
+def test_retrieve(benchmark, corpuses, source_storage_cls, num_chunks, metadata_filter):
+    source_storage, corpus_name = corpuses(source_storage_cls, num_chunks)
+    if metadata_filter == "none":
+        metadata_filter = None
+    elif metadata_filter == "small":
+        # Small enough to be scored exactly for the vector databases
+        metadata_filter = MetadataFilter.eq("idx", 0)
+    else:
+        metadata_filter = MetadataFilter.eq("parity", "even")
+
+    benchmark.extra_info["num_chunks"] = num_chunks
+    sources = benchmark(
+        run, source_storage.retrieve, corpus_name, metadata_filter, PROMPT
+    )
+
+    assert sources
+
+
+def make_large_metadata_filter(num_children):
+    return MetadataFilter.or_(
+        [
+            MetadataFilter.and_(
+                [
+                    MetadataFilter.eq("document_name", f"document{idx}.txt"),
+                    MetadataFilter.in_("idx", list(range(idx, idx + 10))),
+                ]
+            )
+            for idx in range(num_children)
+        ]
+    )
+
+
+@pytest.mark.parametrize("num_children", [10, 1_000])
+@pytest.mark.parametrize("source_storage_cls", VECTOR_DATABASES)
+def test_translate_metadata_filter(
+    benchmark, source_storages, source_storage_cls, num_children
+):
+    source_storage = source_storages(source_storage_cls)
+    metadata_filter = make_large_metadata_filter(num_children)
+
+    benchmark(source_storage._translate_metadata_filter, metadata_filter)
+
+
+RECALL_K = 10
+
+
+def retrieve_contents(source_storage, corpus_name, prompts):
+    return [
+        {
+            source.content
+            for source in run(
+                source_storage.retrieve,
+                corpus_name,
+                None,
+                prompt,
+                chunk_size=CHUNK_SIZE,
+                num_tokens=RECALL_K * CHUNK_SIZE,
+            )[:RECALL_K]
+        }
+        for prompt in prompts
+    ]
+
+
+def directory_size(path):
+    return sum(file.stat().st_size for file in path.rglob("*") if file.is_file())
+
+
+async def qdrant_collection_size(source_storage, corpus_name):
+    # The collection info does not include the size of a collection. Thus, we take it
+    # from the telemetry of its local shards.
+    response = await source_storage._client.http.service_api.telemetry(details_level=3)
+    collection = next(
+        collection
+        for collection in response.result.collections.collections
+        if getattr(collection, "id", None) == corpus_name
+    )
+    return sum(
+        (shard.local.vectors_size_bytes or 0) + (shard.local.payloads_size_bytes or 0)
+        for shard in collection.shards or []
+        if shard.local is not None
+    )
+
+
+def corpus_size(source_storage, corpus_name):
+    if isinstance(source_storage, LanceDB):
+        # Storing a corpus creates multiple versions of the dataset. We remove the
+        # superseded ones to only measure the data and indices of the current version.
+        source_storage.optimize(corpus_name, cleanup_older_than=datetime.timedelta(0))
+        return directory_size(ragna.local_root() / "lancedb" / f"{corpus_name}.lance")
+
+    if "QDRANT_URL" in os.environ:
+        return run(qdrant_collection_size, source_storage, corpus_name)
+
+    return directory_size(ragna.local_root() / "qdrant" / "collection" / corpus_name)
+
+
+@pytest.mark.parametrize(
+    ("source_storage_cls", "vector_compression"),
+    [
+        (LanceDB, "float16"),
+        (LanceDB, "pq"),
+        (Qdrant, "float16"),
+        (Qdrant, "scalar"),
+        (Qdrant, "binary"),
+    ],
+)
+def test_vector_compression(
+    benchmark, corpuses, source_storage_cls, vector_compression, num_chunks
+):
+    if (
+        source_storage_cls is Qdrant
+        and vector_compression in {"scalar", "binary"}
+        and "QDRANT_URL" not in os.environ
+    ):
+        pytest.skip("The local mode of Qdrant ignores quantization")
+
+    source_storage, full_precision_corpus_name = corpuses(
+        source_storage_cls, num_chunks
+    )
+    corpus_name = f"{vector_compression}-{num_chunks}"
+    run(
+        source_storage.store,
+        corpus_name,
+        make_documents(source_storage_cls, num_chunks),
+        vector_compression=vector_compression,
+        **store_kwargs(source_storage_cls),
+    )
+
+    prompts = [make_text(16, seed=seed) for seed in range(20)]
+    expected = retrieve_contents(source_storage, full_precision_corpus_name, prompts)
+    actual = benchmark.pedantic(
+        retrieve_contents,
+        args=(source_storage, corpus_name, prompts),
+        rounds=1,
+        iterations=1,
+    )
+
+    size = corpus_size(source_storage, corpus_name)
+    full_precision_size = corpus_size(source_storage, full_precision_corpus_name)
+
+    benchmark.extra_info["num_chunks"] = num_chunks
+    benchmark.extra_info["corpus_size_bytes"] = size
+    benchmark.extra_info["corpus_size_saved_bytes"] = full_precision_size - size
+    benchmark.extra_info[f"recall_at_{RECALL_K}"] = sum(
+        len(expected_contents & actual_contents) / len(expected_contents)
+        for expected_contents, actual_contents in zip(expected, actual, strict=True)
+        if expected_contents
+    ) / len(prompts)
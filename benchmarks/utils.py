@@ -0,0 +1,82 @@
+import io
+import random
+
+from ragna.core import Document
+
+# A fixed vocabulary and seed keep the synthetic documents identical across runs and
+# thus the results comparable across commits.
+_WORDS = (
+    "the of and to in is was for on that with as by at from his her an were are which "
+    "this be or had not but have its they their one all been has more who she would "
+    "there when we can other what into than new some time could these two may then do "
+    "first any my now such like our over man me even most made after also did many "
+    "before must through back years where much your way well down should because each "
+    "just those people how too little state good very make world still own see men "
+    "work long get here between both life being under never day same another know while"
+).split()
+
+
+def make_text(num_words, *, seed=0):
+    rng = random.Random(seed)
+    return " ".join(rng.choices(_WORDS, k=num_words))
+
+
+class InMemoryDocument(Document):
+    def __init__(self, content, **kwargs):
+        kwargs.setdefault("metadata", {})
+        super().__init__(**kwargs)
+        self._content = content
+
+    def read(self):
+        return self._content
+
+
+def make_text_documents(num_documents, *, num_words, seed=0):
+    return [
+        InMemoryDocument(
+            make_text(num_words, seed=seed + idx).encode(),
+            name=f"document{idx}.txt",
+            metadata={"idx": idx, "parity": "even" if idx % 2 == 0 else "odd"},
+        )
+        for idx in range(num_documents)
+    ]
+
+
+def make_pdf(pages):
+    import fitz
+
+    document = fitz.open()
+    for text in pages:
+        page = document.new_page()
+        page.insert_textbox(page.rect, text)
+    return document.tobytes()
+
+
+def make_docx(pages):
+    import docx
+
+    document = docx.Document()
+    for text in pages:
+        document.add_paragraph(text)
+        document.add_page_break()
+
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def make_pptx(pages):
+    import pptx
+    from pptx.util import Inches
+
+    presentation = pptx.Presentation()
+    for text in pages:
+        slide = presentation.slides.add_slide(presentation.slide_layouts[6])
+        textbox = slide.shapes.add_textbox(
+            Inches(0.5), Inches(0.5), Inches(9), Inches(6)
+        )
+        textbox.text_frame.text = text
+
+    buffer = io.BytesIO()
+    presentation.save(buffer)
+    return buffer.getvalue()
@@ -8,12 +8,9 @@ except ModuleNotFoundError:
 
     __version__ = "UNKNOWN"
 
-from ._utils import local_root
-
-# isort: split
+from typing import TYPE_CHECKING
 
-from . import assistants, core, deploy, source_storages
-from .core import MetadataFilter, Rag
+from ._utils import local_root
 
 __all__ = [
     "__version__",
@@ -25,3 +22,26 @@ __all__ = [
     "local_root",
     "source_storages",
 ]
+
+if TYPE_CHECKING:
+    from . import assistants, core, deploy, source_storages
+    from .core import MetadataFilter, Rag
+
+# isort: split
+
+# The subpackages pull in heavy dependencies, e.g. the web UI and the database. Thus,
+# they are only imported when accessed.
+from ._utils import lazy_module_attributes
+
+__getattr__, __dir__ = lazy_module_attributes(
+    globals(),
+    {
+        "MetadataFilter": ".core",
+        "Rag": ".core",
+        "assistants": ".assistants",
+        "core": ".core",
+        "deploy": ".deploy",
+        "source_storages": ".source_storages",
+    },
+)
+del lazy_module_attributes
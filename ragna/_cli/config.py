@@ -163,7 +163,7 @@ def _select_components(
     components = sorted(
         (
             obj
-            for obj in module.__dict__.values()
+            for obj in (getattr(module, name) for name in module.__all__)
             if isinstance(obj, type)
             and issubclass(obj, base_cls)
             and obj is not base_cls
@@ -325,7 +325,7 @@ def _handle_output_path(*, output_path: Path, force: bool) -> tuple[Path, bool]:
     return output_path, force
 
 
-def check_config(config: Config) -> bool:
+def check_config(config: Config, *, deep: bool = False) -> bool:
     fully_available = True
 
     for title, components in [
@@ -344,7 +344,7 @@ def check_config(config: Config) -> bool:
         )
 
         for component in components:
-            is_available = component.is_available()
+            is_available = component.is_available(deep=deep)
             fully_available &= is_available
 
             requirements = _split_requirements(component.requirements())
@@ -352,7 +352,7 @@ def check_config(config: Config) -> bool:
                 _yes_or_no(is_available),
                 component.display_name(),
                 _format_requirements(requirements[EnvVarRequirement]),
-                _format_requirements(requirements[PackageRequirement]),
+                _format_requirements(requirements[PackageRequirement], deep=deep),
             )
 
         rich.print(table)
@@ -369,11 +369,19 @@ def _split_requirements(
     return split_reqs
 
 
-def _format_requirements(requirements: list[Requirement]) -> str:
+def _format_requirements(requirements: list[Requirement], *, deep: bool = False) -> str:
     if not requirements:
         return ""
 
-    return "\n".join(f"{_yes_or_no(req.is_available())} {req}" for req in requirements)
+    return "\n".join(
+        f"{_yes_or_no(_is_available(req, deep=deep))} {req}" for req in requirements
+    )
+
+
+def _is_available(requirement: Requirement, *, deep: bool) -> bool:
+    if isinstance(requirement, PackageRequirement):
+        return requirement.is_available(deep=deep)
+    return requirement.is_available()
 
 
 def _yes_or_no(condition: bool) -> str:
@@ -10,6 +10,8 @@ from ragna.deploy._core import make_app
 
 from .config import ConfigOption, check_config, init_config
 from .corpus import app as corpus_app
+from .eval import evaluate
+from .models import app as models_app
 
 app = typer.Typer(
     name="Ragna",
@@ -19,6 +21,7 @@ app = typer.Typer(
     pretty_exceptions_enable=False,
 )
 app.add_typer(corpus_app)
+app.add_typer(models_app)
 
 
 def version_callback(value: bool) -> None:
@@ -65,8 +68,19 @@ def init(
 
 
 @app.command(help="Check the availability of components.")
-def check(config: ConfigOption = "./ragna.toml") -> None:  # type: ignore[assignment]
-    is_available = check_config(config)
+def check(
+    config: ConfigOption = "./ragna.toml",  # type: ignore[assignment]
+    deep: Annotated[
+        bool,
+        typer.Option(
+            help=(
+                "Also try to import the required packages. "
+                "This detects broken installations, but is a lot slower."
+            )
+        ),
+    ] = False,
+) -> None:
+    is_available = check_config(config, deep=deep)
     raise typer.Exit(int(not is_available))
 
 
@@ -122,3 +136,90 @@ def deploy(
         host=config.hostname,
         port=config.port,
     )
+
+
+@app.command(
+    name="eval",
+    help=(
+        "Run the prompts of a JSONL file through Ragna and report the latencies. "
+        "Each line is either a plain prompt string or an object with a 'prompt' key "
+        "and optional 'id', 'documents', 'metadata_filter', and 'corpus_name' keys."
+    ),
+)
+def eval_(
+    questions_path: Annotated[
+        Path, typer.Argument(metavar="QUESTIONS_PATH", exists=True, dir_okay=False)
+    ],
+    *,
+    config: ConfigOption = "./ragna.toml",  # type: ignore[assignment]
+    output_path: Annotated[
+        Path,
+        typer.Option(
+            "-o",
+            "--output-file",
+            metavar="OUTPUT_PATH",
+            help="Write the per-question results as Parquet to <OUTPUT_PATH>.",
+        ),
+    ] = Path("ragna-eval.parquet"),
+    source_storage: Annotated[
+        str | None,
+        typer.Option(
+            help="Display name of the source storage to use.",
+            show_default="first source storage of the configuration",
+        ),
+    ] = None,
+    assistant: Annotated[
+        str | None,
+        typer.Option(
+            help="Display name of the assistant to use.",
+            show_default="first assistant of the configuration",
+        ),
+    ] = None,
+    corpus_name: Annotated[
+        str, typer.Option(help="Name of the corpus to retrieve sources from.")
+    ] = "default",
+    retrieval_only: Annotated[
+        bool,
+        typer.Option(
+            "--retrieval-only/--answer",
+            help="Only retrieve sources instead of generating full answers.",
+        ),
+    ] = False,
+    concurrency: Annotated[
+        int, typer.Option(help="Maximum number of prompts in flight at once.")
+    ] = 4,
+    params: Annotated[
+        list[str],
+        typer.Option(
+            "-p",
+            "--param",
+            metavar="KEY=VALUE",
+            help=(
+                "Additional chat parameter. "
+                "The value is parsed as JSON and falls back to a string."
+            ),
+            default_factory=list,
+        ),
+    ],
+    ignore_unavailable_components: Annotated[
+        bool,
+        typer.Option(
+            help=(
+                "Ignore components that are not available, "
+                "i.e. their requirements are not met. "
+            )
+        ),
+    ] = False,
+) -> None:
+    evaluate(
+        config=config,
+        questions_path=questions_path,
+        output_path=output_path,
+        source_storage=source_storage,
+        assistant=assistant,
+        corpus_name=corpus_name,
+        retrieval_only=retrieval_only,
+        concurrency=concurrency,
+        params=params,
+        ignore_unavailable_components=ignore_unavailable_components,
+    )
@@ -6,9 +6,11 @@ from typing import Annotated
 import rich
 import typer
 from rich.console import Console
+from rich.markup import escape
 from rich.panel import Panel
 from rich.progress import BarColumn, Progress, TextColumn, TimeRemainingColumn
 
+import ragna
 from ragna._utils import default_user
 from ragna.deploy._database import Database
 from ragna.deploy._engine import CoreToSchemaConverter
@@ -200,3 +202,41 @@ def ingest(
             progress.advance(overall_task)
 
         progress.update(overall_task, completed=len(config.source_storages))
+
+
+@app.command(
+    help=(
+        "Optimize the on-disk layout of corpuses, e.g. compact small files and remove "
+        "old versions. This speeds up corpuses that received many small ingests."
+    )
+)
+def optimize(
+    corpus_name: Annotated[
+        str | None,
+        typer.Option(help="Name of the corpus to optimize. Defaults to all corpuses."),
+    ] = None,
+    config: ConfigOption = "./ragna.toml",  # type: ignore[assignment]
+) -> None:
+    ragna.local_root(config.local_root)
+
+    failed = False
+    for source_storage in [cls() for cls in config.source_storages]:
+        try:
+            with rich.get_console().status(
+                f"Optimizing {source_storage.display_name()}"
+            ):
+                optimized = source_storage.optimize(corpus_name)
+        except Exception as exc:
+            failed = True
+            rich.print(
+                f"[red]Optimizing {source_storage.display_name()} failed[/red]: "
+                f"{escape(str(exc))}"
+            )
+        else:
+            if optimized:
+                rich.print(f"Optimized {source_storage.display_name()}")
+            else:
+                rich.print(f"{source_storage.display_name()} has nothing to optimize")
+
+    if failed:
+        raise typer.Exit(1)
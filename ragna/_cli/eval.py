@@ -0,0 +1,293 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import time
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any, cast
+
+import rich
+import typer
+from rich.table import Table
+
+from ragna.core import Chat, MessageTimings, MetadataFilter, Rag, RagnaException
+from ragna.deploy import Config
+
+
+def load_questions(path: Path) -> list[dict[str, Any]]:
+    questions = []
+    with open(path) as file:
+        for line_number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+
+            try:
+                question = json.loads(line)
+            except json.JSONDecodeError as exc:
+                raise typer.BadParameter(
+                    f"Line {line_number} of {path} is not valid JSON"
+                ) from exc
+
+            if isinstance(question, str):
+                question = {"prompt": question}
+            elif not (isinstance(question, dict) and "prompt" in question):
+                raise typer.BadParameter(
+                    f"Line {line_number} of {path} has no 'prompt' field"
+                )
+
+            question.setdefault("id", str(line_number))
+            questions.append(question)
+
+    return questions
+
+
+def parse_params(params: list[str]) -> dict[str, Any]:
+    parsed_params = {}
+    for param in params:
+        key, sep, value = param.partition("=")
+        if not sep:
+            raise typer.BadParameter(
+                f"Parameter {param!r} is not of the form KEY=VALUE"
+            )
+
+        try:
+            parsed_params[key] = json.loads(value)
+        except json.JSONDecodeError:
+            parsed_params[key] = value
+
+    return parsed_params
+
+
+def _elapsed_ms(start: float) -> float:
+    return (time.perf_counter() - start) * 1e3
+
+
+async def run_questions(
+    rag: Rag,
+    questions: list[dict[str, Any]],
+    *,
+    source_storage: str,
+    assistant: str,
+    corpus_name: str,
+    retrieval_only: bool,
+    concurrency: int,
+    params: dict[str, Any],
+) -> tuple[list[dict[str, Any]], float]:
+    def make_chat(input: Any, corpus_name: str) -> Chat:
+        return rag.chat(
+            input,
+            source_storage=source_storage,
+            assistant=assistant,
+            corpus_name=corpus_name,
+            **params,
+        )
+
+    # Preparing a chat with documents stores them. Thus, we prepare each distinct set
+    # of documents only once and before the timing starts. The questions then
+    # retrieve from the stored documents through the metadata filter of that chat.
+    # This also avoids storing the same documents multiple times.
+    def documents_key(question: dict[str, Any]) -> tuple[tuple[str, ...], str]:
+        documents = question["documents"]
+        if isinstance(documents, str):
+            documents = [documents]
+        return tuple(documents), question.get("corpus_name", corpus_name)
+
+    document_filters: dict[tuple[tuple[str, ...], str], MetadataFilter | str] = {}
+    for question in questions:
+        if "documents" not in question:
+            continue
+
+        key = documents_key(question)
+        if key in document_filters:
+            continue
+
+        try:
+            chat = make_chat(list(key[0]), key[1])
+            await chat.prepare()
+        except Exception as exc:
+            document_filters[key] = str(exc) or type(exc).__name__
+        else:
+            document_filters[key] = cast(MetadataFilter, chat.metadata_filter)
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_question(question: dict[str, Any]) -> dict[str, Any]:
+        record: dict[str, Any] = {
+            "id": str(question["id"]),
+            "prompt": question["prompt"],
+            "retrieve_ms": None,
+            "ttft_ms": None,
+            "total_ms": None,
+            "num_sources": None,
+            "num_source_tokens": None,
+            "num_answer_chunks": None,
+            "error": None,
+        }
+
+        input: MetadataFilter | None
+        if "documents" in question:
+            document_filter = document_filters[documents_key(question)]
+            if isinstance(document_filter, str):
+                record["error"] = document_filter
+                return record
+            input = document_filter
+        elif "metadata_filter" in question:
+            input = MetadataFilter.from_primitive(question["metadata_filter"])
+        else:
+            input = None
+
+        async with semaphore:
+            try:
+                chat = make_chat(input, question.get("corpus_name", corpus_name))
+                await chat.prepare()
+
+                if retrieval_only:
+                    start = time.perf_counter()
+                    sources = await chat.retrieve(question["prompt"])
+                    record["retrieve_ms"] = record["total_ms"] = _elapsed_ms(start)
+                else:
+                    message = await chat.answer(question["prompt"])
+                    sources = message.sources
+
+                    timings = cast(MessageTimings, message.timings)
+                    record["retrieve_ms"] = timings.retrieve_ms
+                    record["ttft_ms"] = timings.ttft_ms
+                    record["total_ms"] = timings.total_ms
+                    record["num_answer_chunks"] = timings.num_answer_chunks
+
+                record["num_sources"] = len(sources)
+                record["num_source_tokens"] = sum(
+                    source.num_tokens for source in sources
+                )
+            except Exception as exc:
+                record["error"] = str(exc) or type(exc).__name__
+
+        return record
+
+    start = time.perf_counter()
+    records = await asyncio.gather(*[run_question(question) for question in questions])
+    wall_time = time.perf_counter() - start
+
+    return records, wall_time
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    # Nearest-rank method. Unlike statistics.quantiles, this also works with a single
+    # value and always returns an observed value.
+    values = sorted(values)
+    return values[max(math.ceil(q / 100 * len(values)) - 1, 0)]
+
+
+def summarize(records: list[dict[str, Any]], *, wall_time: float) -> Table:
+    num_errors = sum(record["error"] is not None for record in records)
+    num_successes = len(records) - num_errors
+
+    table = Table(
+        title=(
+            f"{num_successes} / {len(records)} questions succeeded in "
+            f"{wall_time:.2f} s ({num_successes / wall_time:.2f} QPS)"
+        )
+    )
+    table.add_column("")
+    for column in ["p50", "p95", "p99", "max"]:
+        table.add_column(f"{column} (ms)", justify="right")
+
+    for key, name in [
+        ("retrieve_ms", "retrieve"),
+        ("ttft_ms", "time to first token"),
+        ("total_ms", "total"),
+    ]:
+        values = [record[key] for record in records if record[key] is not None]
+        if not values:
+            continue
+
+        table.add_row(
+            name,
+            *[f"{percentile(values, q):.1f}" for q in [50, 95, 99, 100]],
+        )
+
+    return table
+
+
+def write_parquet(records: list[dict[str, Any]], path: Path) -> None:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    pq.write_table(
+        pa.Table.from_pylist(
+            records,
+            schema=pa.schema(
+                [
+                    pa.field("id", pa.string()),
+                    pa.field("prompt", pa.string()),
+                    pa.field("retrieve_ms", pa.float64()),
+                    pa.field("ttft_ms", pa.float64()),
+                    pa.field("total_ms", pa.float64()),
+                    pa.field("num_sources", pa.int64()),
+                    pa.field("num_source_tokens", pa.int64()),
+                    pa.field("num_answer_chunks", pa.int64()),
+                    pa.field("error", pa.string()),
+                ]
+            ),
+        ),
+        path,
+    )
+
+
+def evaluate(
+    *,
+    config: Config,
+    questions_path: Path,
+    output_path: Path,
+    source_storage: str | None,
+    assistant: str | None,
+    corpus_name: str,
+    retrieval_only: bool,
+    concurrency: int,
+    params: list[str],
+    ignore_unavailable_components: bool,
+) -> None:
+    try:
+        import pyarrow  # noqa: F401
+    except ModuleNotFoundError:
+        rich.print("Writing the results requires [bold]pyarrow[/bold].")
+        raise typer.Exit(1) from None
+
+    if concurrency < 1:
+        raise typer.BadParameter("The concurrency has to be at least 1")
+
+    questions = load_questions(questions_path)
+    parsed_params = parse_params(params)
+
+    rag = Rag(  # type: ignore[var-annotated]
+        config=config, ignore_unavailable_components=ignore_unavailable_components
+    )
+    try:
+        records, wall_time = asyncio.run(
+            run_questions(
+                rag,
+                questions,
+                source_storage=source_storage
+                or config.source_storages[0].display_name(),
+                assistant=assistant or config.assistants[0].display_name(),
+                corpus_name=corpus_name,
+                retrieval_only=retrieval_only,
+                concurrency=concurrency,
+                params=parsed_params,
+            )
+        )
+    except RagnaException as exc:
+        rich.print(str(exc))
+        raise typer.Exit(1) from exc
+
+    write_parquet(records, output_path)
+
+    rich.print(summarize(records, wall_time=wall_time))
+    errors = [record for record in records if record["error"] is not None]
+    for record in errors[:5]:
+        rich.print(f"- {record['id']}: {record['error']}")
+    if len(errors) > 5:
+        rich.print(f"- ... and {len(errors) - 5} more")
+    rich.print(f"Wrote the results to {output_path}")
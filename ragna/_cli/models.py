@@ -0,0 +1,83 @@
+from typing import Annotated, cast
+
+import rich
+import typer
+from rich.markup import escape
+from rich.table import Table
+
+import ragna
+from ragna.core import Component, ModelArtifact, PackageRequirement
+
+from .config import ConfigOption
+
+app = typer.Typer(
+    name="models",
+    help="Manage the model artifacts of the components.",
+    invoke_without_command=True,
+    no_args_is_help=True,
+)
+
+
+def collect_model_artifacts(
+    components: list[type[Component]],
+) -> dict[str, tuple[ModelArtifact, list[str]]]:
+    artifacts: dict[str, tuple[ModelArtifact, list[str]]] = {}
+    for component in components:
+        # Missing environment variables, e.g. API keys, are irrelevant for pulling the
+        # artifacts. Missing packages are not, since we need them for the download.
+        if not all(
+            requirement.is_available()
+            for requirement in component.requirements()
+            if isinstance(requirement, PackageRequirement)
+        ):
+            continue
+
+        for artifact in component.model_artifacts():
+            _, display_names = artifacts.setdefault(artifact.name, (artifact, []))
+            display_names.append(component.display_name())
+    return artifacts
+
+
+@app.command(
+    help=(
+        "Download the model artifacts needed by the configured components into the "
+        "local root, such that the components can be used without network access."
+    )
+)
+def pull(
+    *,
+    config: ConfigOption = "./ragna.toml",  # type: ignore[assignment]
+    force: Annotated[
+        bool,
+        typer.Option(
+            "-f", "--force", help="Download artifacts even if they are up to date."
+        ),
+    ] = False,
+) -> None:
+    ragna.local_root(config.local_root)
+
+    artifacts = collect_model_artifacts(
+        cast(list[type[Component]], [*config.source_storages, *config.assistants])
+    )
+    if not artifacts:
+        rich.print("The configured components do not need any model artifacts.")
+        return
+
+    table = Table("name", "components", "status", "path", title="model artifacts")
+    failed = False
+    for artifact, display_names in artifacts.values():
+        try:
+            with rich.get_console().status(f"Pulling {artifact.name}"):
+                pulled = artifact.pull(force=force)
+        except Exception as exc:
+            failed = True
+            status = f"[red]failed[/red]: {escape(str(exc))}"
+        else:
+            status = "[green]pulled[/green]" if pulled else "up to date"
+
+        table.add_row(
+            artifact.name, "\n".join(display_names), status, str(artifact.path)
+        )
+
+    rich.print(table)
+    raise typer.Exit(int(failed))
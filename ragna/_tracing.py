@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import contextlib
+from collections.abc import Iterator
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from opentelemetry.trace import Span, Tracer, TracerProvider
+
+# Tracing is opt-in. Unless a tracer provider is set, all functions below are no-ops
+# and opentelemetry is not even imported.
+_TRACER: Tracer | None = None
+
+
+def set_tracer_provider(tracer_provider: TracerProvider | None) -> None:
+    global _TRACER
+    if tracer_provider is None:
+        _TRACER = None
+    else:
+        import ragna
+
+        _TRACER = tracer_provider.get_tracer("ragna", ragna.__version__)
+
+
+def is_enabled() -> bool:
+    return _TRACER is not None
+
+
+def _clean_attributes(attributes: dict[str, Any]) -> dict[str, Any]:
+    # OpenTelemetry only supports primitive attribute values and rejects None.
+    return {
+        f"ragna.{key}": value if isinstance(value, bool | int | float) else str(value)
+        for key, value in attributes.items()
+        if value is not None
+    }
+
+
+@contextlib.contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span | None]:
+    """Trace the enclosed block in a span that is the parent of all spans within.
+
+    This must not enclose a `yield` of an (async) generator, since the context might be
+    exited in a different task than it was entered in. Use `detached_span` for that.
+    """
+    if _TRACER is None:
+        yield None
+        return
+
+    with _TRACER.start_as_current_span(
+        name, attributes=_clean_attributes(attributes)
+    ) as span:
+        yield span
+
+
+@contextlib.contextmanager
+def detached_span(name: str, **attributes: Any) -> Iterator[Span | None]:
+    """Trace the enclosed block in a span without making it the current span.
+
+    The span can enclose `yield`s of (async) generators. Spans created within the
+    block are not children of this span, but of the span that was current when this
+    span was started.
+    """
+    if _TRACER is None:
+        yield None
+        return
+
+    from opentelemetry.trace import Status, StatusCode
+
+    span = _TRACER.start_span(name, attributes=_clean_attributes(attributes))
+    try:
+        yield span
+    except BaseException as exc:
+        span.record_exception(exc)
+        span.set_status(Status(StatusCode.ERROR, str(exc)))
+        raise
+    finally:
+        span.end()
+
+
+def set_attributes(span: Span | None, **attributes: Any) -> None:
+    if span is not None:
+        span.set_attributes(_clean_attributes(attributes))
+
+
+def inject(headers: Any, *, span: Span | None = None) -> dict[str, str]:
+    """Add the trace context to the headers of an outgoing HTTP request.
+
+    Args:
+        headers: Headers of the request.
+        span: Span that the receiver should continue. Defaults to the current span.
+    """
+    headers = dict(headers or {})
+    if _TRACER is None:
+        return headers
+
+    from opentelemetry import propagate, trace
+
+    context = trace.set_span_in_context(span) if span is not None else None
+    propagate.inject(headers, context=context)
+    return headers
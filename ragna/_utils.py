@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import concurrent.futures
 import contextlib
 import functools
 import getpass
+import importlib
 import inspect
+import multiprocessing
 import os
 import shlex
 import subprocess
@@ -75,6 +78,66 @@ def fix_module(globals: dict[str, Any]) -> None:
         obj.__module__ = globals["__package__"]
 
 
+def lazy_module_attributes(
+    globals: dict[str, Any], attributes: dict[str, str]
+) -> tuple[Callable[[str], Any], Callable[[], list[str]]]:
+    """Import the public objects of a package only when they are first accessed.
+
+    This implements [PEP 562](https://peps.python.org/pep-0562/) module level
+    `__getattr__` and `__dir__` functions. Put the following snippet at the end of
+    public `__init__.py` files of ragna subpackages instead of importing the objects.
+    To keep static type checkers working, import the same objects in a
+    `if TYPE_CHECKING:` block.
+
+    ```python
+    # isort: split
+
+    from ragna._utils import lazy_module_attributes
+
+    __getattr__, __dir__ = lazy_module_attributes(globals(), {"Foo": "._foo"})
+    del lazy_module_attributes
+    ```
+
+    Similar to `fix_module`, the `__module__` attribute of objects
+    defined in private submodules of the package is set to the package.
+
+    Args:
+        globals: Globals of the package.
+        attributes: Mapping of the public names to the module they are defined in,
+            relative to the package. If the name is a submodule itself, i.e.
+            `{"foo": ".foo"}`, the module is returned.
+
+    Returns:
+        `__getattr__` and `__dir__` functions for the package.
+    """
+    package = globals["__package__"]
+
+    def __getattr__(name: str) -> Any:
+        try:
+            module_name = attributes[name]
+        except KeyError:
+            raise AttributeError(
+                f"module {package!r} has no attribute {name!r}"
+            ) from None
+
+        module = importlib.import_module(module_name, package)
+        if module_name == f".{name}":
+            obj = module
+        else:
+            obj = getattr(module, name)
+            if obj.__module__.startswith(f"{package}._"):
+                obj.__module__ = package
+
+        # Subsequent accesses do not go through this function anymore.
+        globals[name] = obj
+        return obj
+
+    def __dir__() -> list[str]:
+        return sorted(globals.keys() | attributes.keys())
+
+    return __getattr__, __dir__
+
+
 def timeout_after(
     seconds: float = 30, *, message: str = ""
 ) -> Callable[[Callable], Callable]:
@@ -165,6 +228,62 @@ def default_user() -> str:
     return "Bodil"
 
 
+_IN_PROCESS_POOL_WORKER = False
+
+
+def _mark_process_pool_worker() -> None:
+    global _IN_PROCESS_POOL_WORKER
+    _IN_PROCESS_POOL_WORKER = True
+
+
+class ProcessPool:
+    """Process pool for CPU bound work that is sized by an environment variable.
+
+    The pool is created on first use and recreated if the environment variable changes.
+    Inside the workers of any `ProcessPool`, no pool is available to avoid starting
+    processes recursively.
+
+    Args:
+        env_var: Environment variable that holds the number of processes. A value of
+            `0` disables the pool.
+        default: Number of processes if the environment variable is not set.
+    """
+
+    def __init__(self, env_var: str, *, default: int = 0) -> None:
+        self._env_var = env_var
+        self._default = default
+        self._lock = threading.Lock()
+        self._executor: concurrent.futures.ProcessPoolExecutor | None = None
+        self._num_processes = 0
+        # Forking a process with running threads, e.g. of the web server, is unsafe.
+        self._mp_context = multiprocessing.get_context("spawn")
+
+    @property
+    def num_processes(self) -> int:
+        if _IN_PROCESS_POOL_WORKER:
+            return 0
+        return int(os.environ.get(self._env_var, self._default))
+
+    def executor(self) -> concurrent.futures.ProcessPoolExecutor | None:
+        """Get the executor of the pool or `None` if it is disabled."""
+        num_processes = self.num_processes
+        with self._lock:
+            if num_processes != self._num_processes:
+                if self._executor is not None:
+                    self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = (
+                    concurrent.futures.ProcessPoolExecutor(
+                        max_workers=num_processes,
+                        mp_context=self._mp_context,
+                        initializer=_mark_process_pool_worker,
+                    )
+                    if num_processes > 0
+                    else None
+                )
+                self._num_processes = num_processes
+            return self._executor
+
+
 class BackgroundSubprocess:
     def __init__(
         self,
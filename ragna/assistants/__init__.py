@@ -20,26 +20,52 @@ __all__ = [
     "RagnaDemoAssistant",
 ]
 
-from ._ai21labs import Jurassic2Ultra
-from ._anthropic import ClaudeHaiku, ClaudeOpus, ClaudeSonnet
-from ._cohere import Command, CommandLight
-from ._demo import RagnaDemoAssistant
-from ._google import GeminiPro, GeminiUltra
-from ._llamafile import LlamafileAssistant
-from ._ollama import (
-    OllamaGemma2B,
-    OllamaLlama2,
-    OllamaLlava,
-    OllamaMistral,
-    OllamaMixtral,
-    OllamaOrcaMini,
-    OllamaPhi2,
-)
-from ._openai import Gpt4, Gpt35Turbo16k
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ._ai21labs import Jurassic2Ultra
+    from ._anthropic import ClaudeHaiku, ClaudeOpus, ClaudeSonnet
+    from ._cohere import Command, CommandLight
+    from ._demo import RagnaDemoAssistant
+    from ._google import GeminiPro, GeminiUltra
+    from ._llamafile import LlamafileAssistant
+    from ._ollama import (
+        OllamaGemma2B,
+        OllamaLlama2,
+        OllamaLlava,
+        OllamaMistral,
+        OllamaMixtral,
+        OllamaOrcaMini,
+        OllamaPhi2,
+    )
+    from ._openai import Gpt4, Gpt35Turbo16k
 
 # isort: split
 
-from ragna._utils import fix_module
+from ragna._utils import lazy_module_attributes
 
-fix_module(globals())
-del fix_module
+__getattr__, __dir__ = lazy_module_attributes(
+    globals(),
+    {
+        "ClaudeHaiku": "._anthropic",
+        "ClaudeOpus": "._anthropic",
+        "ClaudeSonnet": "._anthropic",
+        "Command": "._cohere",
+        "CommandLight": "._cohere",
+        "GeminiPro": "._google",
+        "GeminiUltra": "._google",
+        "Gpt35Turbo16k": "._openai",
+        "Gpt4": "._openai",
+        "Jurassic2Ultra": "._ai21labs",
+        "LlamafileAssistant": "._llamafile",
+        "OllamaGemma2B": "._ollama",
+        "OllamaLlama2": "._ollama",
+        "OllamaLlava": "._ollama",
+        "OllamaMistral": "._ollama",
+        "OllamaMixtral": "._ollama",
+        "OllamaOrcaMini": "._ollama",
+        "OllamaPhi2": "._ollama",
+        "RagnaDemoAssistant": "._demo",
+    },
+)
+del lazy_module_attributes
@@ -9,6 +9,7 @@ from ._http_api import HttpApiAssistant
 class Ai21LabsAssistant(HttpApiAssistant):
     _API_KEY_ENV_VAR = "AI21_API_KEY"
     _STREAMING_PROTOCOL = None
+    _WARMUP_URL = "https://api.ai21.com"
     _MODEL_TYPE: str
 
     @classmethod
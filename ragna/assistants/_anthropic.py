@@ -1,3 +1,4 @@
+import os
 from collections.abc import AsyncIterator
 from typing import cast
 
@@ -7,6 +8,13 @@ from ._http_api import HttpApiAssistant, HttpStreamingProtocol
 
 
 class AnthropicAssistant(HttpApiAssistant):
+    """Anthropic assistants
+
+    By default, the API is expected at `https://api.anthropic.com`. This can be
+    changed with the `RAGNA_ANTHROPIC_BASE_URL` environment variable, e.g. to target a
+    proxy or a mock server.
+    """
+
     _API_KEY_ENV_VAR = "ANTHROPIC_API_KEY"
     _STREAMING_PROTOCOL = HttpStreamingProtocol.SSE
     _MODEL: str
@@ -19,6 +27,14 @@ class AnthropicAssistant(HttpApiAssistant):
     def display_name(cls) -> str:
         return f"Anthropic/{cls._MODEL}"
 
+    @property
+    def _base_url(self) -> str:
+        return os.environ.get("RAGNA_ANTHROPIC_BASE_URL", "https://api.anthropic.com")
+
+    @property
+    def _warmup_url(self) -> str:
+        return self._base_url
+
     def _instructize_system_prompt(self, sources: list[Source]) -> str:
         # See https://docs.anthropic.com/claude/docs/system-prompts
         # See https://docs.anthropic.com/claude/docs/long-context-window-tips#tips-for-document-qa
@@ -45,7 +61,7 @@ class AnthropicAssistant(HttpApiAssistant):
         prompt, sources = (message := messages[-1]).content, message.sources
         async with self._call_api(
             "POST",
-            "https://api.anthropic.com/v1/messages",
+            f"{self._base_url}/v1/messages",
             headers={
                 "accept": "application/json",
                 "anthropic-version": "2023-06-01",
@@ -9,6 +9,7 @@ from ._http_api import HttpApiAssistant, HttpStreamingProtocol
 class CohereAssistant(HttpApiAssistant):
     _API_KEY_ENV_VAR = "COHERE_API_KEY"
     _STREAMING_PROTOCOL = HttpStreamingProtocol.JSONL
+    _WARMUP_URL = "https://api.cohere.ai"
     _MODEL: str
 
     @classmethod
@@ -8,6 +8,7 @@ from ._http_api import HttpApiAssistant, HttpStreamingProtocol
 class GoogleAssistant(HttpApiAssistant):
     _API_KEY_ENV_VAR = "GOOGLE_API_KEY"
     _STREAMING_PROTOCOL = HttpStreamingProtocol.JSON
+    _WARMUP_URL = "https://generativelanguage.googleapis.com"
     _MODEL: str
 
     @classmethod
@@ -2,12 +2,13 @@ import contextlib
 import enum
 import json
 import os
-from collections.abc import AsyncIterator
+from collections.abc import AsyncIterator, Callable
 from typing import Any
 
 import httpx
 
 import ragna
+from ragna import _tracing
 from ragna.core import (
     Assistant,
     EnvVarRequirement,
@@ -57,7 +58,32 @@ class HttpApiCaller:
                 HttpStreamingProtocol.JSON: self._stream_json,
             }[self._protocol]
 
-        return call_method(method, url, parse_kwargs=parse_kwargs or {}, **kwargs)
+        return self._traced(
+            call_method, method, url, parse_kwargs=parse_kwargs or {}, **kwargs
+        )
+
+    @contextlib.asynccontextmanager
+    async def _traced(
+        self,
+        call_method: Callable[
+            ..., contextlib.AbstractAsyncContextManager[AsyncIterator[Any]]
+        ],
+        method: str,
+        url: str,
+        **kwargs: Any,
+    ) -> AsyncIterator[AsyncIterator[Any]]:
+        # The returned stream is usually consumed by an assistant's answer generator.
+        # Thus, the span cannot be the current one.
+        with _tracing.detached_span(
+            f"HTTP {method}",
+            http_method=method,
+            url=url,
+            protocol=self._protocol.name if self._protocol is not None else None,
+        ) as span:
+            if span is not None:
+                kwargs["headers"] = _tracing.inject(kwargs.get("headers"), span=span)
+            async with call_method(method, url, **kwargs) as stream:
+                yield stream
 
     @contextlib.asynccontextmanager
     async def _no_stream(
@@ -207,3 +233,17 @@ class HttpApiAssistant(Assistant):
             else None
         )
         self._call_api = HttpApiCaller(self._client, self._STREAMING_PROTOCOL)
+
+    # URL that warmup() connects to. The response is irrelevant and thus any URL on
+    # the same host as the API endpoint works.
+    _WARMUP_URL: str | None = None
+
+    @property
+    def _warmup_url(self) -> str | None:
+        return self._WARMUP_URL
+
+    async def warmup(self) -> None:
+        # Establish the connection to the API, including the TLS handshake, ahead of
+        # the first answer. The client keeps the connection alive in its pool.
+        if (url := self._warmup_url) is not None:
+            await self._client.head(url)
@@ -1,5 +1,6 @@
 import abc
 import contextlib
+import os
 from collections.abc import AsyncIterator
 from functools import cached_property
 from typing import Any, cast
@@ -16,6 +17,10 @@ class OpenaiLikeHttpApiAssistant(HttpApiAssistant):
     @abc.abstractmethod
     def _url(self) -> str: ...
 
+    @property
+    def _warmup_url(self) -> str:
+        return self._url
+
     def _make_system_content(self, sources: list[Source]) -> str:
         # See https://github.com/openai/openai-cookbook/blob/main/examples/How_to_format_inputs_to_ChatGPT_models.ipynb
         instruction = (
@@ -72,6 +77,13 @@ class OpenaiLikeHttpApiAssistant(HttpApiAssistant):
 
 
 class OpenaiAssistant(OpenaiLikeHttpApiAssistant):
+    """OpenAI assistants
+
+    By default, the API is expected at `https://api.openai.com`. This can be changed
+    with the `RAGNA_OPENAI_BASE_URL` environment variable, e.g. to target a proxy or a
+    mock server.
+    """
+
     _API_KEY_ENV_VAR = "OPENAI_API_KEY"
     _STREAMING_PROTOCOL = HttpStreamingProtocol.SSE
 
@@ -81,7 +93,8 @@ class OpenaiAssistant(OpenaiLikeHttpApiAssistant):
 
     @cached_property
     def _url(self) -> str:
-        return "https://api.openai.com/v1/chat/completions"
+        base_url = os.environ.get("RAGNA_OPENAI_BASE_URL", "https://api.openai.com")
+        return f"{base_url}/v1/chat/completions"
 
 
 class Gpt35Turbo16k(OpenaiAssistant):
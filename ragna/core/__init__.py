@@ -10,8 +10,10 @@ __all__ = [
     "LocalDocument",
     "Message",
     "MessageRole",
+    "MessageTimings",
     "MetadataFilter",
     "MetadataOperator",
+    "ModelArtifact",
     "PackageRequirement",
     "Page",
     "PdfDocumentHandler",
@@ -25,6 +27,7 @@ __all__ = [
 
 from ._utils import (
     EnvVarRequirement,
+    ModelArtifact,
     PackageRequirement,
     RagnaException,
     Requirement,
@@ -51,6 +54,7 @@ from ._components import (
     Component,
     Message,
     MessageRole,
+    MessageTimings,
     Source,
     SourceStorage,
 )
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import contextlib
+import gzip
+import hashlib
+import json
+import os
+import threading
+import uuid
+from pathlib import Path
+from typing import Any
+
+_DEFAULT_MAX_SIZE = 1024**3
+
+
+class ArtifactCache:
+    """Persistent cache for artifacts derived from the contents of documents.
+
+    Extracting the pages of a document, e.g. parsing a PDF, and chunking them is the
+    most expensive CPU step when storing documents. Since the same document is often
+    stored multiple times, e.g. into multiple source storages or from multiple chats,
+    the results are cached on disk inside the local root.
+
+    Each artifact is stored as compressed JSON file. If the total size of the cache
+    exceeds `max_size` bytes, the least recently used artifacts are evicted. A
+    `max_size` of `0` disables the cache.
+    """
+
+    def __init__(self, *, max_size: int = _DEFAULT_MAX_SIZE) -> None:
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        # Sizes of the artifacts on disk. This is only an estimate, since other
+        # processes might write to the same directory. It is recomputed on eviction.
+        self._sizes: dict[Path, int] | None = None
+        self._sizes_path: Path | None = None
+
+    @property
+    def path(self) -> Path:
+        from ragna._utils import local_root
+
+        # The local root might change at runtime. Thus, we cannot fix the path here.
+        return local_root() / "cache" / "artifacts"
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def _artifact_path(self, key: str) -> Path:
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return self.path / digest[:2] / f"{digest}.json.gz"
+
+    def get(self, key: str) -> Any | None:
+        """Get an artifact.
+
+        Args:
+            key: Key of the artifact.
+
+        Returns:
+            The artifact or `None` if it is not cached.
+        """
+        if not self.enabled:
+            return None
+
+        path = self._artifact_path(key)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            # The file is corrupted, e.g. due to a full disk while writing.
+            path.unlink(missing_ok=True)
+            return None
+
+        if data["key"] != key:
+            return None
+
+        # The modification time is used to determine the least recently used
+        # artifacts on eviction.
+        with contextlib.suppress(OSError):
+            os.utime(path)
+
+        return data["value"]
+
+    def set(self, key: str, value: Any) -> None:
+        """Set an artifact.
+
+        Args:
+            key: Key of the artifact.
+            value: JSON serializable artifact.
+        """
+        if not self.enabled:
+            return
+
+        path = self._artifact_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Writing to a temporary file first and moving it afterwards is atomic. Thus,
+        # concurrent readers never see a partial artifact.
+        tmp_path = path.with_name(f".{path.name}-{uuid.uuid4().hex}")
+        try:
+            with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=1) as file:
+                json.dump({"key": key, "value": value}, file)
+            tmp_path.replace(path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+        with self._lock:
+            if self._sizes is None or self._sizes_path != self.path:
+                self._sizes = self._scan()
+                self._sizes_path = self.path
+            self._sizes[path] = path.stat().st_size
+            if sum(self._sizes.values()) > self.max_size:
+                self._evict()
+
+    def _scan(self) -> dict[Path, int]:
+        sizes = {}
+        for path in self.path.glob("*/*.json.gz"):
+            with contextlib.suppress(FileNotFoundError):
+                sizes[path] = path.stat().st_size
+        return sizes
+
+    def _evict(self) -> None:
+        entries = []
+        for path in self.path.glob("*/*.json.gz"):
+            with contextlib.suppress(FileNotFoundError):
+                stat = path.stat()
+                entries.append((stat.st_mtime, path, stat.st_size))
+        entries.sort()
+
+        total_size = sum(size for _, _, size in entries)
+        sizes = {path: size for _, path, size in entries}
+        for _, path, size in entries:
+            if total_size <= self.max_size:
+                break
+
+            path.unlink(missing_ok=True)
+            del sizes[path]
+            total_size -= size
+
+        self._sizes = sizes
+
+    def clear(self) -> None:
+        """Remove all artifacts."""
+        with self._lock:
+            for path in self._scan():
+                path.unlink(missing_ok=True)
+            self._sizes = None
+
+
+ARTIFACT_CACHE = ArtifactCache(
+    max_size=int(os.environ.get("RAGNA_ARTIFACT_CACHE_MAX_SIZE", _DEFAULT_MAX_SIZE))
+)
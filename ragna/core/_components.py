@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import abc
+import contextvars
 import enum
 import functools
 import inspect
@@ -14,11 +15,13 @@ from typing import (
 
 import pydantic
 import pydantic.utils
-from fastapi import status
+from starlette import status
+
+from ragna._utils import as_awaitable
 
 from ._document import Document
 from ._metadata_filter import MetadataFilter
-from ._utils import RagnaException, RequirementsMixin, merge_models
+from ._utils import ModelArtifact, RagnaException, RequirementsMixin, merge_models
 
 
 class Component(RequirementsMixin):
@@ -38,6 +41,30 @@ class Component(RequirementsMixin):
     def __repr__(self) -> str:
         return self.display_name()
 
+    @classmethod
+    def model_artifacts(cls) -> list[ModelArtifact]:
+        """Model artifacts that this component loads at runtime.
+
+        These are pulled ahead of time by `ragna models pull`. Defaults to none.
+        """
+        return []
+
+    def warmup(self) -> None:
+        """Prepare the component for its first use.
+
+        This is called in the background after a deployment starts, such that the
+        first user does not pay for one-time costs like loading models or establishing
+        connections. By default, this does nothing. This method can also be defined as
+        coroutine.
+        """
+
+    def shutdown(self) -> None:
+        """Release the resources of the component.
+
+        This is called when a deployment shuts down, e.g. to stop background threads.
+        By default, this does nothing. This method can also be defined as coroutine.
+        """
+
     # FIXME: rename this to reflect that these methods can be parametrized from the chat
     #  level
     __ragna_protocol_methods__: list[str]
@@ -122,6 +149,13 @@ class Source(pydantic.BaseModel):
         return hash(self.id)
 
 
+# Collects the number of candidates that source storages report while retrieving. It is
+# set by ragna.core.Chat for each retrieval.
+_NUM_CANDIDATES: contextvars.ContextVar[list[int] | None] = contextvars.ContextVar(
+    "num_candidates", default=None
+)
+
+
 class SourceStorage(Component, abc.ABC):
     __ragna_protocol_methods__ = ["store", "retrieve"]
 
@@ -153,6 +187,97 @@ class SourceStorage(Component, abc.ABC):
         """
         ...
 
+    async def retrieve_many(
+        self,
+        corpus_name: str,
+        metadata_filters: list[MetadataFilter | None],
+        prompts: list[str],
+        **retrieve_params: Any,
+    ) -> list[list[Source]]:
+        """Retrieve sources for multiple prompts at once.
+
+        By default, this calls [`retrieve`][ragna.core.SourceStorage.retrieve] for
+        each prompt. Source storages that can embed and search multiple prompts in a
+        single call should override this method. Since it receives the same parameters
+        as [`retrieve`][ragna.core.SourceStorage.retrieve], the extra parameters of
+        both methods have to match.
+
+        Args:
+            corpus_name: Name of the corpus to retrieve sources from.
+            metadata_filters: Filters to select available sources. One for each
+                prompt.
+            prompts: Prompts to retrieve sources for.
+            **retrieve_params: Extra parameters passed to
+                [`retrieve`][ragna.core.SourceStorage.retrieve].
+
+        Returns:
+            Matching sources ordered by relevance for each prompt.
+
+        """
+        self._check_retrieve_many_inputs(metadata_filters, prompts)
+        return [
+            await as_awaitable(
+                self.retrieve,
+                corpus_name,
+                metadata_filter,
+                prompt,
+                **retrieve_params,
+            )
+            for metadata_filter, prompt in zip(metadata_filters, prompts, strict=True)
+        ]
+
+    def preprocess(self, documents: list[Document]) -> None:
+        """Preprocess documents ahead of storing them.
+
+        This is called in the background after documents were uploaded, if
+        [`ingest_on_upload`][ragna.deploy.Config.ingest_on_upload] is enabled. Source
+        storages that extract and chunk documents while storing them can do it here
+        and cache the results, such that a later call of
+        [`store`][ragna.core.SourceStorage.store] is faster. By default, this does
+        nothing.
+
+        Args:
+            documents: Documents to preprocess.
+        """
+
+    def optimize(self, corpus_name: str | None = None) -> bool:
+        """Optimize the on-disk layout of corpuses.
+
+        This is invoked by `ragna corpus optimize`. Source storages that degrade
+        after many small writes, e.g. by accumulating small files or old versions,
+        should compact them here. By default, this does nothing.
+
+        Args:
+            corpus_name: Only optimize this corpus. If omitted, all corpuses are
+                optimized.
+
+        Returns:
+            Whether the source storage optimized anything.
+        """
+        return False
+
+    def _report_num_candidates(self, num_candidates: int) -> None:
+        # Source storages can call this while retrieving with the number of chunks
+        # they considered, e.g. the ones matching the metadata filter. It ends up in
+        # the timings of the answer. If nothing is reported, the number of retrieved
+        # sources is used instead.
+        collected = _NUM_CANDIDATES.get()
+        if collected is not None:
+            collected.append(num_candidates)
+
+    def _check_retrieve_many_inputs(
+        self, metadata_filters: list[MetadataFilter | None], prompts: list[str]
+    ) -> None:
+        if len(metadata_filters) != len(prompts):
+            raise RagnaException(
+                "The number of metadata filters and prompts does not match",
+                source_storage=self.__class__.display_name(),
+                num_metadata_filters=len(metadata_filters),
+                num_prompts=len(prompts),
+                http_status_code=status.HTTP_400_BAD_REQUEST,
+                http_detail=RagnaException.MESSAGE,
+            )
+
     def list_corpuses(self) -> list[str]:
         """List available corpuses.
 
@@ -204,12 +329,45 @@ class MessageRole(str, enum.Enum):
     ASSISTANT = "assistant"
 
 
+class MessageTimings(pydantic.BaseModel):
+    """Data class for the timings and counters of producing an answer.
+
+    All times are measured from the moment the prompt was received. Fields that are
+    not known yet, e.g. while the answer is still streamed, are `None`.
+
+    Attributes
+        retrieve_ms: Time to retrieve the sources.
+        num_candidates: Total number of chunks the source storage(s) scored or
+            filtered before taking the top-k, e.g. the ones matching the metadata
+            filter. Source storages report it while retrieving. For those that don't,
+            this falls back to the number of sources they returned.
+        num_sources: Number of sources passed to the assistant.
+        num_source_tokens: Number of tokens of the sources passed to the assistant.
+        ttft_ms: Time to the first chunk of the answer.
+        num_answer_chunks: Number of chunks the answer was streamed in.
+        chunks_per_second: Streaming rate of the answer after the first chunk. For
+            most assistants a chunk corresponds to a single token.
+        total_ms: Time to the last chunk of the answer.
+    """
+
+    retrieve_ms: float | None = None
+    num_candidates: int | None = None
+    num_sources: int | None = None
+    num_source_tokens: int | None = None
+    ttft_ms: float | None = None
+    num_answer_chunks: int | None = None
+    chunks_per_second: float | None = None
+    total_ms: float | None = None
+
+
 class Message:
     """Data class for messages.
 
     Attributes
         role: The message producer.
         sources: The sources used to produce the message.
+        timings: The timings and counters of producing the message. Only set for
+            answers produced by [ragna.core.Chat.answer][].
 
     !!! tip "See also"
 
@@ -226,6 +384,7 @@ class Message:
         sources: list[Source] | None = None,
         id: uuid.UUID | None = None,
         timestamp: datetime | None = None,
+        timings: MessageTimings | None = None,
     ) -> None:
         if isinstance(content, str):
             self._content: str = content
@@ -243,6 +402,8 @@ class Message:
             timestamp = datetime.now(timezone.utc)
         self.timestamp = timestamp
 
+        self.timings = timings
+
     async def __aiter__(self) -> AsyncIterator[str]:
         if hasattr(self, "_content"):
             yield self._content
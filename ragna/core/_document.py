@@ -1,19 +1,28 @@
 from __future__ import annotations
 
 import abc
+import contextlib
+import hashlib
+import importlib.metadata
 import io
+import itertools
 import mimetypes
+import mmap
+import os
 import uuid
+from collections import deque
 from collections.abc import AsyncIterator, Iterator
-from functools import cached_property
+from functools import cached_property, partial
 from pathlib import Path
-from typing import Any, TypeVar
+from typing import Any, BinaryIO, TypeVar
 
 import aiofiles
 from pydantic import BaseModel
 
 import ragna
+from ragna._utils import ProcessPool
 
+from ._artifact_cache import ARTIFACT_CACHE
 from ._utils import PackageRequirement, RagnaException, Requirement, RequirementsMixin
 
 
@@ -36,6 +45,9 @@ class Document(RequirementsMixin, abc.ABC):
         self.mime_type = (
             mime_type or mimetypes.guess_type(name)[0] or "application/octet-stream"
         )
+        # SHA-256 hash of the content if it is already known, e.g. because it was
+        # computed while writing the content. This avoids hashing the content again.
+        self._content_hash: str | None = None
 
     @staticmethod
     def supported_suffixes() -> set[str]:
@@ -57,10 +69,77 @@ class Document(RequirementsMixin, abc.ABC):
         return handler
 
     @abc.abstractmethod
-    def read(self) -> bytes: ...
+    def read(self) -> bytes:
+        """Read the full contents of the document.
+
+        Prefer [ragna.core.Document.open][] or [ragna.core.Document.buffer][] for
+        large documents, since they can avoid holding a copy of the contents in
+        memory.
+        """
+        ...
+
+    def open(self) -> BinaryIO:
+        """Open the document as binary file object.
+
+        Defaults to wrapping the output of [ragna.core.Document.read][]. Subclasses
+        that can stream their contents should override this.
+
+        Returns:
+            File object that also needs to be closed, e.g. by using it as context
+            manager.
+        """
+        return io.BytesIO(self.read())
+
+    @contextlib.contextmanager
+    def buffer(self) -> Iterator[memoryview]:
+        """Access the contents of the document as read-only buffer.
+
+        Defaults to a view of the output of [ragna.core.Document.read][]. Subclasses
+        that can map their contents into memory should override this.
+
+        The buffer must not be used after the context is exited.
+        """
+        with memoryview(self.read()) as buffer:
+            yield buffer
+
+    def _artifact_cache_key(self) -> str:
+        # The key only depends on the contents of the document and not on its ID or
+        # name. Thus, the same file uploaded multiple times shares the artifacts.
+        content_hash = self._content_hash
+        if content_hash is None:
+            with self.buffer() as buffer:
+                content_hash = hashlib.sha256(buffer).hexdigest()
+        handler_cls = type(self.handler)
+        return (
+            f"pages:{handler_cls.__module__}.{handler_cls.__qualname__}"
+            f":{handler_cls.version()}:{content_hash}"
+        )
 
     def extract_pages(self) -> Iterator[Page]:
-        yield from self.handler.extract_pages(self)
+        """Extract the pages of the document with its handler.
+
+        The extracted pages are cached in the local root keyed by the contents of the
+        document and the [version][ragna.core.DocumentHandler.version] of the handler.
+        Set the `RAGNA_ARTIFACT_CACHE_MAX_SIZE` environment variable to limit the size
+        of the cache in bytes or to `0` to disable it.
+        """
+        if not ARTIFACT_CACHE.enabled:
+            yield from self.handler.extract_pages(self)
+            return
+
+        key = self._artifact_cache_key()
+        cached_pages = ARTIFACT_CACHE.get(key)
+        if cached_pages is not None:
+            for page in cached_pages:
+                yield Page.model_validate(page)
+            return
+
+        pages = []
+        for page in self.handler.extract_pages(self):
+            pages.append(page)
+            yield page
+        # We only get here if all pages were extracted. Thus, we never cache a subset.
+        ARTIFACT_CACHE.set(key, [page.model_dump() for page in pages])
 
 
 class LocalDocument(Document):
@@ -138,19 +217,59 @@ class LocalDocument(Document):
                 "File already exists", path=self.path, http_detail=RagnaException.EVENT
             )
 
-        async with aiofiles.open(self.path, "wb") as file:
-            async for content in stream:
-                await file.write(content)
-
-    def read(self) -> bytes:
+        # We write to a temporary file first and only move it in place after the
+        # stream is exhausted. Thus, a failed or aborted upload never leaves a partial
+        # document behind that could be read afterwards.
+        tmp_path = self.path.with_name(f".{self.path.name}-{uuid.uuid4().hex}.part")
+        # The hash is computed while the content passes through anyway, such that
+        # extracting the pages afterwards does not have to read the file again just to
+        # look up the artifact cache.
+        content_hash = hashlib.sha256()
+        try:
+            async with aiofiles.open(tmp_path, "wb") as file:
+                async for content in stream:
+                    content_hash.update(content)
+                    await file.write(content)
+            tmp_path.replace(self.path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+        self._content_hash = content_hash.hexdigest()
+
+    def _check_is_file(self) -> None:
         if not self.path.is_file():
             raise RagnaException(
                 "File does not exist", path=self.path, http_detail=RagnaException.EVENT
             )
 
+    def read(self) -> bytes:
+        self._check_is_file()
         with open(self.path, "rb") as file:
             return file.read()
 
+    def open(self) -> BinaryIO:
+        self._check_is_file()
+        return open(self.path, "rb")  # noqa: SIM115
+
+    @contextlib.contextmanager
+    def buffer(self) -> Iterator[memoryview]:
+        self._check_is_file()
+        with open(self.path, "rb") as file:
+            # Empty files cannot be mapped into memory.
+            if os.fstat(file.fileno()).st_size == 0:
+                with memoryview(b"") as buffer:
+                    yield buffer
+                return
+
+            # The pages of the file are only loaded into memory when they are accessed
+            # and can be evicted again by the operating system. Thus, even large files
+            # do not have to fit into memory.
+            with (
+                mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped,
+                memoryview(mapped) as buffer,
+            ):
+                yield buffer
+
 
 class Page(BaseModel):
     """Dataclass for pages of a document
@@ -174,6 +293,27 @@ class DocumentHandler(RequirementsMixin, abc.ABC):
         """Returns Suffixes supported by this document handler."""
         pass
 
+    @classmethod
+    def version(cls) -> str:
+        """Version of the page extraction.
+
+        Extracted pages are cached keyed by the contents of the document and this
+        version. Thus, it needs to change whenever the extraction changes. Defaults to
+        the versions of `ragna` and the package requirements of the handler.
+        Subclasses that are not versioned alongside `ragna` should override this.
+        """
+        return ",".join(
+            [
+                f"ragna=={ragna.__version__}",
+                *(
+                    f"{requirement._requirement.name}=="
+                    f"{importlib.metadata.version(requirement._requirement.name)}"
+                    for requirement in cls.requirements()
+                    if isinstance(requirement, PackageRequirement)
+                ),
+            ]
+        )
+
     @abc.abstractmethod
     def extract_pages(self, document: Document) -> Iterator[Page]:
         """Extract pages from a document.
@@ -238,14 +378,103 @@ class PdfDocumentHandler(DocumentHandler):
         #  prominent. Should we expose the others here as well?
         return [".pdf"]
 
+    # Extracting the text of a page is CPU bound and independent of the other pages.
+    # Thus, large documents are split into ranges of this many pages that are extracted
+    # in parallel.
+    _PAGES_PER_TASK = 50
+
     def extract_pages(self, document: Document) -> Iterator[Page]:
+        """Extract pages from a document.
+
+        Set the `RAGNA_PDF_EXTRACTION_PROCESSES` environment variable to a positive
+        number to extract documents with at least twice `_PAGES_PER_TASK` pages that
+        are available on the local file system by that many worker processes. This
+        is disabled by default, since the workers are spawned and thus scripts need
+        to guard their entry point with `if __name__ == "__main__":`.
+
+        Args:
+            document: Document to extract pages from.
+
+        Returns:
+            Extracted pages in order.
+        """
         import fitz
 
-        with fitz.Document(
-            stream=document.read(), filetype=Path(document.name).suffix
-        ) as document:
-            for number, page in enumerate(document, 1):
-                yield Page(text=page.get_text(sort=True), number=number)
+        filetype = Path(document.name).suffix
+        if (
+            isinstance(document, LocalDocument)
+            and document.path.is_file()
+            and _PDF_PROCESS_POOL.num_processes > 1
+        ):
+            with fitz.Document(document.path, filetype=filetype) as pdf:
+                num_pages = pdf.page_count
+            if num_pages >= 2 * self._PAGES_PER_TASK:
+                yield from self._extract_pages_parallel(
+                    document.path, filetype=filetype, num_pages=num_pages
+                )
+                return
+
+        with contextlib.ExitStack() as stack:
+            if isinstance(document, LocalDocument) and document.path.is_file():
+                # Opening by path lets PyMuPDF read the file on demand instead of
+                # holding all of it in memory.
+                pdf = fitz.Document(document.path, filetype=filetype)
+            else:
+                pdf = fitz.Document(
+                    stream=stack.enter_context(document.buffer()), filetype=filetype
+                )
+            with pdf:
+                for number, page in enumerate(pdf, 1):
+                    yield Page(text=page.get_text(sort=True), number=number)
+
+    def _extract_pages_parallel(
+        self, path: Path, *, filetype: str, num_pages: int
+    ) -> Iterator[Page]:
+        executor = _PDF_PROCESS_POOL.executor()
+        assert executor is not None
+
+        # Each worker opens the file by itself. Thus, only the path and the page range
+        # are sent to the workers rather than the contents of the document.
+        submit = partial(executor.submit, _extract_pdf_pages, path, filetype=filetype)
+        ranges = (
+            (start, min(start + self._PAGES_PER_TASK, num_pages))
+            for start in range(0, num_pages, self._PAGES_PER_TASK)
+        )
+        # We only keep a bounded number of ranges in flight. Otherwise, the extracted
+        # pages would pile up in memory if the consumer is slower than the workers.
+        futures = deque(
+            submit(start=start, stop=stop)
+            for start, stop in itertools.islice(
+                ranges, 2 * _PDF_PROCESS_POOL.num_processes
+            )
+        )
+        try:
+            # The ranges are extracted concurrently, but we only yield them in order.
+            # Thus, the consumer can start working on the first pages while the rest
+            # are still being extracted.
+            while futures:
+                pages = futures.popleft().result()
+                for start, stop in itertools.islice(ranges, 1):
+                    futures.append(submit(start=start, stop=stop))
+                yield from pages
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+_PDF_PROCESS_POOL = ProcessPool("RAGNA_PDF_EXTRACTION_PROCESSES")
+
+
+def _extract_pdf_pages(
+    path: Path, *, filetype: str, start: int, stop: int
+) -> list[Page]:
+    import fitz
+
+    with fitz.Document(path, filetype=filetype) as pdf:
+        return [
+            Page(text=pdf[idx].get_text(sort=True), number=idx + 1)
+            for idx in range(start, stop)
+        ]
 
 
 @DOCUMENT_HANDLERS.load_if_available
@@ -272,7 +501,8 @@ class DocxDocumentHandler(DocumentHandler):
     def extract_pages(self, document: Document) -> Iterator[Page]:
         import docx
 
-        document_docx = docx.Document(io.BytesIO(document.read()))
+        with document.open() as file:
+            document_docx = docx.Document(file)
         for paragraph in document_docx.paragraphs:
             text = paragraph.text
             if len(text) > 0:
@@ -299,7 +529,8 @@ class PptxDocumentHandler(DocumentHandler):
     def extract_pages(self, document: Document) -> Iterator[Page]:
         import pptx
 
-        document_pptx = pptx.Presentation(io.BytesIO(document.read()))
+        with document.open() as file:
+            document_pptx = pptx.Presentation(file)
         for number, slide in enumerate(document_pptx.slides, 1):
             text = "\n\n".join(
                 shape.text
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import asyncio
 import collections.abc
 import contextlib
 import itertools
+import time
 import uuid
 from collections import defaultdict
 from collections.abc import AsyncIterator, Awaitable, Callable, Collection, Iterator
@@ -18,11 +20,21 @@ from typing import (
 
 import pydantic
 import pydantic_core
-from fastapi import status
+from starlette import status
 
+from ragna import _tracing
 from ragna._utils import as_async_iterator, as_awaitable, default_user
 
-from ._components import Assistant, Component, Message, MessageRole, SourceStorage
+from ._components import (
+    _NUM_CANDIDATES,
+    Assistant,
+    Component,
+    Message,
+    MessageRole,
+    MessageTimings,
+    Source,
+    SourceStorage,
+)
 from ._document import Document, LocalDocument
 from ._metadata_filter import MetadataFilter
 from ._utils import RagnaException, merge_models
@@ -34,6 +46,10 @@ T = TypeVar("T")
 C = TypeVar("C", bound=Component, covariant=True)
 
 
+def _elapsed_ms(start: float) -> float:
+    return (time.perf_counter() - start) * 1e3
+
+
 class Rag(Generic[C]):
     """RAG workflow.
 
@@ -138,9 +154,11 @@ class Rag(Generic[C]):
         | Path
         | Collection[Document | str | Path] = None,
         *,
-        source_storage: SourceStorage | type[SourceStorage] | str,
+        source_storage: SourceStorage | type[SourceStorage] | str | None = None,
         assistant: Assistant | type[Assistant] | str,
         corpus_name: str = "default",
+        targets: Collection[tuple[SourceStorage | type[SourceStorage] | str, str]]
+        | None = None,
         **params: Any,
     ) -> Chat:
         """Create a new [ragna.core.Chat][].
@@ -154,18 +172,35 @@ class Rag(Generic[C]):
                 - Single document or a collection of documents to use. If any item is
                   not a [ragna.core.Document][], it is assumed to be a path and
                   [ragna.core.LocalDocument.from_path][] is invoked on it.
-                source_storage: Source storage to use.
+            source_storage: Source storage to use.
             assistant: Assistant to use.
             corpus_name: Corpus of documents to use.
+            targets: Pairs of source storage and corpus name to retrieve sources from
+                concurrently. Mutually exclusive with `source_storage`.
             **params: Additional parameters passed to the source storage and assistant.
 
         """
         return Chat(
             self,
             input=input,
-            source_storage=cast(SourceStorage, self._load_component(source_storage)),  # type: ignore[arg-type]
+            source_storage=(
+                cast(SourceStorage, self._load_component(source_storage))  # type: ignore[arg-type]
+                if source_storage is not None
+                else None
+            ),
             assistant=cast(Assistant, self._load_component(assistant)),  # type: ignore[arg-type]
             corpus_name=corpus_name,
+            targets=(
+                [
+                    (
+                        cast(SourceStorage, self._load_component(source_storage)),  # type: ignore[arg-type]
+                        corpus_name,
+                    )
+                    for source_storage, corpus_name in targets
+                ]
+                if targets is not None
+                else None
+            ),
             **params,
         )
 
@@ -219,6 +254,10 @@ class Chat:
         source_storage: Source storage to use.
         assistant: Assistant to use.
         corpus_name: Corpus of documents to use.
+        targets: Pairs of source storage and corpus name to retrieve sources from
+            concurrently. The results are merged with
+            [reciprocal rank fusion](https://dl.acm.org/doi/10.1145/1571941.1572114).
+            Mutually exclusive with `source_storage`.
         **params: Additional parameters passed to the source storage and assistant.
 
     """
@@ -233,17 +272,21 @@ class Chat:
         | Path
         | Collection[Document | str | Path] = None,
         *,
-        source_storage: SourceStorage,
+        source_storage: SourceStorage | None = None,
         assistant: Assistant,
         corpus_name: str = "default",
+        targets: Collection[tuple[SourceStorage, str]] | None = None,
         **params: Any,
     ) -> None:
         self._rag = rag
 
         self.documents, self.metadata_filter, self._prepared = self._parse_input(input)
-        self.source_storage = source_storage
+        self.targets = self._parse_targets(
+            source_storage=source_storage, corpus_name=corpus_name, targets=targets
+        )
+        # For chats with multiple targets, these refer to the first one.
+        self.source_storage, self.corpus_name = self.targets[0]
         self.assistant = assistant
-        self.corpus_name = corpus_name
 
         self.params = SpecialChatParams(**params).model_dump()
         self._unpacked_params = self._unpack_chat_params(self.params)
@@ -268,8 +311,11 @@ class Chat:
         if self._prepared:
             return welcome
 
-        await self._as_awaitable(
-            self.source_storage.store, self.corpus_name, self.documents
+        await asyncio.gather(
+            *[
+                self._store(source_storage, corpus_name)
+                for source_storage, corpus_name in self.targets
+            ]
         )
         self._prepared = True
 
@@ -287,17 +333,25 @@ class Chat:
                 [`prepare`][ragna.core.Chat.prepare]d.
 
         """
-        if not self._prepared:
-            raise RagnaException(
-                "Chat is not prepared",
-                chat=self,
-                http_status_code=status.HTTP_400_BAD_REQUEST,
-                http_detail=RagnaException.EVENT,
+        self._check_prepared()
+
+        start = time.perf_counter()
+        with _tracing.span(
+            "Chat.answer", assistant=self.assistant.display_name()
+        ) as span:
+            sources, num_candidates = await self._retrieve(prompt)
+            timings = MessageTimings(
+                retrieve_ms=_elapsed_ms(start),
+                num_candidates=num_candidates,
+                num_sources=len(sources),
+                num_source_tokens=sum(source.num_tokens for source in sources),
+            )
+            _tracing.set_attributes(
+                span,
+                num_candidates=timings.num_candidates,
+                num_sources=timings.num_sources,
+                num_source_tokens=timings.num_source_tokens,
             )
-
-        sources = await self._as_awaitable(
-            self.source_storage.retrieve, self.corpus_name, self.metadata_filter, prompt
-        )
         if not sources:
             event = "Unable to retrieve any sources."
             if not self.documents and self.metadata_filter is None:
@@ -320,11 +374,14 @@ class Chat:
         self._messages.append(question)
 
         answer = Message(
-            content=self._as_async_iterator(
-                self.assistant.answer, self._messages.copy()
+            content=self._time_answer(
+                self._as_async_iterator(self.assistant.answer, self._messages.copy()),
+                timings=timings,
+                start=start,
             ),
             role=MessageRole.ASSISTANT,
             sources=sources,
+            timings=timings,
         )
         if not stream:
             await answer.read()
@@ -333,6 +390,207 @@ class Chat:
 
         return answer
 
+    async def retrieve(self, prompt: str) -> list[Source]:
+        """Retrieve the sources for a prompt without answering it.
+
+        This retrieves the same sources that [`answer`][ragna.core.Chat.answer] would
+        pass to the assistant, e.g. to evaluate the retrieval on its own. The prompt is
+        not added to the chat history.
+
+        Returns
+            Sources for the prompt ordered by relevance.
+
+        Raises
+            ragna.core.RagnaException: If chat is not
+                [`prepare`][ragna.core.Chat.prepare]d.
+
+        """
+        self._check_prepared()
+
+        sources, _ = await self._retrieve(prompt)
+        return sources
+
+    def _check_prepared(self) -> None:
+        if not self._prepared:
+            raise RagnaException(
+                "Chat is not prepared",
+                chat=self,
+                http_status_code=status.HTTP_400_BAD_REQUEST,
+                http_detail=RagnaException.EVENT,
+            )
+
+    async def _time_answer(
+        self,
+        content_stream: AsyncIterator[str],
+        *,
+        timings: MessageTimings,
+        start: float,
+    ) -> AsyncIterator[str]:
+        with _tracing.detached_span(
+            "Assistant.answer", assistant=self.assistant.display_name()
+        ) as span:
+            num_chunks = 0
+            first_chunk_time = None
+            async for chunk in content_stream:
+                if first_chunk_time is None:
+                    first_chunk_time = time.perf_counter()
+                    timings.ttft_ms = (first_chunk_time - start) * 1e3
+                num_chunks += 1
+                yield chunk
+
+            timings.total_ms = _elapsed_ms(start)
+            timings.num_answer_chunks = num_chunks
+            if first_chunk_time is not None and num_chunks > 1:
+                timings.chunks_per_second = (num_chunks - 1) / (
+                    time.perf_counter() - first_chunk_time
+                )
+
+            _tracing.set_attributes(
+                span,
+                ttft_ms=timings.ttft_ms,
+                num_answer_chunks=timings.num_answer_chunks,
+                chunks_per_second=timings.chunks_per_second,
+            )
+
+    async def _store(self, source_storage: SourceStorage, corpus_name: str) -> None:
+        with _tracing.span(
+            "SourceStorage.store",
+            source_storage=source_storage.display_name(),
+            corpus_name=corpus_name,
+            num_documents=len(self.documents) if self.documents is not None else None,
+        ):
+            await self._as_awaitable(source_storage.store, corpus_name, self.documents)
+
+    async def _retrieve_from(
+        self, source_storage: SourceStorage, corpus_name: str, prompt: str
+    ) -> tuple[list[Source], int]:
+        with _tracing.span(
+            "SourceStorage.retrieve",
+            source_storage=source_storage.display_name(),
+            corpus_name=corpus_name,
+        ) as span:
+            reported_num_candidates: list[int] = []
+            token = _NUM_CANDIDATES.set(reported_num_candidates)
+            try:
+                sources = await self._as_awaitable(
+                    source_storage.retrieve, corpus_name, self.metadata_filter, prompt
+                )
+            finally:
+                _NUM_CANDIDATES.reset(token)
+            num_candidates = (
+                sum(reported_num_candidates)
+                if reported_num_candidates
+                else len(sources)
+            )
+            _tracing.set_attributes(
+                span,
+                num_candidates=num_candidates,
+                num_sources=len(sources),
+                num_source_tokens=sum(source.num_tokens for source in sources),
+            )
+            return sources, num_candidates
+
+    async def _retrieve(self, prompt: str) -> tuple[list[Source], int]:
+        if len(self.targets) == 1:
+            return await self._retrieve_from(
+                self.source_storage, self.corpus_name, prompt
+            )
+
+        # Querying the targets concurrently keeps the latency close to the one of the
+        # slowest source storage rather than the sum of all of them.
+        results = await asyncio.gather(
+            *[
+                self._retrieve_from(source_storage, corpus_name, prompt)
+                for source_storage, corpus_name in self.targets
+            ]
+        )
+        ranked_sources = [sources for sources, _ in results]
+        num_candidates = sum(num_candidates for _, num_candidates in results)
+        return self._fuse_sources(ranked_sources), num_candidates
+
+    # Constant from the original paper. It dampens the impact of high ranks in a single
+    # list on the fused ranking.
+    _RECIPROCAL_RANK_FUSION_K = 60
+
+    def _fuse_sources(self, ranked_sources: list[list[Source]]) -> list[Source]:
+        scores: dict[tuple[uuid.UUID, str, str], float] = defaultdict(float)
+        fused: dict[tuple[uuid.UUID, str, str], Source] = {}
+        for sources in ranked_sources:
+            for rank, source in enumerate(sources, 1):
+                # The same chunk might be stored in multiple targets, e.g. during a
+                # migration, but is very likely not stored under the same ID.
+                key = (source.document_id, source.location, source.content)
+                scores[key] += 1 / (self._RECIPROCAL_RANK_FUSION_K + rank)
+                fused.setdefault(key, source)
+
+        sources = [
+            fused[key]
+            for key in sorted(scores, key=lambda key: scores[key], reverse=True)
+        ]
+
+        # Each source storage only adheres to the token budget for its own sources.
+        # Thus, we need to enforce the budget of the chat again for the fused sources.
+        # If it was not passed explicitly, the smallest default of the source storages
+        # is used.
+        max_tokens = self.params.get("num_tokens") or min(
+            (
+                num_tokens
+                for source_storage, _ in self.targets
+                if (
+                    num_tokens := self._unpacked_params[source_storage.retrieve].get(
+                        "num_tokens"
+                    )
+                )
+            ),
+            default=None,
+        )
+        if not max_tokens:
+            return sources
+
+        taken_sources = []
+        total = 0
+        for source in sources:
+            total += source.num_tokens
+            if total > max_tokens:
+                break
+
+            taken_sources.append(source)
+
+        return taken_sources
+
+    def _parse_targets(
+        self,
+        *,
+        source_storage: SourceStorage | None,
+        corpus_name: str,
+        targets: Collection[tuple[SourceStorage, str]] | None,
+    ) -> list[tuple[SourceStorage, str]]:
+        if targets is None:
+            if source_storage is None:
+                raise RagnaException(
+                    "Either a source storage or targets have to be passed",
+                    http_status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    http_detail=RagnaException.EVENT,
+                )
+            return [(source_storage, corpus_name)]
+
+        if source_storage is not None:
+            raise RagnaException(
+                "A source storage and targets are mutually exclusive",
+                http_status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                http_detail=RagnaException.EVENT,
+            )
+
+        # Deduplicate while preserving the order
+        targets = list(dict.fromkeys(targets))
+        if not targets:
+            raise RagnaException(
+                "At least one target is required",
+                http_status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                http_detail=RagnaException.EVENT,
+            )
+        return targets
+
     def _parse_input(
         self,
         input: MetadataFilter
@@ -377,9 +635,13 @@ class Chat:
         # 2. Prepare the distribution of the parameters to the protocol method that
         #    requested them. The actual distribution happens in self._run and
         #    self._run_gen, but is only a dictionary lookup by then.
+        components = [
+            *dict.fromkeys(source_storage for source_storage, _ in self.targets),
+            self.assistant,
+        ]
         component_models = {
             getattr(component, name): model
-            for component in [self.source_storage, self.assistant]
+            for component in components
             for (_, name), model in component._protocol_models().items()
         }
 
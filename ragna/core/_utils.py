@@ -3,11 +3,16 @@ from __future__ import annotations
 import abc
 import enum
 import functools
+import hashlib
 import importlib
 import importlib.metadata
+import json
 import os
+import shutil
+import uuid
 from collections import defaultdict
 from collections.abc import Collection
+from pathlib import Path
 from typing import Any, cast
 
 import packaging.requirements
@@ -64,14 +69,115 @@ class Requirement(abc.ABC):
         return repr(self) == repr(other)
 
 
+class ModelArtifact(abc.ABC):
+    """Model artifact, e.g. weights or a vocabulary, that a component loads at runtime.
+
+    Artifacts are pulled into a dedicated directory inside the local root, e.g. with
+    `ragna models pull`. If available, components should load the artifact from there
+    to avoid accessing the network.
+    """
+
+    _CHECKSUMS_FILE_NAME = ".checksums.json"
+
+    @property
+    @abc.abstractmethod
+    def name(self) -> str:
+        """Unique name of the artifact. Also used as name of its directory."""
+        ...
+
+    @abc.abstractmethod
+    def _pull(self, path: Path) -> None:
+        """Download the artifact.
+
+        Args:
+            path: Empty directory to download the artifact into.
+        """
+        ...
+
+    @property
+    def path(self) -> Path:
+        """Directory of the artifact."""
+        from ragna._utils import local_root
+
+        return local_root() / "models" / self.name
+
+    def is_available(self) -> bool:
+        """Whether the artifact was pulled."""
+        return (self.path / self._CHECKSUMS_FILE_NAME).is_file()
+
+    def _compute_checksums(self, path: Path) -> dict[str, str]:
+        checksums = {}
+        for file in sorted(path.rglob("*")):
+            if not file.is_file() or file.name == self._CHECKSUMS_FILE_NAME:
+                continue
+            hash = hashlib.sha256()
+            with open(file, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    hash.update(chunk)
+            checksums[file.relative_to(path).as_posix()] = hash.hexdigest()
+        return checksums
+
+    def verify(self) -> bool:
+        """Whether the artifact was pulled and is unchanged since."""
+        if not self.is_available():
+            return False
+
+        with open(self.path / self._CHECKSUMS_FILE_NAME) as file:
+            checksums = json.load(file)
+        return cast(bool, self._compute_checksums(self.path) == checksums)
+
+    def pull(self, *, force: bool = False) -> bool:
+        """Pull the artifact.
+
+        Args:
+            force: Pull the artifact even if a valid one is available.
+
+        Returns:
+            Whether the artifact was pulled.
+        """
+        if not force and self.verify():
+            return False
+
+        # We pull into a temporary directory first, such that an interrupted pull
+        # never leaves a partial artifact that is picked up by the components.
+        tmp_path = self.path.with_name(f".{self.name}-{uuid.uuid4().hex}")
+        tmp_path.mkdir(parents=True)
+        try:
+            self._pull(tmp_path)
+            with open(tmp_path / self._CHECKSUMS_FILE_NAME, "w") as file:
+                json.dump(self._compute_checksums(tmp_path), file, indent=2)
+
+            if self.path.exists():
+                shutil.rmtree(self.path)
+            tmp_path.rename(self.path)
+        finally:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+        return True
+
+    def __repr__(self) -> str:
+        return self.name
+
+
 class RequirementsMixin:
     @classmethod
     def requirements(cls) -> list[Requirement]:
         return []
 
     @classmethod
-    def is_available(cls) -> bool:
-        return all(requirement.is_available() for requirement in cls.requirements())
+    def is_available(cls, *, deep: bool = False) -> bool:
+        """Whether all requirements are met.
+
+        Args:
+            deep: If `True`, package requirements also check whether their modules can
+                be imported. See [ragna.core.PackageRequirement.is_available][].
+        """
+        return all(
+            requirement.is_available(deep=deep)
+            if isinstance(requirement, PackageRequirement)
+            else requirement.is_available()
+            for requirement in cls.requirements()
+        )
 
 
 class PackageRequirement(Requirement):
@@ -82,7 +188,17 @@ class PackageRequirement(Requirement):
         self._exclude_modules = set(exclude_modules)
 
     @functools.cache
-    def is_available(self) -> bool:
+    def is_available(self, *, deep: bool = False) -> bool:
+        """Whether a matching distribution is installed.
+
+        By default, this only checks the metadata of the installed distributions and
+        thus is cheap. Importing the package might still fail, e.g. due to a broken
+        installation or a missing system library.
+
+        Args:
+            deep: If `True`, also import every module of the distribution. This is
+                more reliable, but can take seconds for large packages.
+        """
         try:
             distribution = importlib.metadata.distribution(self._requirement.name)
         except importlib.metadata.PackageNotFoundError:
@@ -91,6 +207,9 @@ class PackageRequirement(Requirement):
         if distribution.version not in self._requirement.specifier:
             return False
 
+        if not deep:
+            return True
+
         for module_name in {
             module_name
             for module_name, distribution_names in packages_distributions().items()
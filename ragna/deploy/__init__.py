@@ -11,20 +11,41 @@ __all__ = [
     "RedisKeyValueStore",
 ]
 
-from ._auth import (
-    Auth,
-    DummyBasicAuth,
-    GithubOAuth,
-    JhubAppsAuth,
-    JupyterhubServerProxyAuth,
-    NoAuth,
-)
-from ._config import Config
-from ._key_value_store import InMemoryKeyValueStore, KeyValueStore, RedisKeyValueStore
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ._auth import (
+        Auth,
+        DummyBasicAuth,
+        GithubOAuth,
+        JhubAppsAuth,
+        JupyterhubServerProxyAuth,
+        NoAuth,
+    )
+    from ._config import Config
+    from ._key_value_store import (
+        InMemoryKeyValueStore,
+        KeyValueStore,
+        RedisKeyValueStore,
+    )
 
 # isort: split
 
-from ragna._utils import fix_module
+from ragna._utils import lazy_module_attributes
 
-fix_module(globals())
-del fix_module
+__getattr__, __dir__ = lazy_module_attributes(
+    globals(),
+    {
+        "Auth": "._auth",
+        "Config": "._config",
+        "DummyBasicAuth": "._auth",
+        "GithubOAuth": "._auth",
+        "InMemoryKeyValueStore": "._key_value_store",
+        "JhubAppsAuth": "._auth",
+        "JupyterhubServerProxyAuth": "._auth",
+        "KeyValueStore": "._key_value_store",
+        "NoAuth": "._auth",
+        "RedisKeyValueStore": "._key_value_store",
+    },
+)
+del lazy_module_attributes
@@ -1,15 +1,19 @@
-import io
 import uuid
-from collections.abc import AsyncIterator
+from collections.abc import AsyncIterator, Iterator
 from typing import Annotated, Any
 
 import pydantic
 from fastapi import APIRouter, Body, UploadFile
-from fastapi.responses import StreamingResponse
+from fastapi.responses import Response, StreamingResponse
+
+from ragna.core import LocalDocument
 
 from . import _schemas as schemas
 from ._auth import UserDependency
 from ._engine import Engine
+from ._utils import ConditionalFileResponse
+
+_CONTENT_CHUNK_SIZE = 64 * 1024
 
 
 def make_router(engine: Engine) -> APIRouter:
@@ -29,7 +33,7 @@ def make_router(engine: Engine) -> APIRouter:
     ) -> None:
         def make_content_stream(file: UploadFile) -> AsyncIterator[bytes]:
             async def content_stream() -> AsyncIterator[bytes]:
-                while content := await file.read(16 * 1024):
+                while content := await file.read(_CONTENT_CHUNK_SIZE):
                     yield content
 
             return content_stream()
@@ -51,17 +55,29 @@ def make_router(engine: Engine) -> APIRouter:
         return engine.get_document(user=user.name, id=id)
 
     @router.get("/documents/{id}/content")
-    async def get_document_content(
-        user: UserDependency, id: uuid.UUID
-    ) -> StreamingResponse:
+    async def get_document_content(user: UserDependency, id: uuid.UUID) -> Response:
         schema_document = engine.get_document(user=user.name, id=id)
         core_document = engine._to_core.document(schema_document)
-        headers = {"Content-Disposition": f"inline; filename={schema_document.name}"}
+
+        if isinstance(core_document, LocalDocument):
+            # This supports range requests, which lets PDF viewers only fetch the
+            # pages they display, as well as conditional requests for caching.
+            return ConditionalFileResponse(
+                core_document.path,
+                media_type=core_document.mime_type,
+                filename=schema_document.name,
+                content_disposition_type="inline",
+            )
+
+        def iter_content() -> Iterator[bytes]:
+            with core_document.open() as file:
+                while chunk := file.read(_CONTENT_CHUNK_SIZE):
+                    yield chunk
 
         return StreamingResponse(
-            io.BytesIO(core_document.read()),
+            iter_content(),
             media_type=core_document.mime_type,
-            headers=headers,
+            headers={"Content-Disposition": f"inline; filename={schema_document.name}"},
         )
 
     @router.get("/components")
@@ -107,12 +123,19 @@ def make_router(engine: Engine) -> APIRouter:
         id: uuid.UUID,
         prompt: Annotated[str, Body(..., embed=True)],
         stream: Annotated[bool, Body(..., embed=True)] = False,
+        timings: Annotated[bool, Body(..., embed=True)] = False,
     ) -> schemas.Message:
-        message_stream = engine.answer_stream(user=user.name, chat_id=id, prompt=prompt)
+        message_stream = engine.answer_stream(
+            user=user.name, chat_id=id, prompt=prompt, timings=timings
+        )
         answer = await anext(message_stream)
 
         if not stream:
-            content_chunks = [chunk.content async for chunk in message_stream]
+            content_chunks = []
+            async for chunk in message_stream:
+                content_chunks.append(chunk.content)
+                if chunk.timings is not None:
+                    answer.timings = chunk.timings
             answer.content += "".join(content_chunks)
             return answer
 
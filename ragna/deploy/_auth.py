@@ -11,13 +11,11 @@ from collections.abc import Awaitable, Callable
 from typing import TYPE_CHECKING, Annotated, cast
 
 import httpx
-import panel as pn
 import pydantic
 from fastapi import Depends, FastAPI, Request, status
 from fastapi.responses import HTMLResponse, RedirectResponse, Response
 from fastapi.security.utils import get_authorization_scheme_param
 from starlette.middleware.base import BaseHTTPMiddleware
-from tornado.web import create_signed_value
 
 from ragna._utils import as_awaitable, default_user
 from ragna.core import RagnaException
@@ -56,6 +54,9 @@ class SessionMiddleware(BaseHTTPMiddleware):
         self._sessions: KeyValueStore[Session] = config.key_value_store()
 
         if ui:
+            # Only import panel if the UI is requested, since it is slow to import.
+            import panel as pn
+
             pn.config.cookie_secret = self._PANEL_COOKIE_SECRET  # type: ignore[misc]
 
     _COOKIE_NAME = "ragna"
@@ -125,6 +126,8 @@ class SessionMiddleware(BaseHTTPMiddleware):
             # just for panel, we just inject them into the scope here, which will be
             # parsed by panel down the line. After this initial request, the values are
             # tied to the active session and don't have to be set again.
+            from tornado.web import create_signed_value
+
             extra_cookies: dict[str, str | bytes] = {
                 "user": session.user.name,
                 "id_token": base64.b64encode(json.dumps(session.user.data).encode()),
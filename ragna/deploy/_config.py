@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import itertools
 from pathlib import Path
-from typing import Annotated, ClassVar, cast
+from typing import Annotated, ClassVar, Literal, cast
 
 import tomlkit
 import tomlkit.container
@@ -81,12 +81,32 @@ class Config(BaseSettings):
         default_factory=lambda values: f"sqlite:///{values['local_root']}/ragna.db"
     )
 
+    upload_max_document_size: int = 512 * 1024**2
+    upload_concurrency: int = 4
+    upload_min_free_disk_space: int = 1024**3
+    ingest_on_upload: bool = False
+
+    metrics: bool = False
+
+    tracing: Literal["otlp", "file"] | None = None
+    tracing_otlp_endpoint: str = "http://127.0.0.1:4318/v1/traces"
+    tracing_file: Path = Field(
+        default_factory=lambda values: values["local_root"] / "traces.jsonl"
+    )
+
+    admin_users: list[str] = Field(default_factory=list)
+
+    profiling: bool = False
+    profiling_dir: Path = Field(
+        default_factory=lambda values: values["local_root"] / "profiles"
+    )
+
     @property
     def _url(self) -> str:
         return f"http://{self.hostname}:{self.port}{self.root_path}"
 
     def __str__(self) -> str:
-        toml = tomlkit.item(self.model_dump(mode="json"))
+        toml = tomlkit.item(self.model_dump(mode="json", exclude_none=True))
         self._set_multiline_array(toml)
         return toml.as_string()
 
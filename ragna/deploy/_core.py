@@ -1,9 +1,10 @@
+import asyncio
 import contextlib
 import threading
 import time
 import uuid
 import webbrowser
-from collections.abc import AsyncIterator, Callable
+from collections.abc import AsyncIterator
 from pathlib import Path
 from typing import cast
 
@@ -17,11 +18,14 @@ from fastapi.staticfiles import StaticFiles
 import ragna
 from ragna.core import RagnaException
 
+from . import _metrics as metrics
+from . import _profiling as profiling
 from . import _schemas as schemas
 from ._api import make_router as make_api_router
 from ._auth import UserDependency
 from ._config import Config
 from ._engine import Engine
+from ._tracing import TracingMiddleware, setup_tracing
 from ._ui import app as make_ui_app
 from ._utils import handle_localhost_origins, redirect, set_redirect_root_path
 
@@ -35,48 +39,30 @@ def make_app(
     open_browser: bool,
 ) -> FastAPI:
     set_redirect_root_path(config.root_path)
-
-    lifespan: Callable[[FastAPI], contextlib.AbstractAsyncContextManager] | None
-    if open_browser:
-
-        @contextlib.asynccontextmanager
-        async def lifespan(app: FastAPI) -> AsyncIterator[None]:
-            try:
-                browser = webbrowser.get()
-            except webbrowser.Error as error:
-                print(str(error))
-                yield
-                return
-
-            def target() -> None:
-                url = f"http://{config.hostname}:{config.port}"
-                client = httpx.Client(base_url=url)
-
-                def server_available() -> bool:
-                    try:
-                        return client.get("/health").is_success
-                    except httpx.ConnectError:
-                        return False
-
-                while not server_available():
-                    time.sleep(0.1)
-
-                browser.open(url)
-
-            # We are starting the browser on a thread, because the server can only
-            # become available _after_ the yield below. By setting daemon=True, the
-            # thread will automatically terminated together with the main thread. This
-            # is only relevant when the server never becomes available, e.g. if an error
-            # occurs. In this case our thread would be stuck in an endless loop.
-            thread = threading.Thread(target=target, daemon=True)
-            thread.start()
+    setup_tracing(config)
+    metrics.setup_metrics(config)
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+        # Warming up the components can take a while, e.g. to load embedding models.
+        # Thus, we do it in the background and report the progress on /ready rather
+        # than delaying the startup.
+        warmup = asyncio.create_task(engine.warmup())
+        if open_browser:
+            _open_browser(config)
+        try:
             yield
-
-    else:
-        lifespan = None
+        finally:
+            warmup.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await warmup
+            await engine.shutdown()
 
     app = FastAPI(title="Ragna", version=ragna.__version__, lifespan=lifespan)
 
+    if config.metrics:
+        app.add_middleware(metrics.MetricsMiddleware)
+
     app.add_middleware(
         CORSMiddleware,
         allow_origins=handle_localhost_origins(config.origins),
@@ -90,11 +76,20 @@ def make_app(
         ignore_unavailable_components=ignore_unavailable_components,
     )
 
+    if config.profiling:
+        profiling.check_requirements()
+        # This is added before the authentication, such that the latter wraps the
+        # profiling and the user is known.
+        app.add_middleware(profiling.ProfilingMiddleware, config=config)
+
     config.auth._add_to_app(app, config=config, engine=engine, api=api, ui=ui)
 
     if api:
         app.include_router(make_api_router(engine), prefix="/api")
 
+    if config.profiling:
+        app.include_router(profiling.make_router(config), prefix="/debug")
+
     if ui:
         ui_app = make_ui_app(engine)
         panel.io.fastapi.add_applications({"/ui": ui_app.index_page}, app=app)
@@ -113,6 +108,20 @@ def make_app(
     async def health() -> Response:
         return Response(b"", status_code=status.HTTP_200_OK)
 
+    if config.metrics:
+
+        @app.get("/metrics", include_in_schema=False)
+        async def get_metrics() -> Response:
+            content, media_type = metrics.render()
+            return Response(content, media_type=media_type)
+
+    @app.get("/ready")
+    async def ready(response: Response) -> schemas.Readiness:
+        readiness = engine.get_readiness()
+        if not readiness.ready:
+            response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return readiness
+
     @app.get("/version")
     async def version() -> str:
         return ragna.__version__
@@ -150,4 +159,39 @@ def make_app(
             content={"error": {"message": detail}},
         )
 
+    # This is added last to be the outermost middleware. Thus, the span of a request
+    # also covers the other middlewares, e.g. for authentication.
+    app.add_middleware(TracingMiddleware)
+
     return app
+
+
+def _open_browser(config: Config) -> None:
+    try:
+        browser = webbrowser.get()
+    except webbrowser.Error as error:
+        print(str(error))
+        return
+
+    def target() -> None:
+        url = f"http://{config.hostname}:{config.port}"
+        client = httpx.Client(base_url=url)
+
+        def server_available() -> bool:
+            try:
+                return client.get("/health").is_success
+            except httpx.ConnectError:
+                return False
+
+        while not server_available():
+            time.sleep(0.1)
+
+        browser.open(url)
+
+    # We are starting the browser on a thread, because the server can only become
+    # available _after_ the startup is complete. By setting daemon=True, the thread
+    # will automatically terminated together with the main thread. This is only
+    # relevant when the server never becomes available, e.g. if an error occurs. In
+    # this case our thread would be stuck in an endless loop.
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
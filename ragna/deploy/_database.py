@@ -5,11 +5,13 @@ from collections.abc import Collection
 from typing import Any, cast
 from urllib.parse import urlsplit
 
-from sqlalchemy import create_engine, select
+from sqlalchemy import create_engine, inspect, select
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session, joinedload, sessionmaker
 
-from ragna.core import MetadataFilter, RagnaException
+from ragna.core import MessageTimings, MetadataFilter, RagnaException
 
+from . import _metrics as metrics
 from . import _orm as orm
 from . import _schemas as schemas
 
@@ -28,13 +30,43 @@ class Database:
         else:
             connect_args = {}
         engine = create_engine(url, connect_args=connect_args)
+        metrics.instrument_database(engine)
         orm.Base.metadata.create_all(bind=engine)
+        self._add_missing_columns(engine)
 
         self.get_session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
         self._to_orm = SchemaToOrmConverter()
         self._to_schema = OrmToSchemaConverter()
 
+    def _add_missing_columns(self, engine: Engine) -> None:
+        # create_all() only creates missing tables, but leaves existing ones untouched.
+        # Thus, databases created by an older version of Ragna lack the columns that
+        # were added since. We add them here, which only works for nullable columns.
+        inspector = inspect(engine)
+        preparer = engine.dialect.identifier_preparer
+        with engine.begin() as connection:
+            for table in orm.Base.metadata.sorted_tables:
+                existing = {
+                    column["name"] for column in inspector.get_columns(table.name)
+                }
+                for column in table.columns:
+                    if column.name in existing:
+                        continue
+
+                    if not column.nullable:
+                        raise RagnaException(
+                            "Database is missing a non-nullable column",
+                            table=table.name,
+                            column=column.name,
+                        )
+
+                    connection.exec_driver_sql(
+                        f"ALTER TABLE {preparer.format_table(table)} "
+                        f"ADD COLUMN {preparer.format_column(column)} "
+                        f"{column.type.compile(dialect=engine.dialect)}"
+                    )
+
     def _get_orm_user_by_name(self, session: Session, *, name: str) -> orm.User:
         user = cast(
             orm.User | None,
@@ -308,6 +340,9 @@ class SchemaToOrmConverter:
             role=message.role,
             sources=[self.source(source) for source in message.sources],
             timestamp=message.timestamp,
+            timings=(
+                message.timings.model_dump() if message.timings is not None else None
+            ),
         )
 
     def chat(
@@ -379,6 +414,11 @@ class OrmToSchemaConverter:
             content=message.content,
             sources=[self.source(source) for source in message.sources],
             timestamp=message.timestamp,
+            timings=(
+                MessageTimings.model_validate(message.timings)
+                if message.timings is not None
+                else None
+            ),
         )
 
     def chat(self, chat: orm.Chat) -> schemas.Chat:
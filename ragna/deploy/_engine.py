@@ -1,20 +1,29 @@
+import asyncio
+import logging
 import secrets
+import shutil
+import time
 import uuid
-from collections.abc import AsyncIterator, Collection
+from collections.abc import AsyncIterator, Collection, Coroutine
 from typing import Any, cast
 
 from fastapi import status as http_status_code
 
 import ragna
-from ragna import core
+from ragna import _tracing, core
 from ragna._utils import as_awaitable, make_directory
 from ragna.core import Rag, RagnaException
 from ragna.core._rag import SpecialChatParams
 
+from . import _metrics as metrics
 from . import _schemas as schemas
 from ._config import Config
 from ._database import Database
 
+_logger = logging.getLogger(__name__)
+
+_DISK_CHECK_INTERVAL = 16 * 1024**2
+
 
 class Engine:
     def __init__(self, *, config: Config, ignore_unavailable_components: bool) -> None:
@@ -35,6 +44,64 @@ class Engine:
         self._to_core = SchemaToCoreConverter(config=self._config, rag=self._rag)
         self._to_schema = CoreToSchemaConverter()
 
+        self._background_tasks: set[asyncio.Task] = set()
+        # Preprocessing is CPU bound. Running many documents concurrently would only
+        # compete for the same cores and starve the other requests.
+        self._preprocess_semaphore = asyncio.Semaphore(1)
+
+        self._readiness = {
+            component.display_name(): schemas.ComponentReadiness()
+            for component in self._rag._components.values()
+        }
+
+    async def warmup(self) -> None:
+        await asyncio.gather(
+            *[
+                self._warmup_component(component)
+                for component in self._rag._components.values()
+            ]
+        )
+
+    async def _warmup_component(self, component: core.Component) -> None:
+        readiness = self._readiness[component.display_name()]
+        start = time.perf_counter()
+        with _tracing.span("Component.warmup", component=component.display_name()):
+            try:
+                await as_awaitable(component.warmup)
+            except Exception as exc:
+                # A failed warmup only means that the first user of the component has
+                # to pay for it. Thus, we report it, but don't treat it as fatal.
+                readiness.status = "failed"
+                readiness.error = f"{type(exc).__name__}: {exc}"
+            else:
+                readiness.status = "ready"
+        readiness.warmup_ms = (time.perf_counter() - start) * 1e3
+
+    async def shutdown(self) -> None:
+        for task in self._background_tasks:
+            task.cancel()
+        await asyncio.gather(*self._background_tasks, return_exceptions=True)
+        await asyncio.gather(
+            *[
+                self._shutdown_component(component)
+                for component in self._rag._components.values()
+            ]
+        )
+
+    async def _shutdown_component(self, component: core.Component) -> None:
+        try:
+            await as_awaitable(component.shutdown)
+        except Exception:
+            _logger.exception("Shutting down %s failed", component.display_name())
+
+    def get_readiness(self) -> schemas.Readiness:
+        return schemas.Readiness(
+            ready=all(
+                readiness.status != "pending" for readiness in self._readiness.values()
+            ),
+            components=self._readiness,
+        )
+
     def maybe_add_user(self, user: schemas.User) -> None:
         with self._database.get_session() as session:
             return self._database.maybe_add_user(session, user=user)
@@ -188,12 +255,84 @@ class Engine:
         streams = dict(ids_and_streams)
 
         documents = self.get_documents(user=user, ids=streams.keys())
+        core_documents = [
+            cast(ragna.core.LocalDocument, self._to_core.document(document))
+            for document in documents
+        ]
 
-        for document in documents:
-            core_document = cast(
-                ragna.core.LocalDocument, self._to_core.document(document)
-            )
-            await core_document._write(streams[document.id])
+        # The streams are only consumed while writing. Thus, limiting the number of
+        # concurrent writes also limits the number of open files and how much of the
+        # uploads is held in memory at once.
+        semaphore = asyncio.Semaphore(self._config.upload_concurrency)
+
+        async def write(document: ragna.core.LocalDocument) -> None:
+            async with semaphore:
+                await document._write(self._limit_upload(streams[document.id]))
+
+            if self._config.ingest_on_upload:
+                self._run_in_background(self._preprocess_document(document))
+
+        # We let all writes finish before reporting the first failure. Otherwise, the
+        # remaining writes would continue in the background after the request is done.
+        for result in await asyncio.gather(
+            *[write(document) for document in core_documents], return_exceptions=True
+        ):
+            if isinstance(result, BaseException):
+                raise result
+
+    async def _limit_upload(self, stream: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        size = 0
+        next_disk_check = 0
+        async for content in stream:
+            size += len(content)
+            if size > self._config.upload_max_document_size:
+                raise RagnaException(
+                    "Document is too large",
+                    max_size=self._config.upload_max_document_size,
+                    http_status_code=http_status_code.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    http_detail=RagnaException.MESSAGE,
+                )
+
+            # Querying the free disk space for every chunk would be wasteful. Instead,
+            # we check whether enough space is left to write the next interval.
+            if size >= next_disk_check:
+                free = shutil.disk_usage(self._documents_root).free
+                if (
+                    free
+                    < self._config.upload_min_free_disk_space + _DISK_CHECK_INTERVAL
+                ):
+                    raise RagnaException(
+                        "Not enough free disk space to store the document",
+                        http_status_code=http_status_code.HTTP_507_INSUFFICIENT_STORAGE,
+                        http_detail=RagnaException.MESSAGE,
+                    )
+                next_disk_check = size + _DISK_CHECK_INTERVAL
+
+            yield content
+
+    def _run_in_background(self, coroutine: Coroutine[Any, Any, None]) -> None:
+        task = asyncio.create_task(coroutine)
+        # The event loop only keeps weak references to tasks. Thus, we need to keep a
+        # strong reference until the task is done.
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def _preprocess_document(self, document: core.Document) -> None:
+        async with self._preprocess_semaphore:
+            for source_storage in self._get_source_storage_components(None):
+                with _tracing.span(
+                    "SourceStorage.preprocess", component=source_storage.display_name()
+                ):
+                    try:
+                        await as_awaitable(source_storage.preprocess, [document])
+                    except Exception:
+                        # Preprocessing is only an optimization. If it fails, the work
+                        # is just done again when the documents are stored.
+                        _logger.exception(
+                            "Preprocessing document %s with %s failed",
+                            document.id,
+                            source_storage.display_name(),
+                        )
 
     def get_documents(
         self, *, user: str, ids: Collection[uuid.UUID] | None = None
@@ -245,9 +384,21 @@ class Engine:
 
     async def prepare_chat(self, *, user: str, id: uuid.UUID) -> schemas.Message:
         core_chat = self._to_core.chat(self.get_chat(user=user, id=id), user=user)
-        core_message = await core_chat.prepare()
+        stores_documents = core_chat.documents is not None and not core_chat._prepared
+
+        start = time.perf_counter()
+        with _tracing.span("Engine.prepare_chat", chat_id=id):
+            core_message = await core_chat.prepare()
+        if stores_documents:
+            metrics.observe_store(
+                source_storage=core_chat.source_storage.display_name(),
+                seconds=time.perf_counter() - start,
+            )
 
-        with self._database.get_session() as session:
+        with (
+            _tracing.span("Database.update_chat", chat_id=core_chat.params["chat_id"]),
+            self._database.get_session() as session,
+        ):
             self._database.update_chat(
                 session, chat=self._to_schema.chat(core_chat), user=user
             )
@@ -255,23 +406,52 @@ class Engine:
         return self._to_schema.message(core_message)
 
     async def answer_stream(
-        self, *, user: str, chat_id: uuid.UUID, prompt: str
+        self, *, user: str, chat_id: uuid.UUID, prompt: str, timings: bool = False
     ) -> AsyncIterator[schemas.Message]:
-        core_chat = self._to_core.chat(self.get_chat(user=user, id=chat_id), user=user)
-        core_message = await core_chat.answer(prompt, stream=True)
+        with _tracing.span("Engine.answer_stream", chat_id=chat_id):
+            core_chat = self._to_core.chat(
+                self.get_chat(user=user, id=chat_id), user=user
+            )
+            core_message = await core_chat.answer(prompt, stream=True)
 
-        content_stream = aiter(core_message)
-        content_chunk = await anext(content_stream)
-        message = self._to_schema.message(core_message, content_override=content_chunk)
-        yield message
+        with metrics.ActiveStream():
+            content_stream = aiter(core_message)
+            content_chunk = await anext(content_stream)
+            message = self._to_schema.message(
+                core_message, content_override=content_chunk
+            )
+            if not timings:
+                message.timings = None
+            yield message
 
-        # Avoid sending the sources multiple times
-        message_chunk = message.model_copy(update={"sources": None})
-        async for content_chunk in content_stream:
-            message_chunk.content = content_chunk
-            yield message_chunk
+            # Avoid sending the sources and partial timings multiple times
+            message_chunk = message.model_copy(
+                update={"sources": None, "timings": None}
+            )
+            async for content_chunk in content_stream:
+                message_chunk.content = content_chunk
+                yield message_chunk
+
+        metrics.observe_answer(
+            source_storage=core_chat.source_storage.display_name(),
+            assistant=core_chat.assistant.display_name(),
+            timings=cast(core.MessageTimings, core_message.timings),
+        )
 
-        with self._database.get_session() as session:
+        # The timings are only complete after the answer is fully streamed. Thus, we
+        # send them with an additional empty chunk.
+        if timings:
+            yield message_chunk.model_copy(
+                update={
+                    "content": "",
+                    "timings": core_message.timings,
+                }
+            )
+
+        with (
+            _tracing.span("Database.update_chat", chat_id=core_chat.params["chat_id"]),
+            self._database.get_session() as session,
+        ):
             self._database.update_chat(
                 session, chat=self._to_schema.chat(core_chat), user=user
             )
@@ -309,6 +489,7 @@ class SchemaToCoreConverter:
             message.content,
             role=message.role,
             sources=[self.source(source) for source in message.sources],
+            timings=message.timings,
         )
 
     def chat(self, chat: schemas.Chat, *, user: str) -> core.Chat:
@@ -365,6 +546,9 @@ class CoreToSchemaConverter:
             role=message.role,
             sources=[self.source(source) for source in message.sources],
             timestamp=message.timestamp,
+            timings=(
+                message.timings.model_copy() if message.timings is not None else None
+            ),
         )
 
     def chat(self, chat: core.Chat) -> schemas.Chat:
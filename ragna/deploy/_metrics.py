@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING, Any
+
+import anyio.to_thread
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ragna.core import MessageTimings, PackageRequirement, RagnaException
+
+from ._config import Config
+
+if TYPE_CHECKING:
+    from prometheus_client import CollectorRegistry
+
+_REQUIREMENTS = [PackageRequirement("prometheus-client")]
+
+# The default buckets of prometheus_client top out at 10 seconds, which is too short
+# for LLM answers.
+_SECONDS_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+)
+
+
+class _Metrics:
+    def __init__(self) -> None:
+        from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram
+
+        # We use a dedicated registry rather than the global default one of
+        # prometheus_client to avoid exposing metrics of other libraries that happen
+        # to use it.
+        self.registry = CollectorRegistry()
+
+        # We deliberately do not label by corpus name, since it is chosen by the users
+        # and thus would make the number of time series unbounded.
+        self.http_request_duration = Histogram(
+            "ragna_http_request_duration_seconds",
+            "Duration of HTTP requests including streaming the response.",
+            ["method", "route", "status_code"],
+            buckets=_SECONDS_BUCKETS,
+            registry=self.registry,
+        )
+        self.store_duration = Histogram(
+            "ragna_source_storage_store_duration_seconds",
+            "Duration of storing the documents of a chat.",
+            ["source_storage"],
+            buckets=_SECONDS_BUCKETS,
+            registry=self.registry,
+        )
+        self.retrieve_duration = Histogram(
+            "ragna_source_storage_retrieve_duration_seconds",
+            "Duration of retrieving the sources for a prompt.",
+            ["source_storage"],
+            buckets=_SECONDS_BUCKETS,
+            registry=self.registry,
+        )
+        self.answer_first_chunk_duration = Histogram(
+            "ragna_answer_time_to_first_chunk_seconds",
+            "Duration from receiving a prompt to the first chunk of the answer. This "
+            "includes retrieving the sources.",
+            ["assistant"],
+            buckets=_SECONDS_BUCKETS,
+            registry=self.registry,
+        )
+        self.assistant_chunk_rate = Histogram(
+            "ragna_assistant_chunks_per_second",
+            "Streaming rate of answers after the first chunk.",
+            ["assistant"],
+            buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500),
+            registry=self.registry,
+        )
+        self.answers = Counter(
+            "ragna_answers",
+            "Number of fully streamed answers.",
+            ["assistant"],
+            registry=self.registry,
+        )
+        self.database_query_duration = Histogram(
+            "ragna_database_query_duration_seconds",
+            "Duration of database queries.",
+            buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0),
+            registry=self.registry,
+        )
+        self.active_streams = Gauge(
+            "ragna_active_answer_streams",
+            "Number of answers that are currently streamed.",
+            registry=self.registry,
+        )
+        self.threadpool_busy_threads = Gauge(
+            "ragna_threadpool_busy_threads",
+            "Number of threads of the pool running synchronous component methods.",
+            registry=self.registry,
+        )
+        self.threadpool_max_threads = Gauge(
+            "ragna_threadpool_max_threads",
+            "Maximum number of threads of the pool running synchronous component "
+            "methods.",
+            registry=self.registry,
+        )
+        self.threadpool_queued_tasks = Gauge(
+            "ragna_threadpool_queued_tasks",
+            "Number of synchronous component method calls waiting for a free thread.",
+            registry=self.registry,
+        )
+
+
+# Metrics are opt-in. Unless they are set up, all functions below are no-ops and
+# prometheus_client is not even imported.
+_METRICS: _Metrics | None = None
+
+
+def setup_metrics(config: Config) -> None:
+    global _METRICS
+    if not config.metrics:
+        _METRICS = None
+        return
+
+    unavailable_requirements = [
+        requirement for requirement in _REQUIREMENTS if not requirement.is_available()
+    ]
+    if unavailable_requirements:
+        raise RagnaException(
+            "Metrics are enabled, but not all of their requirements are met",
+            unavailable_requirements=[
+                str(requirement) for requirement in unavailable_requirements
+            ],
+        )
+
+    # We keep the metrics of a previous setup, since Prometheus expects counters to
+    # only ever increase during the lifetime of the process.
+    if _METRICS is None:
+        _METRICS = _Metrics()
+
+
+def is_enabled() -> bool:
+    return _METRICS is not None
+
+
+def get_registry() -> CollectorRegistry | None:
+    return _METRICS.registry if _METRICS is not None else None
+
+
+def observe_store(*, source_storage: str, seconds: float) -> None:
+    if _METRICS is None:
+        return
+
+    _METRICS.store_duration.labels(source_storage).observe(seconds)
+
+
+def observe_answer(
+    *, source_storage: str, assistant: str, timings: MessageTimings
+) -> None:
+    if _METRICS is None:
+        return
+
+    if timings.retrieve_ms is not None:
+        _METRICS.retrieve_duration.labels(source_storage).observe(
+            timings.retrieve_ms / 1e3
+        )
+    if timings.ttft_ms is not None:
+        _METRICS.answer_first_chunk_duration.labels(assistant).observe(
+            timings.ttft_ms / 1e3
+        )
+    if timings.chunks_per_second is not None:
+        _METRICS.assistant_chunk_rate.labels(assistant).observe(
+            timings.chunks_per_second
+        )
+    _METRICS.answers.labels(assistant).inc()
+
+
+def instrument_database(engine: Engine) -> None:
+    metrics = _METRICS
+    if metrics is None:
+        return
+
+    def before_cursor_execute(
+        conn: Any, cursor: Any, statement: Any, parameters: Any, context: Any, *_: Any
+    ) -> None:
+        conn.info.setdefault("ragna_query_start", []).append(time.perf_counter())
+
+    def after_cursor_execute(
+        conn: Any, cursor: Any, statement: Any, parameters: Any, context: Any, *_: Any
+    ) -> None:
+        start = conn.info["ragna_query_start"].pop()
+        metrics.database_query_duration.observe(time.perf_counter() - start)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)  # type: ignore[no-untyped-call]
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)  # type: ignore[no-untyped-call]
+
+
+class ActiveStream:
+    def __enter__(self) -> None:
+        if _METRICS is not None:
+            _METRICS.active_streams.inc()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        if _METRICS is not None:
+            _METRICS.active_streams.dec()
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or _METRICS is None:
+            await self.app(scope, receive, send)
+            return
+
+        metrics = _METRICS
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # We use the path template rather than the actual path as label to keep
+            # the number of time series bounded.
+            route = scope.get("route")
+            metrics.http_request_duration.labels(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                str(status_code),
+            ).observe(time.perf_counter() - start)
+
+
+def _update_threadpool_metrics(metrics: _Metrics) -> None:
+    # as_awaitable and as_async_iterator run synchronous functions on the default
+    # thread limiter of anyio.
+    statistics = anyio.to_thread.current_default_thread_limiter().statistics()
+    metrics.threadpool_busy_threads.set(statistics.borrowed_tokens)
+    metrics.threadpool_max_threads.set(statistics.total_tokens)
+    metrics.threadpool_queued_tasks.set(statistics.tasks_waiting)
+
+
+def render() -> tuple[bytes, str]:
+    from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+    if _METRICS is None:
+        raise RagnaException("Metrics are not enabled")
+
+    _update_threadpool_metrics(_METRICS)
+    return generate_latest(_METRICS.registry), CONTENT_TYPE_LATEST
@@ -196,3 +196,4 @@ class Message(Base):
     )
 
     timestamp = Column(UtcAwareDateTime, nullable=False)
+    timings = Column(Json, nullable=True)
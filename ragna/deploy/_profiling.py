@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import datetime
+import re
+import threading
+import tracemalloc
+from typing import Annotated, Literal, cast
+
+import pydantic
+from fastapi import APIRouter, Depends, Query, Request, status
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ragna.core import PackageRequirement, RagnaException
+
+from . import _schemas as schemas
+from ._auth import UserDependency
+from ._config import Config
+
+_REQUIREMENTS = [PackageRequirement("pyinstrument")]
+
+ProfileFormat = Literal["html", "speedscope"]
+
+_PROFILE_HEADER = b"x-ragna-profile"
+_PROFILE_QUERY_PARAMETER = "ragna_profile"
+_PROFILE_FILE_HEADER = b"x-ragna-profile-file"
+
+
+def check_requirements() -> None:
+    unavailable_requirements = [
+        requirement for requirement in _REQUIREMENTS if not requirement.is_available()
+    ]
+    if unavailable_requirements:
+        raise RagnaException(
+            "Profiling is enabled, but not all of its requirements are met",
+            unavailable_requirements=[
+                str(requirement) for requirement in unavailable_requirements
+            ],
+        )
+
+
+def _is_admin(config: Config, user: schemas.User | None) -> bool:
+    return user is not None and user.name in config.admin_users
+
+
+class ProfilingMiddleware:
+    """Profile individual requests of admin users on demand.
+
+    A request is profiled if it has a `X-Ragna-Profile` header or a `ragna_profile`
+    query parameter with a value of `html` or `speedscope`. The profile is written to
+    [`profiling_dir`][ragna.deploy.Config.profiling_dir] and its file name is returned
+    in the `X-Ragna-Profile-File` response header.
+
+    The profiler samples the event loop thread and only attributes samples to the
+    profiled request. Time spent in synchronous component methods that run on the
+    threadpool shows up as awaiting.
+
+    This needs to be added before the
+    [`SessionMiddleware`][ragna.deploy._auth.SessionMiddleware], such that the latter
+    wraps this one and the user is known.
+    """
+
+    def __init__(self, app: ASGIApp, *, config: Config) -> None:
+        self.app = app
+        self._config = config
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        format = self._requested_format(scope)
+        if format is None:
+            await self.app(scope, receive, send)
+            return
+
+        session = scope.get("state", {}).get("session")
+        if not _is_admin(self._config, getattr(session, "user", None)):
+            response = JSONResponse(
+                status_code=status.HTTP_403_FORBIDDEN,
+                content={"error": {"message": "Profiling is only available to admins"}},
+            )
+            await response(scope, receive, send)
+            return
+
+        from pyinstrument import Profiler
+        from pyinstrument.renderers import SpeedscopeRenderer
+
+        path = self._config.profiling_dir / self._file_name(scope, format=format)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", []).append(
+                    (_PROFILE_FILE_HEADER, path.name.encode())
+                )
+            await send(message)
+
+        # With async_mode="enabled", only samples of the task running this request and
+        # its child tasks are recorded. Thus, concurrent requests do not pollute the
+        # profile.
+        profiler = Profiler(async_mode="enabled")
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.stop()
+            if format == "html":
+                output = profiler.output_html()
+            else:
+                output = profiler.output(renderer=SpeedscopeRenderer())
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(output)
+
+    def _requested_format(self, scope: Scope) -> ProfileFormat | None:
+        value: str | None = None
+        for key, header_value in scope["headers"]:
+            if key == _PROFILE_HEADER:
+                value = header_value.decode("latin-1")
+                break
+        else:
+            query = Request(scope).query_params
+            value = query.get(_PROFILE_QUERY_PARAMETER)
+
+        if value is None or value.lower() not in {"html", "speedscope"}:
+            return None
+        return cast(ProfileFormat, value.lower())
+
+    def _file_name(self, scope: Scope, *, format: ProfileFormat) -> str:
+        timestamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        path = re.sub(r"[^a-zA-Z0-9]+", "-", scope["path"]).strip("-") or "root"
+        suffix = ".html" if format == "html" else ".speedscope.json"
+        return f"{timestamp}-{scope['method'].lower()}-{path}{suffix}"
+
+
+class TracemallocStatistic(pydantic.BaseModel):
+    traceback: list[str]
+    size_diff: int
+    size: int
+    count_diff: int
+    count: int
+
+
+class TracemallocDiff(pydantic.BaseModel):
+    started: bool
+    total_size: int
+    total_size_diff: int
+    statistics: list[TracemallocStatistic]
+
+
+class _TracemallocState:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._snapshot: tracemalloc.Snapshot | None = None
+
+    def diff(
+        self, *, key_type: Literal["lineno", "filename", "traceback"], limit: int
+    ) -> TracemallocDiff:
+        with self._lock:
+            started = not tracemalloc.is_tracing()
+            if started:
+                tracemalloc.start(25)
+            # Exclude the allocations of tracemalloc itself, e.g. the snapshots.
+            snapshot = tracemalloc.take_snapshot().filter_traces(
+                [tracemalloc.Filter(False, tracemalloc.__file__)]
+            )
+            previous, self._snapshot = self._snapshot, snapshot
+
+        if previous is None:
+            return TracemallocDiff(
+                started=started, total_size=0, total_size_diff=0, statistics=[]
+            )
+
+        statistics = snapshot.compare_to(previous, key_type)
+        return TracemallocDiff(
+            started=started,
+            total_size=sum(statistic.size for statistic in statistics),
+            total_size_diff=sum(statistic.size_diff for statistic in statistics),
+            statistics=[
+                TracemallocStatistic(
+                    traceback=statistic.traceback.format(),
+                    size_diff=statistic.size_diff,
+                    size=statistic.size,
+                    count_diff=statistic.count_diff,
+                    count=statistic.count,
+                )
+                for statistic in statistics[:limit]
+            ],
+        )
+
+    def stop(self) -> None:
+        with self._lock:
+            tracemalloc.stop()
+            self._snapshot = None
+
+
+def make_router(config: Config) -> APIRouter:
+    async def _get_admin(user: UserDependency) -> schemas.User:
+        if not _is_admin(config, user):
+            raise RagnaException(
+                "Only admins can access the debug endpoints",
+                http_detail=RagnaException.MESSAGE,
+                http_status_code=status.HTTP_403_FORBIDDEN,
+            )
+        return user
+
+    router = APIRouter(
+        tags=["debug"], dependencies=[Depends(_get_admin)], include_in_schema=False
+    )
+
+    tracemalloc_state = _TracemallocState()
+
+    @router.post("/tracemalloc")
+    def tracemalloc_diff(
+        key_type: Literal["lineno", "filename", "traceback"] = "lineno",
+        limit: Annotated[int, Query(gt=0)] = 20,
+    ) -> TracemallocDiff:
+        """Diff the allocated memory against the previous call.
+
+        The first call starts tracing the memory allocations. Since tracing slows down
+        the server considerably, it should be stopped again once the investigation is
+        done.
+        """
+        return tracemalloc_state.diff(key_type=key_type, limit=limit)
+
+    @router.delete("/tracemalloc")
+    def stop_tracemalloc() -> None:
+        tracemalloc_state.stop()
+
+    return router
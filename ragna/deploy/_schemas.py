@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import uuid
 from datetime import datetime, timezone
-from typing import Annotated, Any
+from typing import Annotated, Any, Literal
 
 from pydantic import (
     AfterValidator,
@@ -75,6 +75,17 @@ class Components(BaseModel):
     assistants: list[dict[str, Any]]
 
 
+class ComponentReadiness(BaseModel):
+    status: Literal["pending", "ready", "failed"] = "pending"
+    warmup_ms: float | None = None
+    error: str | None = None
+
+
+class Readiness(BaseModel):
+    ready: bool
+    components: dict[str, ComponentReadiness]
+
+
 class DocumentRegistration(BaseModel):
     name: str
     metadata: dict[str, Any] = Field(default_factory=dict)
@@ -104,6 +115,7 @@ class Message(BaseModel):
     role: ragna.core.MessageRole
     sources: list[Source] = Field(default_factory=list)
     timestamp: UtcDateTime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    timings: ragna.core.MessageTimings | None = None
 
 
 class ChatCreation(BaseModel):
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import functools
+from typing import TYPE_CHECKING, Any
+
+from fastapi import status
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ragna import _tracing
+from ragna.core import PackageRequirement, RagnaException
+
+from ._config import Config
+
+if TYPE_CHECKING:
+    from opentelemetry.sdk.trace import TracerProvider
+
+
+_REQUIREMENTS = [
+    PackageRequirement("opentelemetry-sdk"),
+    PackageRequirement("opentelemetry-exporter-otlp-proto-http"),
+]
+
+
+def setup_tracing(config: Config) -> TracerProvider | None:
+    if config.tracing is None:
+        _tracing.set_tracer_provider(None)
+        return None
+
+    unavailable_requirements = [
+        requirement for requirement in _REQUIREMENTS if not requirement.is_available()
+    ]
+    if unavailable_requirements:
+        raise RagnaException(
+            "Tracing is enabled, but not all of its requirements are met",
+            unavailable_requirements=[
+                str(requirement) for requirement in unavailable_requirements
+            ],
+        )
+
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import (
+        BatchSpanProcessor,
+        ConsoleSpanExporter,
+        SpanExporter,
+    )
+
+    import ragna
+
+    exporter: SpanExporter
+    if config.tracing == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+            OTLPSpanExporter,
+        )
+
+        exporter = OTLPSpanExporter(endpoint=config.tracing_otlp_endpoint)
+    else:
+        config.tracing_file.parent.mkdir(parents=True, exist_ok=True)
+        exporter = ConsoleSpanExporter(
+            out=open(config.tracing_file, "a"),  # noqa: SIM115
+            formatter=lambda span: f"{span.to_json(indent=None)}\n",
+        )
+
+    tracer_provider = TracerProvider(
+        resource=Resource.create(
+            {"service.name": "ragna", "service.version": ragna.__version__}
+        )
+    )
+    # The spans are exported on a background thread. Thus, exporting them does not add
+    # to the latency of the requests.
+    tracer_provider.add_span_processor(BatchSpanProcessor(exporter))
+    _tracing.set_tracer_provider(tracer_provider)
+    return tracer_provider
+
+
+class TracingMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not _tracing.is_enabled():
+            await self.app(scope, receive, send)
+            return
+
+        from opentelemetry import context, propagate
+
+        # Continue the trace of the client if it sent one
+        token = context.attach(
+            propagate.extract(
+                {
+                    key.decode("latin-1"): value.decode("latin-1")
+                    for key, value in scope["headers"]
+                }
+            )
+        )
+        try:
+            with _tracing.span(
+                f"HTTP {scope['method']}",
+                http_method=scope["method"],
+                http_target=scope["path"],
+            ) as span:
+                await self.app(
+                    scope, receive, functools.partial(self._send, send, span=span)
+                )
+                route = scope.get("route")
+                if route is not None:
+                    _tracing.set_attributes(span, http_route=route.path)
+                    if span is not None:
+                        span.update_name(f"HTTP {scope['method']} {route.path}")
+        finally:
+            context.detach(token)
+
+    async def _send(self, send: Send, message: Message, *, span: Any) -> None:
+        if message["type"] == "http.response.start":
+            _tracing.set_attributes(span, http_status_code=message["status"])
+            if message["status"] >= status.HTTP_500_INTERNAL_SERVER_ERROR:
+                from opentelemetry.trace import Status, StatusCode
+
+                span.set_status(Status(StatusCode.ERROR))
+        await send(message)
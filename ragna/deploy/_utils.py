@@ -1,7 +1,12 @@
+import email.utils
+import os
 from urllib.parse import SplitResult, urlsplit, urlunsplit
 
+import anyio.to_thread
 from fastapi import status
-from fastapi.responses import RedirectResponse
+from fastapi.responses import FileResponse, RedirectResponse, Response
+from starlette.datastructures import Headers
+from starlette.types import Receive, Scope, Send
 
 from ragna.core import RagnaException
 
@@ -54,3 +59,63 @@ def _replace_hostname(split_result: SplitResult, hostname: str) -> SplitResult:
     else:
         netloc = f"{hostname}:{split_result.port}"
     return split_result._replace(netloc=netloc)
+
+
+class ConditionalFileResponse(FileResponse):
+    """File response that also answers conditional requests.
+
+    On top of the `Range` requests and the `ETag` and `Last-Modified` headers that
+    [starlette.responses.FileResponse][] provides, this responds with
+    `304 Not Modified` if the `If-None-Match` or `If-Modified-Since` headers of the
+    request match the file. Like its parent, the file is streamed from disk in chunks
+    and is never fully loaded into memory.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if self.stat_result is None:
+            try:
+                stat_result = await anyio.to_thread.run_sync(os.stat, self.path)
+            except FileNotFoundError:
+                raise RagnaException(
+                    "File does not exist",
+                    path=self.path,
+                    http_status_code=status.HTTP_404_NOT_FOUND,
+                    http_detail=RagnaException.EVENT,
+                ) from None
+            self.stat_result = stat_result
+            self.set_stat_headers(stat_result)
+
+        if self._is_not_modified(Headers(scope=scope)):
+            response = Response(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={
+                    name: value
+                    for name, value in self.headers.items()
+                    if name in {"etag", "last-modified", "cache-control"}
+                },
+            )
+            await response(scope, receive, send)
+            return
+
+        await super().__call__(scope, receive, send)
+
+    def _is_not_modified(self, request_headers: Headers) -> bool:
+        # See https://www.rfc-editor.org/rfc/rfc9110#section-13.2.2 for the precedence
+        # of the conditions.
+        if (if_none_match := request_headers.get("if-none-match")) is not None:
+            etag = self.headers["etag"].removeprefix("W/")
+            return if_none_match.strip() == "*" or etag in {
+                tag.strip().removeprefix("W/") for tag in if_none_match.split(",")
+            }
+
+        if (if_modified_since := request_headers.get("if-modified-since")) is not None:
+            try:
+                since = email.utils.parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            last_modified = email.utils.parsedate_to_datetime(
+                self.headers["last-modified"]
+            )
+            return last_modified <= since
+
+        return False
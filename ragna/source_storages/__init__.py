@@ -5,14 +5,25 @@ __all__ = [
     "RagnaDemoSourceStorage",
 ]
 
-from ._chroma import Chroma
-from ._demo import RagnaDemoSourceStorage
-from ._lancedb import LanceDB
-from ._qdrant import Qdrant
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ._chroma import Chroma
+    from ._demo import RagnaDemoSourceStorage
+    from ._lancedb import LanceDB
+    from ._qdrant import Qdrant
 
 # isort: split
 
-from ragna._utils import fix_module
+from ragna._utils import lazy_module_attributes
 
-fix_module(globals())
-del fix_module
+__getattr__, __dir__ = lazy_module_attributes(
+    globals(),
+    {
+        "Chroma": "._chroma",
+        "LanceDB": "._lancedb",
+        "Qdrant": "._qdrant",
+        "RagnaDemoSourceStorage": "._demo",
+    },
+)
+del lazy_module_attributes
@@ -8,7 +8,7 @@ import ragna
 from ragna.core import Document, MetadataFilter, MetadataOperator, Source
 
 from ._utils import raise_no_corpuses_available, raise_non_existing_corpus
-from ._vector_database import VectorDatabaseSourceStorage
+from ._vector_database import RetrievalPlan, VectorDatabaseSourceStorage
 
 if TYPE_CHECKING:
     import chromadb
@@ -51,28 +51,41 @@ class Chroma(VectorDatabaseSourceStorage):
             )
         )
 
+    def warmup(self) -> None:
+        super().warmup()
+        self.list_corpuses()
+
     def list_corpuses(self) -> list[str]:
         return [c.name for c in self._client.list_collections()]
 
     def _get_collection(
         self, corpus_name: str, *, create: bool = False
     ) -> chromadb.Collection:
+        collection: chromadb.Collection | None = self._corpus_cache.get_handle(
+            corpus_name
+        )
+        if collection is not None:
+            return collection
+
         if create:
-            return self._client.get_or_create_collection(
+            collection = self._client.get_or_create_collection(
                 corpus_name, embedding_function=self._embedding_function
             )
+        else:
+            corpuses = self.list_corpuses()
+            if not corpuses:
+                raise_no_corpuses_available(self)
+
+            try:
+                collection = self._client.get_collection(
+                    name=next(name for name in corpuses if name == corpus_name),
+                    embedding_function=self._embedding_function,
+                )
+            except StopIteration:
+                raise_non_existing_corpus(self, corpus_name)
 
-        corpuses = self.list_corpuses()
-        if not corpuses:
-            raise_no_corpuses_available(self)
-
-        try:
-            return self._client.get_collection(
-                name=next(name for name in corpuses if name == corpus_name),
-                embedding_function=self._embedding_function,
-            )
-        except StopIteration:
-            raise_non_existing_corpus(self, corpus_name)
+        self._corpus_cache.set_handle(corpus_name, collection)
+        return collection
 
     def list_metadata(
         self, corpus_name: str | None = None
@@ -111,34 +124,16 @@ class Chroma(VectorDatabaseSourceStorage):
     ) -> None:
         collection = self._get_collection(corpus_name=corpus_name, create=True)
 
-        ids = []
-        texts = []
-        metadatas = []
-        for document in documents:
-            for chunk in self._chunk_pages(
-                document.extract_pages(),
-                chunk_size=chunk_size,
-                chunk_overlap=chunk_overlap,
-            ):
-                ids.append(str(uuid.uuid4()))
-                texts.append(chunk.text)
-                metadatas.append(
-                    {
-                        "document_id": str(document.id),
-                        "document_name": document.name,
-                        **document.metadata,
-                        "__page_numbers__": self._page_numbers_to_str(
-                            chunk.page_numbers
-                        ),
-                        "__num_tokens__": chunk.num_tokens,
-                    }
-                )
-
-        collection.add(
-            ids=ids,
-            documents=texts,
-            metadatas=metadatas,  # type: ignore[arg-type]
-        )
+        for batch in self._ingest_batches(
+            documents, chunk_size=chunk_size, chunk_overlap=chunk_overlap
+        ):
+            collection.add(
+                ids=[str(uuid.uuid4()) for _ in range(len(batch))],
+                documents=batch.texts,
+                embeddings=batch.embeddings,
+                metadatas=list(batch.metadatas()),
+            )
+        self._corpus_cache.invalidate(corpus_name)
 
     # https://docs.trychroma.com/guides#using-where-filters
     _METADATA_OPERATOR_MAP = {
@@ -189,38 +184,129 @@ class Chroma(VectorDatabaseSourceStorage):
         chunk_size: int = 500,
         num_tokens: int = 1024,
     ) -> list[Source]:
+        return self.retrieve_many(
+            corpus_name,
+            [metadata_filter],
+            [prompt],
+            chunk_size=chunk_size,
+            num_tokens=num_tokens,
+        )[0]
+
+    def retrieve_many(
+        self,
+        corpus_name: str,
+        metadata_filters: list[MetadataFilter | None],
+        prompts: list[str],
+        *,
+        chunk_size: int = 500,
+        num_tokens: int = 1024,
+    ) -> list[list[Source]]:
         collection = self._get_collection(corpus_name=corpus_name)
 
-        include = ["distances", "metadatas", "documents"]
-        result = collection.query(
-            query_texts=prompt,
-            where=self._translate_metadata_filter(metadata_filter),
-            n_results=min(
+        groups = self._group_by_metadata_filter(metadata_filters, prompts)
+        query_embeddings = self._embed_prompts(prompts)
+
+        sources: list[list[Source]] = [[] for _ in prompts]
+        for metadata_filter, idcs in groups:
+            where = self._translate_metadata_filter(metadata_filter)
+            num_candidates = self._corpus_cache.get_count(corpus_name, repr(where))
+            if num_candidates is None:
+                # Beyond the maximum for an exact search, the number of candidates
+                # does not matter. Thus, we stop counting there.
+                num_candidates = (
+                    len(
+                        collection.get(
+                            where=where,
+                            limit=self._EXACT_SEARCH_MAX_CANDIDATES + 1,
+                            include=[],
+                        )["ids"]
+                    )
+                    if where is not None
+                    else collection.count()
+                )
+                self._corpus_cache.set_count(corpus_name, repr(where), num_candidates)
+            n_results = min(
                 # We cannot retrieve source by a maximum number of tokens. Thus, we
                 # estimate how many sources we have to query. We overestimate by a
                 # factor of two to avoid retrieving to few sources and needed to query
                 # again.
                 # ---
-                # FIXME: querying only a low number of documents can lead to not finding
-                #  the most relevant one.
+                # FIXME: querying only a low number of documents can lead to not
+                #  finding the most relevant one.
                 #  See https://github.com/chroma-core/chroma/issues/1205 for details.
                 #  Instead of just querying more documents here, we should use the
                 #  appropriate index parameters when creating the collection. However,
                 #  they are undocumented for now.
                 max(int(num_tokens * 2 / chunk_size), 100),
-                collection.count(),
-            ),
-            include=include,  # type: ignore[arg-type]
-        )
-
-        num_results = len(result["ids"][0])
-        result = {key: result[key][0] for key in ["ids", *include]}  # type: ignore[literal-required]
-        # dict of lists -> list of dicts
-        results = [
-            {key: value[idx] for key, value in result.items()}
-            for idx in range(num_results)
-        ]
+                num_candidates,
+            )
 
+            group_results: list[list[dict[str, Any]]]
+            candidates: chromadb.GetResult | None = None
+            if (
+                self._plan_retrieval(
+                    corpus_name=corpus_name,
+                    metadata_filter=metadata_filter,
+                    num_candidates=num_candidates,
+                )
+                is RetrievalPlan.EXACT
+            ):
+                # The cached number of candidates might be outdated. Thus, we fetch one
+                # more than the maximum to detect if there are too many after all.
+                candidates = collection.get(
+                    where=where,
+                    limit=self._EXACT_SEARCH_MAX_CANDIDATES + 1,
+                    include=["embeddings", "metadatas", "documents"],
+                )
+                if len(candidates["ids"]) > self._EXACT_SEARCH_MAX_CANDIDATES:
+                    self._corpus_cache.invalidate(corpus_name)
+                    candidates = None
+
+            if candidates is not None:
+                group_results = [
+                    [
+                        {
+                            "ids": candidates["ids"][idx],
+                            "metadatas": candidates["metadatas"][idx],  # type: ignore[index]
+                            "documents": candidates["documents"][idx],  # type: ignore[index]
+                            "distances": distance,
+                        }
+                        for idx, distance in query_results
+                    ]
+                    for query_results in self._exact_search(
+                        [query_embeddings[idx] for idx in idcs],
+                        candidates["embeddings"],
+                        limit=n_results,
+                    )
+                ]
+            else:
+                include = ["distances", "metadatas", "documents"]
+                result = collection.query(
+                    query_embeddings=[query_embeddings[idx] for idx in idcs],
+                    where=where,
+                    n_results=n_results,
+                    include=include,  # type: ignore[arg-type]
+                )
+                # dict of lists of lists -> list of lists of dicts
+                group_results = [
+                    [
+                        {
+                            key: result[key][query_idx][idx]  # type: ignore[literal-required]
+                            for key in ["ids", *include]
+                        }
+                        for idx in range(len(result["ids"][query_idx]))
+                    ]
+                    for query_idx in range(len(idcs))
+                ]
+
+            for idx, results in zip(idcs, group_results, strict=True):
+                sources[idx] = self._results_to_sources(results, num_tokens=num_tokens)
+
+        return sources
+
+    def _results_to_sources(
+        self, results: list[dict[str, Any]], *, num_tokens: int
+    ) -> list[Source]:
         # That should be the default, but let's make extra sure here
         results = sorted(results, key=lambda r: r["distances"])
 
@@ -1,7 +1,14 @@
 from __future__ import annotations
 
+import concurrent.futures
+import datetime
+import json
+import logging
+import math
+import threading
 import uuid
 from collections import defaultdict
+from collections.abc import Collection
 from typing import TYPE_CHECKING, Any, cast
 
 import ragna
@@ -16,10 +23,18 @@ from ragna.core import (
 )
 
 from ._utils import raise_no_corpuses_available, raise_non_existing_corpus
-from ._vector_database import VectorDatabaseSourceStorage
+from ._vector_database import (
+    ChunkBatch,
+    RetrievalPlan,
+    VectorCompression,
+    VectorDatabaseSourceStorage,
+)
 
 if TYPE_CHECKING:
     import lancedb
+    import pyarrow as pa
+
+_logger = logging.getLogger(__name__)
 
 
 class LanceDB(VectorDatabaseSourceStorage):
@@ -28,7 +43,7 @@ class LanceDB(VectorDatabaseSourceStorage):
     !!! info "Required packages"
 
         - `chromadb>=0.6.0`
-        - `lancedb>=0.2`
+        - `lancedb>=0.23`
         - `pyarrow`
     """
 
@@ -36,7 +51,7 @@ class LanceDB(VectorDatabaseSourceStorage):
     def requirements(cls) -> list[Requirement]:
         return [
             *super().requirements(),
-            PackageRequirement("lancedb>=0.2"),
+            PackageRequirement("lancedb>=0.23"),
             PackageRequirement(
                 "pyarrow",
                 # See https://github.com/apache/arrow/issues/38167
@@ -51,14 +66,53 @@ class LanceDB(VectorDatabaseSourceStorage):
 
         self._db = lancedb.connect(ragna.local_root() / "lancedb")
 
+        # Tables are optimized in the background after storing documents. A single
+        # worker is enough, since optimizing is mostly bound by disk I/O, and
+        # it avoids that concurrent optimizations of one table conflict.
+        self._maintenance = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="ragna-lancedb-maintenance"
+        )
+        self._maintenance_lock = threading.Lock()
+        self._maintenance_scheduled: set[str] = set()
+        self._maintenance_shut_down = False
+
+    def warmup(self) -> None:
+        super().warmup()
+        self.list_corpuses()
+
+    def shutdown(self) -> None:
+        super().shutdown()
+        with self._maintenance_lock:
+            self._maintenance_shut_down = True
+        # Optimizing is not required for correctness. Thus, we drop the pending
+        # optimizations and only wait for a running one to finish.
+        self._maintenance.shutdown(wait=True, cancel_futures=True)
+
     def list_corpuses(self) -> list[str]:
         return list(self._db.table_names())
 
     _VECTOR_COLUMN_NAME = "__embedded_text__"
 
+    # Metadata fields that are known when a corpus is created are stored as typed
+    # columns. Fields that only show up later are stored as JSON object in this
+    # column. Adding a column instead would touch every fragment of the table.
+    _METADATA_COLUMN_NAME = "__metadata__"
+
+    # The vector compression of a corpus is recorded in the metadata of its schema.
+    _VECTOR_COMPRESSION_KEY = b"ragna.vector_compression"
+
     def _get_table(
-        self, corpus_name: str, *, create: bool = False
+        self,
+        corpus_name: str,
+        *,
+        create: bool = False,
+        vector_compression: VectorCompression = "none",
+        metadata_fields: dict[str, str] | None = None,
     ) -> lancedb.table.Table:
+        table = self._corpus_cache.get_handle(corpus_name)
+        if table is not None:
+            return table
+
         table_names = list(self._db.table_names())
         no_corpuses = not table_names
         non_existing_corpus = corpus_name not in table_names
@@ -66,7 +120,7 @@ class LanceDB(VectorDatabaseSourceStorage):
         if (no_corpuses or non_existing_corpus) and create:
             import pyarrow as pa
 
-            return self._db.create_table(
+            table = self._db.create_table(
                 name=corpus_name,
                 schema=pa.schema(
                     [
@@ -77,18 +131,48 @@ class LanceDB(VectorDatabaseSourceStorage):
                         pa.field("__text__", pa.string()),
                         pa.field(
                             self._VECTOR_COLUMN_NAME,
-                            pa.list_(pa.float32(), self._embedding_dimensions),
+                            pa.list_(
+                                (
+                                    pa.float16()
+                                    if vector_compression == "float16"
+                                    else pa.float32()
+                                ),
+                                self._embedding_dimensions,
+                            ),
                         ),
                         pa.field("__num_tokens__", pa.int32()),
-                    ]
+                        pa.field(self._METADATA_COLUMN_NAME, pa.string()),
+                        *[
+                            pa.field(field, pa.type_for_alias(type))
+                            for field, type in (metadata_fields or {}).items()
+                        ],
+                    ],
+                    metadata={self._VECTOR_COMPRESSION_KEY: vector_compression},
                 ),
             )
-        if no_corpuses:
+        elif no_corpuses:
             raise_no_corpuses_available(self)
-        if non_existing_corpus:
+        elif non_existing_corpus:
             raise_non_existing_corpus(self, corpus_name)
-
-        return self._db.open_table(corpus_name)
+        else:
+            table = self._db.open_table(corpus_name)
+
+        # A table only reads the versions written through it. Thus, all writes of this
+        # process need to go through the cached handle. Writes of other processes are
+        # picked up once the handle expires, which needs to happen before old
+        # versions are removed.
+        self._corpus_cache.set_handle(corpus_name, table)
+        return table
+
+    def _get_vector_compression(self, table: lancedb.table.Table) -> VectorCompression:
+        # Corpuses created before the vector compression was recorded use full
+        # precision vectors.
+        return cast(
+            VectorCompression,
+            (table.schema.metadata or {})
+            .get(self._VECTOR_COMPRESSION_KEY, b"none")
+            .decode(),
+        )
 
     def list_metadata(
         self, corpus_name: str | None = None
@@ -98,20 +182,24 @@ class LanceDB(VectorDatabaseSourceStorage):
         metadata = {}
         for corpus_name in corpus_names:
             table = self._get_table(corpus_name)
-            corpus_metadata = (
-                table.to_arrow()
-                .select(
-                    [
-                        key
-                        for key in table.schema.names
-                        if not (key.startswith("__") and key.endswith("__"))
-                    ]
-                )
-                .to_pydict()
-            )
+            data = table.to_arrow()
+            corpus_metadata = data.select(
+                [
+                    key
+                    for key in table.schema.names
+                    if not (key.startswith("__") and key.endswith("__"))
+                ]
+            ).to_pydict()
+            # Documents without a metadata field have null values in its column.
             corpus_metadata = {
-                key: set(values) for key, values in corpus_metadata.items()
+                key: set(values) - {None} for key, values in corpus_metadata.items()
             }
+            if self._METADATA_COLUMN_NAME in table.schema.names:
+                for serialized_metadata in (
+                    data[self._METADATA_COLUMN_NAME].drop_null().to_pylist()
+                ):
+                    for key, value in json.loads(serialized_metadata).items():
+                        corpus_metadata.setdefault(key, set()).add(value)
 
             metadata[corpus_name] = {
                 key: (
@@ -119,14 +207,15 @@ class LanceDB(VectorDatabaseSourceStorage):
                     sorted(values),
                 )
                 for key, values in corpus_metadata.items()
+                if values
             }
 
         return metadata
 
     _PYTHON_TO_LANCE_TYPE_MAP = {
-        bool: "boolean",
-        int: "int",
-        float: "float",
+        bool: "bool",
+        int: "int32",
+        float: "float32",
         str: "string",
     }
 
@@ -137,8 +226,31 @@ class LanceDB(VectorDatabaseSourceStorage):
         *,
         chunk_size: int = 500,
         chunk_overlap: int = 250,
+        vector_compression: VectorCompression = "none",
     ) -> None:
-        table = self._get_table(corpus_name, create=True)
+        """Store content of documents.
+
+        Args:
+            corpus_name: Name of the corpus to store the documents in.
+            documents: Documents to store.
+            chunk_size: Number of tokens of each chunk.
+            chunk_overlap: Number of tokens that consecutive chunks overlap.
+            vector_compression: How the embeddings are stored. This only applies if
+                the corpus is created and is ignored for existing ones. Supported
+                options are
+
+                - `"none"`: Full precision vectors.
+                - `"float16"`: Half precision vectors. This halves the memory and
+                  disk space.
+                - `"pq"`: Full precision vectors that are searched through an
+                  IVF-PQ index, which compresses each vector to 1 byte per 8
+                  dimensions. The best candidates are rescored with the full
+                  precision vectors. The index is only created once the corpus
+                  holds enough chunks to train it.
+        """
+        self._check_vector_compression(
+            vector_compression, supported={"none", "float16", "pq"}
+        )
 
         document_field_types = defaultdict(set)
         for document in documents:
@@ -153,45 +265,194 @@ class LanceDB(VectorDatabaseSourceStorage):
                 )
             document_fields[field] = self._PYTHON_TO_LANCE_TYPE_MAP[types.pop()]
 
-        schema_fields = set(table.schema.names)
-
-        missing_fields = document_fields.keys() - schema_fields
-        if missing_fields:
-            # Unfortunately, LanceDB does not support adding columns with a specific
-            # type, but the the type is automatically inferred from the value.
-            table.add_columns(
-                {
-                    field: f"CAST(NULL as {document_fields[field]})"
-                    for field in missing_fields
-                }
+        table = self._get_table(
+            corpus_name,
+            create=True,
+            vector_compression=vector_compression,
+            metadata_fields=document_fields,
+        )
+        if self._METADATA_COLUMN_NAME not in table.schema.names:
+            # Corpuses created before the metadata column existed need to be migrated
+            # once. Afterwards, new metadata fields never change the schema again.
+            table.add_columns({self._METADATA_COLUMN_NAME: "CAST(NULL as string)"})
+
+        schema = table.schema
+        for batch in self._ingest_batches(
+            documents, chunk_size=chunk_size, chunk_overlap=chunk_overlap
+        ):
+            table.add(self._to_arrow(batch, schema=schema))
+        self._corpus_cache.invalidate(corpus_name)
+
+        if self._get_vector_compression(table) == "pq":
+            self._maybe_create_pq_index(table)
+
+        self._schedule_maintenance(corpus_name)
+
+    # Every call of table.add() and table.add_columns() creates a new version and the
+    # former also at least one new fragment. Once these cross the thresholds below,
+    # the table is optimized in the background.
+    _MAINTENANCE_MAX_VERSIONS = 64
+    _MAINTENANCE_MAX_SMALL_FRAGMENTS = 32
+    # Old versions are only removed after some time, since running queries or the
+    # cached table handles of other processes might still read them.
+    _MAINTENANCE_CLEANUP_OLDER_THAN = datetime.timedelta(minutes=10)
+
+    def _schedule_maintenance(self, corpus_name: str) -> None:
+        with self._maintenance_lock:
+            if (
+                self._maintenance_shut_down
+                or corpus_name in self._maintenance_scheduled
+            ):
+                return
+            self._maintenance_scheduled.add(corpus_name)
+            self._maintenance.submit(self._run_maintenance, corpus_name)
+
+    def _run_maintenance(self, corpus_name: str) -> None:
+        with self._maintenance_lock:
+            self._maintenance_scheduled.discard(corpus_name)
+
+        try:
+            table = self._get_table(corpus_name)
+            if self._needs_maintenance(table):
+                self._optimize_table(
+                    corpus_name,
+                    table,
+                    cleanup_older_than=self._MAINTENANCE_CLEANUP_OLDER_THAN,
+                )
+        except Exception:
+            # Optimizing is not required for correctness. Thus, a failure, e.g. a
+            # conflict with a concurrent write, is only logged and retried after the
+            # next store.
+            _logger.exception("Optimizing the LanceDB corpus %r failed", corpus_name)
+
+    def _needs_maintenance(self, table: lancedb.table.Table) -> bool:
+        if len(table.list_versions()) > self._MAINTENANCE_MAX_VERSIONS:
+            return True
+
+        return bool(
+            table.stats()["fragment_stats"]["num_small_fragments"]
+            > self._MAINTENANCE_MAX_SMALL_FRAGMENTS
+        )
+
+    def _optimize_table(
+        self,
+        corpus_name: str,
+        table: lancedb.table.Table,
+        *,
+        cleanup_older_than: datetime.timedelta,
+    ) -> None:
+        # This compacts small fragments, removes old versions, and adds the chunks
+        # that were stored after an index was created to the index.
+        table.optimize(cleanup_older_than=cleanup_older_than)
+        if self._get_vector_compression(table) == "pq":
+            self._maybe_create_pq_index(table)
+        # The cached handle might still point to a version that is removed by a later
+        # cleanup. Thus, the next retrieval opens the table again.
+        self._corpus_cache.invalidate(corpus_name, handle=True)
+
+    def optimize(
+        self,
+        corpus_name: str | None = None,
+        *,
+        cleanup_older_than: datetime.timedelta = _MAINTENANCE_CLEANUP_OLDER_THAN,
+    ) -> bool:
+        """Compact the fragments and remove the old versions of corpuses.
+
+        Args:
+            corpus_name: Only optimize this corpus. If omitted, all corpuses are
+                optimized.
+            cleanup_older_than: Only remove versions that are older than this.
+
+        Returns:
+            Always `True`.
+        """
+        corpus_names = self.list_corpuses() if corpus_name is None else [corpus_name]
+        for corpus_name in corpus_names:
+            self._optimize_table(
+                corpus_name,
+                self._get_table(corpus_name),
+                cleanup_older_than=cleanup_older_than,
             )
+        return True
+
+    # Training the product quantization needs 256 vectors for its codebooks.
+    _PQ_MIN_ROWS = 256
+    # How many times the requested number of candidates is rescored with the full
+    # precision vectors.
+    _PQ_REFINE_FACTOR = 5
+
+    def _maybe_create_pq_index(self, table: lancedb.table.Table) -> None:
+        if any(
+            self._VECTOR_COLUMN_NAME in index.columns for index in table.list_indices()
+        ):
+            # Chunks added after the index was created are searched exhaustively,
+            # until the index is updated by optimizing the table.
+            return
+
+        num_rows = table.count_rows()
+        if num_rows < self._PQ_MIN_ROWS:
+            return
+
+        table.create_index(
+            metric="cosine",
+            vector_column_name=self._VECTOR_COLUMN_NAME,
+            index_type="IVF_PQ",
+            num_partitions=max(1, int(math.sqrt(num_rows))),
+            num_sub_vectors=self._embedding_dimensions // 8,
+        )
 
-        default_metadata = {
-            field: None for field in document_fields.keys() | schema_fields
+    def _to_arrow(self, batch: ChunkBatch, *, schema: pa.Schema) -> pa.Table:
+        import numpy as np
+        import pyarrow as pa
+
+        columns = {
+            "__id__": pa.array(
+                [str(uuid.uuid4()) for _ in range(len(batch))], type=pa.string()
+            ),
+            "__page_numbers__": pa.array(batch.page_numbers(), type=pa.string()),
+            "__text__": pa.array(batch.texts, type=pa.string()),
+            self._VECTOR_COLUMN_NAME: pa.FixedSizeListArray.from_arrays(
+                np.asarray(
+                    batch.embeddings,
+                    dtype=schema.field(
+                        self._VECTOR_COLUMN_NAME
+                    ).type.value_type.to_pandas_dtype(),
+                ).reshape(-1),
+                self._embedding_dimensions,
+            ),
+            "__num_tokens__": pa.array(batch.num_tokens, type=pa.int32()),
         }
 
-        table.add(
-            [
-                {
-                    # Unpacking the default metadata first so it can be
-                    # overridden by concrete values if present
-                    **default_metadata,
-                    **document.metadata,
-                    "__id__": str(uuid.uuid4()),
-                    "document_id": str(document.id),
-                    "document_name": str(document.name),
-                    "__page_numbers__": self._page_numbers_to_str(chunk.page_numbers),
-                    "__text__": chunk.text,
-                    self._VECTOR_COLUMN_NAME: self._embedding_function([chunk.text])[0],
-                    "__num_tokens__": chunk.num_tokens,
-                }
-                for document in documents
-                for chunk in self._chunk_pages(
-                    document.extract_pages(),
-                    chunk_size=chunk_size,
-                    chunk_overlap=chunk_overlap,
+        # The document columns are built once per document and then repeated for each
+        # of its chunks. Documents that don't have a metadata field get null values.
+        document_indices = pa.array(batch.document_indices, type=pa.int64())
+        schema_fields = set(schema.names)
+        document_columns: dict[str, list[Any]] = {
+            "document_id": [str(document.id) for document in batch.documents],
+            "document_name": [document.name for document in batch.documents],
+            self._METADATA_COLUMN_NAME: [
+                self._serialize_metadata(
+                    {
+                        key: value
+                        for key, value in document.metadata.items()
+                        if key not in schema_fields
+                    }
                 )
-            ]
+                for document in batch.documents
+            ],
+        }
+        for field in schema.names:
+            if field not in columns and field not in document_columns:
+                document_columns[field] = [
+                    document.metadata.get(field) for document in batch.documents
+                ]
+        for field, values in document_columns.items():
+            columns[field] = pa.array(values, type=schema.field(field).type).take(
+                document_indices
+            )
+
+        return pa.Table.from_arrays(
+            [columns[field] for field in schema.names], schema=schema
         )
 
     # https://lancedb.github.io/lancedb/sql/
@@ -207,7 +468,18 @@ class LanceDB(VectorDatabaseSourceStorage):
         MetadataOperator.IN: "IN",
     }
 
-    def _translate_metadata_filter(self, metadata_filter: MetadataFilter) -> str:
+    def _serialize_metadata(self, metadata: dict[str, Any]) -> str | None:
+        if not metadata:
+            return None
+        # The compact and sorted serialization is relied upon when filtering.
+        return json.dumps(metadata, separators=(",", ":"), sort_keys=True)
+
+    def _translate_metadata_filter(
+        self,
+        metadata_filter: MetadataFilter,
+        *,
+        columns: Collection[str] | None = None,
+    ) -> str:
         if metadata_filter.operator is MetadataOperator.RAW:
             return cast(str, metadata_filter.value)
         if metadata_filter.operator in {
@@ -216,16 +488,20 @@ class LanceDB(VectorDatabaseSourceStorage):
         }:
             operator = f" {self._METADATA_OPERATOR_MAP[metadata_filter.operator]} "
             return operator.join(
-                f"({self._translate_metadata_filter(child)})"
+                f"({self._translate_metadata_filter(child, columns=columns)})"
                 for child in metadata_filter.value
             )
         if metadata_filter.operator is MetadataOperator.NOT_IN:
             in_ = self._translate_metadata_filter(
-                MetadataFilter.in_(metadata_filter.key, metadata_filter.value)
+                MetadataFilter.in_(metadata_filter.key, metadata_filter.value),
+                columns=columns,
             )
             return f"NOT ({in_})"
 
         key = metadata_filter.key
+        if columns is not None and key not in columns:
+            return self._translate_json_metadata_filter(metadata_filter)
+
         operator = self._METADATA_OPERATOR_MAP[metadata_filter.operator]
         value = (
             tuple(metadata_filter.value)
@@ -234,6 +510,45 @@ class LanceDB(VectorDatabaseSourceStorage):
         )
         return f"{key} {operator} {value!r}"
 
+    def _translate_json_metadata_filter(self, metadata_filter: MetadataFilter) -> str:
+        # LanceDB does not provide JSON functions. Thus, the value is extracted from
+        # the serialized metadata with a regular expression. This is still evaluated
+        # while scanning and thus benefits from prefiltering.
+        key = metadata_filter.key
+        if metadata_filter.operator is MetadataOperator.IN:
+            if not metadata_filter.value:
+                return "FALSE"
+            return " OR ".join(
+                f"({self._translate_json_metadata_filter(MetadataFilter.eq(key, value))})"
+                for value in metadata_filter.value
+            )
+
+        value = metadata_filter.value
+        if isinstance(value, bool):
+            value_pattern = "(true|false)"
+            literal = _sql_string(json.dumps(value))
+        elif isinstance(value, int | float):
+            value_pattern = "(-?[0-9][0-9.eE+-]*)"
+            literal = repr(float(value))
+        else:
+            value_pattern = r'"((?:[^"\\]|\\.)*)"'
+            # Strings are compared in their serialized form. This is exact for
+            # equality, but only orders ASCII strings without escapes correctly.
+            literal = _sql_string(json.dumps(str(value))[1:-1])
+
+        # Quotes inside of strings are always escaped. Thus, a quoted key preceded by
+        # the start of the object or a comma cannot match inside of a value.
+        key_pattern = f"[{{,]{_regex_escape(json.dumps(key))}:"
+        extracted = (
+            f"regexp_match({self._METADATA_COLUMN_NAME}, "
+            f"{_sql_string(f'{key_pattern}{value_pattern}[,}}]')})[1]"
+        )
+        if isinstance(value, int | float) and not isinstance(value, bool):
+            extracted = f"CAST({extracted} AS DOUBLE)"
+
+        operator = self._METADATA_OPERATOR_MAP[metadata_filter.operator]
+        return f"{extracted} {operator} {literal}"
+
     def retrieve(
         self,
         corpus_name: str,
@@ -243,6 +558,23 @@ class LanceDB(VectorDatabaseSourceStorage):
         chunk_size: int = 500,
         num_tokens: int = 1024,
     ) -> list[Source]:
+        return self.retrieve_many(
+            corpus_name,
+            [metadata_filter],
+            [prompt],
+            chunk_size=chunk_size,
+            num_tokens=num_tokens,
+        )[0]
+
+    def retrieve_many(
+        self,
+        corpus_name: str,
+        metadata_filters: list[MetadataFilter | None],
+        prompts: list[str],
+        *,
+        chunk_size: int = 500,
+        num_tokens: int = 1024,
+    ) -> list[list[Source]]:
         table = self._get_table(corpus_name)
 
         # We cannot retrieve source by a maximum number of tokens. Thus, we estimate how
@@ -250,32 +582,116 @@ class LanceDB(VectorDatabaseSourceStorage):
         # retrieving too few sources and needing to query again.
         limit = int(num_tokens * 2 / chunk_size)
 
-        search = table.search(
-            self._embedding_function([prompt])[0],
-            vector_column_name=self._VECTOR_COLUMN_NAME,
-        )
+        groups = self._group_by_metadata_filter(metadata_filters, prompts)
+        query_embeddings = self._embed_prompts(prompts)
+        vector_compression = self._get_vector_compression(table)
 
-        if metadata_filter:
-            search = search.where(
-                self._translate_metadata_filter(metadata_filter), prefilter=True
+        sources: list[list[Source]] = [[] for _ in prompts]
+        for metadata_filter, idcs in groups:
+            where = (
+                self._translate_metadata_filter(
+                    metadata_filter, columns=table.schema.names
+                )
+                if metadata_filter
+                else None
             )
-
-        results = search.limit(limit).to_arrow()
-
-        return self._take_sources_up_to_max_tokens(
-            (
-                Source(
-                    id=result["__id__"],
-                    document_id=result["document_id"],
-                    document_name=result["document_name"],
-                    # For some reason adding an empty string during store() results
-                    # in this field being None. Thus, we need to parse it back here.
-                    # TODO: See if there is a configuration option for this
-                    location=result["__page_numbers__"] or "",
-                    content=result["__text__"],
-                    num_tokens=result["__num_tokens__"],
+            num_candidates = self._corpus_cache.get_count(corpus_name, where)
+            if num_candidates is None:
+                num_candidates = table.count_rows(where)
+                self._corpus_cache.set_count(corpus_name, where, num_candidates)
+
+            candidates: pa.Table | None = None
+            if (
+                self._plan_retrieval(
+                    corpus_name=corpus_name,
+                    metadata_filter=metadata_filter,
+                    num_candidates=num_candidates,
                 )
-                for result in results.to_pylist()
-            ),
-            max_tokens=num_tokens,
-        )
+                is RetrievalPlan.EXACT
+            ):
+                # The cached number of candidates might be outdated. Thus, we fetch one
+                # more than the maximum to detect if there are too many after all.
+                query = table.search()
+                if where is not None:
+                    query = query.where(where)
+                candidates = query.limit(
+                    self._EXACT_SEARCH_MAX_CANDIDATES + 1
+                ).to_arrow()
+                if len(candidates) > self._EXACT_SEARCH_MAX_CANDIDATES:
+                    self._corpus_cache.invalidate(corpus_name)
+                    candidates = None
+
+            if candidates is not None:
+                group_results = [
+                    candidates.take([idx for idx, _ in query_results])
+                    for query_results in self._exact_search(
+                        [query_embeddings[idx] for idx in idcs],
+                        candidates[self._VECTOR_COLUMN_NAME]
+                        .combine_chunks()
+                        .flatten()
+                        .to_numpy()
+                        .reshape(-1, self._embedding_dimensions),
+                        limit=limit,
+                    )
+                ]
+            else:
+                search = table.search(
+                    [query_embeddings[idx] for idx in idcs],
+                    vector_column_name=self._VECTOR_COLUMN_NAME,
+                )
+                if where is not None:
+                    search = search.where(where, prefilter=True)
+                if vector_compression == "pq":
+                    search = search.refine_factor(self._PQ_REFINE_FACTOR)
+                results = search.limit(limit).to_arrow()
+                # Searching with multiple vectors adds a column with the index of the
+                # query vector for each result.
+                if "query_index" in results.column_names:
+                    query_idcs = results["query_index"].to_pylist()
+                    group_results = [
+                        results.take(
+                            [
+                                idx
+                                for idx, query_idx_ in enumerate(query_idcs)
+                                if query_idx_ == query_idx
+                            ]
+                        )
+                        for query_idx in range(len(idcs))
+                    ]
+                else:
+                    group_results = [results]
+
+            for idx, results in zip(idcs, group_results, strict=True):
+                sources[idx] = self._take_sources_up_to_max_tokens(
+                    (
+                        Source(
+                            id=result["__id__"],
+                            document_id=result["document_id"],
+                            document_name=result["document_name"],
+                            # For some reason adding an empty string during store()
+                            # results in this field being None. Thus, we need to parse
+                            # it back here.
+                            # TODO: See if there is a configuration option for this
+                            location=result["__page_numbers__"] or "",
+                            content=result["__text__"],
+                            num_tokens=result["__num_tokens__"],
+                        )
+                        for result in results.to_pylist()
+                    ),
+                    max_tokens=num_tokens,
+                )
+
+        return sources
+
+
+def _sql_string(value: str) -> str:
+    return "'{}'".format(value.replace("'", "''"))
+
+
+def _regex_escape(value: str) -> str:
+    # Python's re.escape() produces escape sequences that the Rust regex engine of
+    # LanceDB does not understand. Escaping by code point is understood by both.
+    return "".join(
+        char if char.isascii() and char.isalnum() else f"\\x{{{ord(char):x}}}"
+        for char in value
+    )
@@ -8,6 +8,7 @@ from collections.abc import AsyncIterator
 from typing import TYPE_CHECKING, Any, cast
 
 import ragna
+from ragna._utils import as_async_iterator, as_awaitable
 from ragna.core import (
     Document,
     MetadataFilter,
@@ -18,7 +19,11 @@ from ragna.core import (
 )
 
 from ._utils import raise_no_corpuses_available, raise_non_existing_corpus
-from ._vector_database import VectorDatabaseSourceStorage
+from ._vector_database import (
+    RetrievalPlan,
+    VectorCompression,
+    VectorDatabaseSourceStorage,
+)
 
 if TYPE_CHECKING:
     from qdrant_client import models
@@ -44,6 +49,12 @@ class Qdrant(VectorDatabaseSourceStorage):
 
     DOC_CONTENT_KEY = "__document"
 
+    # The quantized vectors are only used to find candidates, which are then rescored
+    # with the full precision vectors. Fetching more candidates than requested makes
+    # up for the quantization errors. Binary quantization loses more information and
+    # thus needs more candidates.
+    _QUANTIZATION_OVERSAMPLING = {"scalar": 2.0, "binary": 3.0}
+
     @classmethod
     def requirements(cls) -> list[Requirement]:
         return [
@@ -62,10 +73,25 @@ class Qdrant(VectorDatabaseSourceStorage):
             kwargs = {"path": str(ragna.local_root() / "qdrant")}
         self._client = AsyncQdrantClient(**kwargs)  # type: ignore[arg-type]
 
+    async def warmup(self) -> None:
+        await as_awaitable(super().warmup)
+        # This establishes the connection in case of a remote server.
+        await self.list_corpuses()
+
     async def list_corpuses(self) -> list[str]:
         return [c.name for c in (await self._client.get_collections()).collections]
 
-    async def _ensure_table(self, corpus_name: str, *, create: bool = False) -> None:
+    async def _ensure_table(
+        self,
+        corpus_name: str,
+        *,
+        create: bool = False,
+        vector_compression: VectorCompression = "none",
+    ) -> models.CollectionInfo:
+        info: models.CollectionInfo | None = self._corpus_cache.get_handle(corpus_name)
+        if info is not None:
+            return info
+
         table_names = await self.list_corpuses()
         no_corpuses = not table_names
         non_existing_corpus = corpus_name not in table_names
@@ -73,17 +99,65 @@ class Qdrant(VectorDatabaseSourceStorage):
         if non_existing_corpus and create:
             from qdrant_client import models
 
+            quantization_config: models.QuantizationConfig | None
+            if vector_compression == "scalar":
+                quantization_config = models.ScalarQuantization(
+                    scalar=models.ScalarQuantizationConfig(
+                        type=models.ScalarType.INT8, always_ram=True
+                    )
+                )
+            elif vector_compression == "binary":
+                quantization_config = models.BinaryQuantization(
+                    binary=models.BinaryQuantizationConfig(always_ram=True)
+                )
+            else:
+                quantization_config = None
+
             await self._client.create_collection(
                 collection_name=corpus_name,
                 vectors_config=models.VectorParams(
-                    size=self._embedding_dimensions, distance=models.Distance.COSINE
+                    size=self._embedding_dimensions,
+                    distance=models.Distance.COSINE,
+                    # With quantization, the search runs on the compressed vectors in
+                    # RAM. The full precision vectors are only read from disk to
+                    # rescore the best candidates.
+                    on_disk=quantization_config is not None,
+                    datatype=(
+                        models.Datatype.FLOAT16
+                        if vector_compression == "float16"
+                        else None
+                    ),
                 ),
+                quantization_config=quantization_config,
             )
         elif no_corpuses:
             raise_no_corpuses_available(self)
         elif non_existing_corpus:
             raise_non_existing_corpus(self, corpus_name)
 
+        # The information is only used for the configuration of the collection, which
+        # does not change after it was created.
+        info = await self._client.get_collection(corpus_name)
+        self._corpus_cache.set_handle(corpus_name, info)
+        return info
+
+    async def _get_vector_compression(self, corpus_name: str) -> VectorCompression:
+        from qdrant_client import models
+
+        # The choice is recorded in the configuration of the collection.
+        config = (await self._ensure_table(corpus_name)).config
+        if isinstance(config.quantization_config, models.ScalarQuantization):
+            return "scalar"
+        if isinstance(config.quantization_config, models.BinaryQuantization):
+            return "binary"
+        vectors_config = config.params.vectors
+        if (
+            isinstance(vectors_config, models.VectorParams)
+            and vectors_config.datatype == models.Datatype.FLOAT16
+        ):
+            return "float16"
+        return "none"
+
     async def _fetch_raw_metadata_entries(
         self, *, corpus_name: str
     ) -> AsyncIterator[dict[str, Any]]:
@@ -170,39 +244,61 @@ class Qdrant(VectorDatabaseSourceStorage):
         *,
         chunk_size: int = 500,
         chunk_overlap: int = 250,
+        vector_compression: VectorCompression = "none",
     ) -> None:
+        """Store content of documents.
+
+        Args:
+            corpus_name: Name of the corpus to store the documents in.
+            documents: Documents to store.
+            chunk_size: Number of tokens of each chunk.
+            chunk_overlap: Number of tokens that consecutive chunks overlap.
+            vector_compression: How the embeddings are stored. This only applies if
+                the corpus is created and is ignored for existing ones. Supported
+                options are
+
+                - `"none"`: Full precision vectors.
+                - `"float16"`: Half precision vectors. This halves the memory.
+                - `"scalar"`: Scalar quantization of the vectors to `int8`, which are
+                  kept in RAM. The full precision vectors are kept on disk and used to
+                  rescore the candidates. This reduces the RAM by 75%.
+                - `"binary"`: Like `"scalar"`, but with binary quantization that only
+                  needs 1 bit per dimension.
+        """
+        self._check_vector_compression(
+            vector_compression, supported={"none", "float16", "scalar", "binary"}
+        )
+
         from qdrant_client import models
 
-        await self._ensure_table(corpus_name, create=True)
+        await self._ensure_table(
+            corpus_name, create=True, vector_compression=vector_compression
+        )
 
-        points = []
-        for document in documents:
-            for chunk in self._chunk_pages(
-                document.extract_pages(),
-                chunk_size=chunk_size,
-                chunk_overlap=chunk_overlap,
-            ):
-                points.append(
-                    models.PointStruct(
-                        id=str(uuid.uuid4()),
-                        vector=cast(
-                            list[float],
-                            self._embedding_function([chunk.text])[0].tolist(),
-                        ),
-                        payload={
-                            "document_id": str(document.id),
-                            "document_name": document.name,
-                            **document.metadata,
-                            "__page_numbers__": self._page_numbers_to_str(
-                                chunk.page_numbers
-                            ),
-                            "__num_tokens__": chunk.num_tokens,
-                            self.DOC_CONTENT_KEY: chunk.text,
-                        },
-                    )
-                )
+        # Extracting and chunking is CPU bound. Thus, we must not run it on the event
+        # loop.
+        async for batch in as_async_iterator(
+            self._ingest_batches,
+            documents,
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+        ):
+            payloads = list(batch.metadatas())
+            for payload, text in zip(payloads, batch.texts, strict=True):
+                payload[self.DOC_CONTENT_KEY] = text
 
-        await self._client.upsert(collection_name=corpus_name, points=points)
+            await self._client.upsert(
+                collection_name=corpus_name,
+                points=models.Batch(
+                    ids=[str(uuid.uuid4()) for _ in range(len(batch))],
+                    vectors=[
+                        cast(list[float], embedding.tolist())
+                        for embedding in batch.embeddings
+                    ],
+                    payloads=payloads,
+                ),
+            )
+        self._corpus_cache.invalidate(corpus_name)
 
     def _build_condition(
         self, operator: MetadataOperator, key: str, value: Any
@@ -265,6 +361,25 @@ class Qdrant(VectorDatabaseSourceStorage):
         chunk_size: int = 500,
         num_tokens: int = 1024,
     ) -> list[Source]:
+        return (
+            await self.retrieve_many(
+                corpus_name,
+                [metadata_filter],
+                [prompt],
+                chunk_size=chunk_size,
+                num_tokens=num_tokens,
+            )
+        )[0]
+
+    async def retrieve_many(
+        self,
+        corpus_name: str,
+        metadata_filters: list[MetadataFilter | None],
+        prompts: list[str],
+        *,
+        chunk_size: int = 500,
+        num_tokens: int = 1024,
+    ) -> list[list[Source]]:
         from qdrant_client import models
 
         await self._ensure_table(corpus_name)
@@ -274,39 +389,127 @@ class Qdrant(VectorDatabaseSourceStorage):
         # retrieving too few sources and needing to query again.
         limit = int(num_tokens * 2 / chunk_size)
 
-        query_vector = self._embedding_function([prompt])[0]
-
-        search_filter = (
-            self._translate_metadata_filter(metadata_filter)
-            if metadata_filter
+        groups = self._group_by_metadata_filter(metadata_filters, prompts)
+        # Embedding is CPU bound and might wait for a concurrent embedding of the same
+        # prompts. Thus, we must not run it on the event loop.
+        query_vectors = await as_awaitable(self._embed_prompts, prompts)
+
+        vector_compression = await self._get_vector_compression(corpus_name)
+        search_params = (
+            models.SearchParams(
+                quantization=models.QuantizationSearchParams(
+                    rescore=True,
+                    oversampling=self._QUANTIZATION_OVERSAMPLING[vector_compression],
+                )
+            )
+            if vector_compression in self._QUANTIZATION_OVERSAMPLING
             else None
         )
-        if isinstance(search_filter, models.FieldCondition):
-            search_filter = models.Filter(must=[search_filter])
 
-        points = (
-            await self._client.query_points(
-                collection_name=corpus_name,
-                query=query_vector,
-                limit=limit,
-                query_filter=search_filter,
-                with_payload=True,
+        points: list[list[models.ScoredPoint] | list[models.Record]] = [
+            [] for _ in prompts
+        ]
+        index_requests: list[tuple[int, models.QueryRequest]] = []
+        for metadata_filter, idcs in groups:
+            search_filter = (
+                self._translate_metadata_filter(metadata_filter)
+                if metadata_filter
+                else None
             )
-        ).points
-
-        return self._take_sources_up_to_max_tokens(
-            (
-                Source(
-                    id=cast(str, point.id),
-                    document_id=(payload := cast(dict[str, Any], point.payload))[
-                        "document_id"
-                    ],
-                    document_name=payload["document_name"],
-                    location=payload["__page_numbers__"],
-                    content=payload[self.DOC_CONTENT_KEY],
-                    num_tokens=payload["__num_tokens__"],
+            if isinstance(search_filter, models.FieldCondition):
+                search_filter = models.Filter(must=[search_filter])
+
+            num_candidates = self._corpus_cache.get_count(
+                corpus_name, repr(search_filter)
+            )
+            if num_candidates is None:
+                # An estimate is enough to choose the retrieval plan.
+                num_candidates = (
+                    await self._client.count(
+                        collection_name=corpus_name,
+                        count_filter=search_filter,
+                        exact=False,
+                    )
+                ).count
+                self._corpus_cache.set_count(
+                    corpus_name, repr(search_filter), num_candidates
                 )
-                for point in points
-            ),
-            max_tokens=num_tokens,
-        )
+
+            candidates: list[models.Record] | None = None
+            if (
+                self._plan_retrieval(
+                    corpus_name=corpus_name,
+                    metadata_filter=metadata_filter,
+                    num_candidates=num_candidates,
+                )
+                is RetrievalPlan.EXACT
+            ):
+                # The number of candidates is only an estimate. Thus, we fetch one
+                # more than the maximum to detect if there are too many after all.
+                candidates, _ = await self._client.scroll(
+                    collection_name=corpus_name,
+                    scroll_filter=search_filter,
+                    limit=self._EXACT_SEARCH_MAX_CANDIDATES + 1,
+                    with_payload=True,
+                    with_vectors=True,
+                )
+                if len(candidates) > self._EXACT_SEARCH_MAX_CANDIDATES:
+                    self._corpus_cache.invalidate(corpus_name)
+                    candidates = None
+
+            if candidates is not None:
+                for idx, query_results in zip(
+                    idcs,
+                    self._exact_search(
+                        [query_vectors[idx] for idx in idcs],
+                        [candidate.vector for candidate in candidates],
+                        limit=limit,
+                    ),
+                    strict=True,
+                ):
+                    points[idx] = [candidates[idx_] for idx_, _ in query_results]
+            else:
+                index_requests.extend(
+                    (
+                        idx,
+                        models.QueryRequest(
+                            query=cast(list[float], query_vectors[idx].tolist()),
+                            filter=search_filter,
+                            params=search_params,
+                            limit=limit,
+                            with_payload=True,
+                        ),
+                    )
+                    for idx in idcs
+                )
+
+        if index_requests:
+            request_idcs, requests = zip(*index_requests, strict=True)
+            for idx, response in zip(
+                request_idcs,
+                await self._client.query_batch_points(
+                    collection_name=corpus_name, requests=requests
+                ),
+                strict=True,
+            ):
+                points[idx] = response.points
+
+        return [
+            self._take_sources_up_to_max_tokens(
+                (
+                    Source(
+                        id=cast(str, point.id),
+                        document_id=(payload := cast(dict[str, Any], point.payload))[
+                            "document_id"
+                        ],
+                        document_name=payload["document_name"],
+                        location=payload["__page_numbers__"],
+                        content=payload[self.DOC_CONTENT_KEY],
+                        num_tokens=payload["__num_tokens__"],
+                    )
+                    for point in query_points
+                ),
+                max_tokens=num_tokens,
+            )
+            for query_points in points
+        ]
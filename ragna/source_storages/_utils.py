@@ -1,6 +1,6 @@
 from typing import NoReturn
 
-from fastapi import status
+from starlette import status
 
 from ragna.core import RagnaException, SourceStorage
 
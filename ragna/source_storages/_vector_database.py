@@ -1,14 +1,47 @@
+import array
+import concurrent.futures
 import dataclasses
+import enum
+import functools
 import hashlib
+import inspect
 import itertools
-from collections import deque
-from collections.abc import Iterable, Iterator
-from typing import TypeVar, cast
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from collections.abc import Callable, Hashable, Iterable, Iterator, Sequence
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Literal, TypeVar, cast
 
-from ragna.core import PackageRequirement, Page, Requirement, Source, SourceStorage
+from starlette import status
+
+import ragna
+from ragna._utils import ProcessPool
+from ragna.core import (
+    Document,
+    MetadataFilter,
+    ModelArtifact,
+    PackageRequirement,
+    Page,
+    RagnaException,
+    Requirement,
+    Source,
+    SourceStorage,
+)
+from ragna.core._artifact_cache import ARTIFACT_CACHE
+
+if TYPE_CHECKING:
+    import chromadb.api.types
+    import tiktoken
 
 T = TypeVar("T")
 
+_logger = logging.getLogger(__name__)
+
 
 # The function is adapted from more_itertools.windowed to allow a ragged last window
 # https://more-itertools.readthedocs.io/en/stable/api.html#more_itertools.windowed
@@ -29,14 +62,475 @@ def _windowed_ragged(
         yield tuple(window)[i:]
 
 
+# Page range of chunks without page numbers
+_NO_PAGE = -1
+
+
+def _page_range_to_str(start: int, stop: int) -> str:
+    if start == _NO_PAGE:
+        return ""
+    if start == stop:
+        return str(start)
+    if stop == start + 1:
+        return f"{start}, {stop}"
+    return f"{start}-{stop}"
+
+
 @dataclasses.dataclass
-class Chunk:
-    text: str
-    page_numbers: list[int] | None
-    num_tokens: int
+class DocumentChunks:
+    """Chunks of a single document as struct of arrays.
+
+    A chunk covers the pages from `page_starts` to `page_stops`, both inclusive.
+    Chunks without page numbers have `_NO_PAGE` for both.
+    """
+
+    texts: list[str] = dataclasses.field(default_factory=list)
+    num_tokens: "array.array[int]" = dataclasses.field(
+        default_factory=lambda: array.array("q")
+    )
+    page_starts: "array.array[int]" = dataclasses.field(
+        default_factory=lambda: array.array("q")
+    )
+    page_stops: "array.array[int]" = dataclasses.field(
+        default_factory=lambda: array.array("q")
+    )
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def to_json(self) -> dict[str, list]:
+        return {
+            "texts": self.texts,
+            "num_tokens": self.num_tokens.tolist(),
+            "page_starts": self.page_starts.tolist(),
+            "page_stops": self.page_stops.tolist(),
+        }
+
+    @classmethod
+    def from_json(cls, data: dict[str, list]) -> "DocumentChunks":
+        return cls(
+            texts=data["texts"],
+            num_tokens=array.array("q", data["num_tokens"]),
+            page_starts=array.array("q", data["page_starts"]),
+            page_stops=array.array("q", data["page_stops"]),
+        )
+
+
+@dataclasses.dataclass
+class ChunkBatch:
+    """Chunks of one or more documents as struct of arrays.
+
+    Each document is only referenced once in `documents`, rather than copying its
+    metadata for every chunk. `document_indices` maps each chunk to the index of its
+    document. All other fields hold one item per chunk.
+    """
+
+    documents: list[Document] = dataclasses.field(default_factory=list)
+    document_indices: "array.array[int]" = dataclasses.field(
+        default_factory=lambda: array.array("q")
+    )
+    texts: list[str] = dataclasses.field(default_factory=list)
+    num_tokens: "array.array[int]" = dataclasses.field(
+        default_factory=lambda: array.array("q")
+    )
+    page_starts: "array.array[int]" = dataclasses.field(
+        default_factory=lambda: array.array("q")
+    )
+    page_stops: "array.array[int]" = dataclasses.field(
+        default_factory=lambda: array.array("q")
+    )
+    embeddings: list[Any] = dataclasses.field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def extend(
+        self,
+        document: Document,
+        chunks: DocumentChunks,
+        embeddings: Sequence[Any],
+        *,
+        start: int,
+        stop: int,
+    ) -> None:
+        """Add the chunks `start:stop` of a document."""
+        if start >= stop:
+            return
+
+        # Chunks arrive grouped by document. Thus, we only need to compare against the
+        # last document.
+        if not self.documents or self.documents[-1] is not document:
+            self.documents.append(document)
+        self.document_indices.extend(
+            itertools.repeat(len(self.documents) - 1, stop - start)
+        )
+        self.texts.extend(chunks.texts[start:stop])
+        self.num_tokens.extend(chunks.num_tokens[start:stop])
+        self.page_starts.extend(chunks.page_starts[start:stop])
+        self.page_stops.extend(chunks.page_stops[start:stop])
+        self.embeddings.extend(embeddings[start:stop])
+
+    def page_numbers(self) -> list[str]:
+        """Page numbers of each chunk formatted as they are stored, e.g. "1-3"."""
+        return list(map(_page_range_to_str, self.page_starts, self.page_stops))
+
+    def metadatas(self) -> Iterator[dict[str, Any]]:
+        """Metadata of each chunk.
+
+        This is for vector databases that need a mapping per record. The metadata of
+        each document is only merged once and then copied for its chunks.
+        """
+        document_metadatas = [
+            {
+                "document_id": str(document.id),
+                "document_name": document.name,
+                **document.metadata,
+            }
+            for document in self.documents
+        ]
+        for document_index, page_numbers, num_tokens in zip(
+            self.document_indices, self.page_numbers(), self.num_tokens, strict=True
+        ):
+            yield {
+                **document_metadatas[document_index],
+                "__page_numbers__": page_numbers,
+                "__num_tokens__": num_tokens,
+            }
+
+
+class _QueryEmbeddingCache:
+    # Shared by all vector database instances in a process. If a chat retrieves from
+    # multiple source storages that use the same embedding model, the prompt is only
+    # embedded once, even if the storages retrieve concurrently.
+    def __init__(self, *, maxsize: int) -> None:
+        self._maxsize = maxsize
+        self._lock = threading.Lock()
+        self._futures: OrderedDict[tuple[str, str], concurrent.futures.Future] = (
+            OrderedDict()
+        )
+
+    def get(
+        self,
+        embedding_id: str,
+        prompts: list[str],
+        embed: Callable[[list[str]], Sequence[Any]],
+    ) -> list[Any]:
+        keys = [(embedding_id, prompt) for prompt in prompts]
+        owned: dict[tuple[str, str], concurrent.futures.Future] = {}
+        with self._lock:
+            futures = []
+            for key in keys:
+                future = self._futures.get(key)
+                if future is None:
+                    future = owned.get(key)
+                    if future is None:
+                        future = owned[key] = concurrent.futures.Future()
+                        self._futures[key] = future
+                else:
+                    self._futures.move_to_end(key)
+                futures.append(future)
+
+            while len(self._futures) > self._maxsize:
+                self._futures.popitem(last=False)
+
+        if owned:
+            try:
+                embeddings = embed([prompt for _, prompt in owned])
+            except BaseException as exc:
+                with self._lock:
+                    for key, future in owned.items():
+                        self._futures.pop(key, None)
+                        future.set_exception(exc)
+                raise
+
+            for future, embedding in zip(owned.values(), embeddings, strict=True):
+                future.set_result(embedding)
+
+        return [future.result() for future in futures]
+
+
+_QUERY_EMBEDDING_CACHE = _QueryEmbeddingCache(maxsize=1_024)
+
+
+class _OnnxMiniLmL6V2(ModelArtifact):
+    name = "chroma-onnx-all-MiniLM-L6-v2"
+
+    def _make_embedding_function(self, path: Path | None) -> Any:
+        import chromadb.utils.embedding_functions
+
+        embedding_function = chromadb.utils.embedding_functions.ONNXMiniLM_L6_V2()
+        # The embedding function only downloads the model if it is not present in
+        # this directory.
+        if path is not None:
+            embedding_function.DOWNLOAD_PATH = path
+        return embedding_function
+
+    def _pull(self, path: Path) -> None:
+        embedding_function = self._make_embedding_function(path)
+        # The model is downloaded on first use. This also verifies the checksum of the
+        # downloaded archive.
+        embedding_function(["warmup"])
+        (path / embedding_function.ARCHIVE_FILENAME).unlink(missing_ok=True)
+
+    def load(self) -> "chromadb.api.types.EmbeddingFunction":
+        return cast(
+            "chromadb.api.types.EmbeddingFunction",
+            self._make_embedding_function(self.path if self.is_available() else None),
+        )
+
+
+class _TiktokenEncoding(ModelArtifact):
+    def __init__(self, encoding_name: str) -> None:
+        self._encoding_name = encoding_name
+
+    @property
+    def name(self) -> str:
+        return f"tiktoken-{self._encoding_name}"
+
+    def _pull(self, path: Path) -> None:
+        # tiktoken reads its cache directory only from the environment and keeps the
+        # loaded encodings in memory. Thus, we download the encoding in a subprocess
+        # to leave the environment and the encodings of this process untouched. The
+        # download verifies the checksum of the file.
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                f"import tiktoken; tiktoken.get_encoding({self._encoding_name!r})",
+            ],
+            env={**os.environ, "TIKTOKEN_CACHE_DIR": str(path)},
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            raise RagnaException(
+                "Downloading the tiktoken encoding failed",
+                encoding_name=self._encoding_name,
+                # The last line of the traceback holds the actual error.
+                error=result.stderr.strip().rsplit("\n", 1)[-1],
+            )
+
+    def load(self) -> "tiktoken.Encoding":
+        import tiktoken
+
+        # The cache directory is only set once for the whole process. A directory set
+        # by the user takes precedence.
+        if self.is_available():
+            os.environ.setdefault("TIKTOKEN_CACHE_DIR", str(self.path))
+        return tiktoken.get_encoding(self._encoding_name)
+
+
+def _chunk_pages(
+    pages: Iterable[Page],
+    *,
+    tokenizer: "tiktoken.Encoding",
+    chunk_size: int,
+    chunk_overlap: int,
+) -> DocumentChunks:
+    chunks = DocumentChunks()
+    for window in _windowed_ragged(
+        (
+            (tokens, page.number)
+            for page in pages
+            for tokens in tokenizer.encode(page.text)
+        ),
+        n=chunk_size,
+        step=chunk_size - chunk_overlap,
+    ):
+        tokens, page_numbers = zip(*window, strict=False)
+        chunks.texts.append(tokenizer.decode(tokens))
+        chunks.num_tokens.append(len(tokens))
+        chunks.page_starts.append(
+            min((n for n in page_numbers if n is not None), default=_NO_PAGE)
+        )
+        chunks.page_stops.append(
+            max((n for n in page_numbers if n is not None), default=_NO_PAGE)
+        )
+    return chunks
+
+
+def _chunk_document(
+    document: Document,
+    *,
+    tokenizer: "tiktoken.Encoding",
+    tokenizer_name: str,
+    chunk_size: int,
+    chunk_overlap: int,
+) -> DocumentChunks:
+    def chunk() -> DocumentChunks:
+        return _chunk_pages(
+            document.extract_pages(),
+            tokenizer=tokenizer,
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+        )
+
+    if not ARTIFACT_CACHE.enabled:
+        return chunk()
+
+    key = (
+        f"chunks:{tokenizer_name}:{chunk_size}:{chunk_overlap}"
+        f":{document._artifact_cache_key()}"
+    )
+    cached_chunks = ARTIFACT_CACHE.get(key)
+    if cached_chunks is not None:
+        return DocumentChunks.from_json(cached_chunks)
+
+    chunks = chunk()
+    ARTIFACT_CACHE.set(key, chunks.to_json())
+    return chunks
+
+
+# The model artifacts are loaded at most once per worker process of the pool below.
+@functools.cache
+def _load_tokenizer(name: str) -> "tiktoken.Encoding":
+    return _TiktokenEncoding(name).load()
+
+
+@functools.cache
+def _load_embedding_function() -> "chromadb.api.types.EmbeddingFunction":
+    return _OnnxMiniLmL6V2().load()
+
+
+def _ingest_document(
+    document: Document,
+    *,
+    local_root: Path,
+    tokenizer_name: str,
+    chunk_size: int,
+    chunk_overlap: int,
+    embed: bool,
+) -> tuple[DocumentChunks, list[Any] | None]:
+    # This runs in a fresh process. Thus, we need to restore the local root to find
+    # the pulled model artifacts and the artifact cache.
+    ragna.local_root(local_root)
+    chunks = _chunk_document(
+        document,
+        tokenizer=_load_tokenizer(tokenizer_name),
+        tokenizer_name=tokenizer_name,
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+    )
+    if not (embed and chunks):
+        return chunks, None
+
+    return chunks, list(_load_embedding_function()(chunks.texts))
+
+
+class _IngestProcessPool(ProcessPool):
+    # Extracting, chunking, and embedding documents is CPU bound. Running it in
+    # threads of the API process competes for the GIL with the event loop and thus
+    # increases the latency of all concurrent requests. Worker processes avoid that.
+    def __init__(self) -> None:
+        super().__init__("RAGNA_INGEST_PROCESSES")
+
+    @property
+    def embed(self) -> bool:
+        return os.environ.get("RAGNA_INGEST_EMBED_IN_PROCESSES", "").lower() in {
+            "1",
+            "true",
+            "yes",
+        }
+
+
+_INGEST_PROCESS_POOL = _IngestProcessPool()
+
+_DEFAULT_STORE_BATCH_MAX_SIZE = 64 * 1024**2
+
+_DEFAULT_CORPUS_CACHE_TTL = 60.0
+
+
+class _CorpusCache:
+    # Open corpus handles and the number of chunks matching a metadata filter, such
+    # that retrieving does not need to look up the corpus and count its chunks every
+    # time. Storing into a corpus invalidates its counts. Entries expire after `ttl`
+    # seconds, such that changes by other processes, e.g. deleted corpuses or stored
+    # documents, are eventually picked up. Missing corpuses are never cached. Thus,
+    # corpuses created by other processes are picked up immediately. A `ttl` of `0`
+    # disables the cache.
+    def __init__(self, *, ttl: float, max_counts: int = 1_024) -> None:
+        self._ttl = ttl
+        self._max_counts = max_counts
+        self._lock = threading.Lock()
+        self._handles: dict[str, tuple[float, Any]] = {}
+        self._counts: OrderedDict[tuple[str, Hashable], tuple[float, int]] = (
+            OrderedDict()
+        )
+
+    def get_handle(self, corpus_name: str) -> Any | None:
+        with self._lock:
+            entry = self._handles.get(corpus_name)
+            if entry is None:
+                return None
+            expires_at, handle = entry
+            if time.monotonic() >= expires_at:
+                del self._handles[corpus_name]
+                return None
+            return handle
+
+    def set_handle(self, corpus_name: str, handle: Any) -> None:
+        if self._ttl <= 0:
+            return
+        with self._lock:
+            self._handles[corpus_name] = (time.monotonic() + self._ttl, handle)
+
+    def get_count(self, corpus_name: str, key: Hashable) -> int | None:
+        with self._lock:
+            entry = self._counts.get((corpus_name, key))
+            if entry is None:
+                return None
+            expires_at, count = entry
+            if time.monotonic() >= expires_at:
+                del self._counts[(corpus_name, key)]
+                return None
+            self._counts.move_to_end((corpus_name, key))
+            return count
+
+    def set_count(self, corpus_name: str, key: Hashable, count: int) -> None:
+        if self._ttl <= 0:
+            return
+        with self._lock:
+            self._counts[(corpus_name, key)] = (time.monotonic() + self._ttl, count)
+            self._counts.move_to_end((corpus_name, key))
+            while len(self._counts) > self._max_counts:
+                self._counts.popitem(last=False)
+
+    def invalidate(self, corpus_name: str, *, handle: bool = False) -> None:
+        with self._lock:
+            for key in [key for key in self._counts if key[0] == corpus_name]:
+                del self._counts[key]
+            if handle:
+                self._handles.pop(corpus_name, None)
+
+
+# How the embeddings of a corpus are stored. Not every vector database supports all of
+# them.
+VectorCompression = Literal["none", "float16", "scalar", "binary", "pq"]
+
+
+class RetrievalPlan(enum.Enum):
+    """How the candidates of a retrieval are scored.
+
+    Attributes
+        EXACT: Fetch the embeddings of all candidates matching the metadata filter and
+            score them exactly.
+        INDEX: Query the approximate nearest neighbor index of the vector database.
+    """
+
+    EXACT = "exact"
+    INDEX = "index"
 
 
 class VectorDatabaseSourceStorage(SourceStorage):
+    # If a metadata filter matches at most this many chunks, e.g. for chats scoped to a
+    # few documents, brute-forcing the candidates is both faster and more accurate than
+    # a prefiltered search of the index.
+    _EXACT_SEARCH_MAX_CANDIDATES = 1_000
+
+    # Maximum number of chunks that are written to the vector database at once. See
+    # _ingest_batches() for details.
+    _STORE_BATCH_MAX_CHUNKS = 1_024
+
     @classmethod
     def requirements(cls) -> list[Requirement]:
         return [
@@ -51,68 +545,287 @@ class VectorDatabaseSourceStorage(SourceStorage):
             PackageRequirement("tiktoken"),
         ]
 
-    def __init__(self) -> None:
-        import chromadb.api.types
-        import chromadb.utils.embedding_functions
-        import tiktoken
+    @classmethod
+    def model_artifacts(cls) -> list[ModelArtifact]:
+        return [_OnnxMiniLmL6V2(), _TiktokenEncoding("cl100k_base")]
 
-        self._embedding_function = cast(
-            chromadb.api.types.EmbeddingFunction,
-            chromadb.utils.embedding_functions.ONNXMiniLM_L6_V2(),
-        )
+    def __init__(self) -> None:
+        # The model artifacts are loaded from the local root if they were pulled
+        # before. Otherwise, they are downloaded on first use.
+        self._embedding_function = _OnnxMiniLmL6V2().load()
         self._embedding_name = self._embedding_function.MODEL_NAME  # type: ignore[attr-defined]
         self._embedding_id = hashlib.md5(
             self._embedding_name.encode(), usedforsecurity=False
         ).hexdigest()
         # https://huggingface.co/sentence-transformers/all-MiniLM-L6-v2#all-minilm-l6-v2
         self._embedding_dimensions = 384
-        self._tokenizer = tiktoken.get_encoding("cl100k_base")
+        self._tokenizer_name = "cl100k_base"
+        self._tokenizer = _TiktokenEncoding(self._tokenizer_name).load()
+        self._corpus_cache = _CorpusCache(
+            ttl=float(
+                os.environ.get("RAGNA_CORPUS_CACHE_TTL", _DEFAULT_CORPUS_CACHE_TTL)
+            )
+        )
+
+    def warmup(self) -> None:
+        # The embedding model is only loaded on the first call. We are not going
+        # through _embed_prompts, to avoid caching the embedding of a dummy prompt.
+        self._embedding_function(["warmup"])
 
     def _chunk_pages(
         self, pages: Iterable[Page], *, chunk_size: int, chunk_overlap: int
-    ) -> Iterator[Chunk]:
-        for window in _windowed_ragged(
-            (
-                (tokens, page.number)
-                for page in pages
-                for tokens in self._tokenizer.encode(page.text)
-            ),
-            n=chunk_size,
-            step=chunk_size - chunk_overlap,
-        ):
-            tokens, page_numbers = zip(*window, strict=False)
-            yield Chunk(
-                text=self._tokenizer.decode(tokens),
-                page_numbers=list(filter(lambda n: n is not None, page_numbers))
-                or None,
-                num_tokens=len(tokens),
+    ) -> DocumentChunks:
+        return _chunk_pages(
+            pages,
+            tokenizer=self._tokenizer,
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+        )
+
+    def _chunk_document(
+        self, document: Document, *, chunk_size: int, chunk_overlap: int
+    ) -> DocumentChunks:
+        return _chunk_document(
+            document,
+            tokenizer=self._tokenizer,
+            tokenizer_name=self._tokenizer_name,
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+        )
+
+    def _embed_chunks(self, chunks: DocumentChunks) -> list[Any]:
+        if not chunks:
+            return []
+        return list(self._embedding_function(chunks.texts))
+
+    def _ingest(
+        self, documents: list[Document], *, chunk_size: int, chunk_overlap: int
+    ) -> Iterator[tuple[Document, DocumentChunks, list[Any]]]:
+        """Extract, chunk, and embed documents.
+
+        If the `RAGNA_INGEST_PROCESSES` environment variable is set to a positive
+        number, the extraction and chunking runs in a pool of that many processes. In
+        that case the documents need to be picklable. If additionally
+        `RAGNA_INGEST_EMBED_IN_PROCESSES` is set, the chunks are also embedded there.
+
+        Yields:
+            The documents in order with their chunks and the embeddings of the chunks.
+        """
+        executor = _INGEST_PROCESS_POOL.executor()
+        if executor is None:
+            for document in documents:
+                chunks = self._chunk_document(
+                    document, chunk_size=chunk_size, chunk_overlap=chunk_overlap
+                )
+                yield document, chunks, self._embed_chunks(chunks)
+            return
+
+        def submit(document: Document) -> concurrent.futures.Future:
+            return executor.submit(
+                _ingest_document,
+                document,
+                local_root=ragna.local_root(),
+                tokenizer_name=self._tokenizer_name,
+                chunk_size=chunk_size,
+                chunk_overlap=chunk_overlap,
+                embed=_INGEST_PROCESS_POOL.embed,
+            )
+
+        # The documents are processed concurrently, but we hand them out in order as
+        # soon as they are done. We only submit a few documents ahead of the one we
+        # are waiting for. Otherwise, the results of all documents could pile up in
+        # memory if the consumer is slower than the workers.
+        documents_iter = iter(documents)
+        pending: deque[tuple[Document, concurrent.futures.Future]] = deque(
+            (document, submit(document))
+            for document in itertools.islice(
+                documents_iter, 2 * _INGEST_PROCESS_POOL.num_processes
             )
+        )
+        try:
+            while pending:
+                document, future = pending.popleft()
+                next_document = next(documents_iter, None)
+                if next_document is not None:
+                    pending.append((next_document, submit(next_document)))
 
-    def _page_numbers_to_str(self, page_numbers: Iterable[int] | None) -> str:
-        if not page_numbers:
-            return ""
+                chunks, embeddings = future.result()
+                if embeddings is None:
+                    embeddings = self._embed_chunks(chunks)
+                yield document, chunks, embeddings
+        finally:
+            for _, future in pending:
+                future.cancel()
 
-        page_numbers = sorted(set(page_numbers))
-        if len(page_numbers) == 1:
-            return str(page_numbers[0])
+    def _ingest_batches(
+        self, documents: list[Document], *, chunk_size: int, chunk_overlap: int
+    ) -> Iterator[ChunkBatch]:
+        """Extract, chunk, and embed documents in batches of bounded size.
 
-        ranges_str = []
-        range_int = []
-        for current_page_number, next_page_number in itertools.pairwise(
-            itertools.chain(sorted(page_numbers), [None])
+        A batch holds at most `_STORE_BATCH_MAX_CHUNKS` chunks. Furthermore, it is
+        closed as soon as the estimated memory of its texts and embeddings exceeds the
+        `RAGNA_STORE_BATCH_MAX_SIZE` environment variable in bytes. Writing each
+        batch before the next one is produced keeps the memory of storing many
+        documents constant.
+
+        Yields:
+            Batches of chunks.
+        """
+        max_size = int(
+            os.environ.get("RAGNA_STORE_BATCH_MAX_SIZE", _DEFAULT_STORE_BATCH_MAX_SIZE)
+        )
+
+        batch = ChunkBatch()
+        size = 0
+        for document, chunks, embeddings in self._ingest(
+            documents, chunk_size=chunk_size, chunk_overlap=chunk_overlap
         ):
-            current_page_number = cast(int, current_page_number)
-
-            range_int.append(current_page_number)
-            if next_page_number is None or next_page_number > current_page_number + 1:
-                ranges_str.append(
-                    ", ".join(map(str, range_int))
-                    if len(range_int) < 3
-                    else f"{range_int[0]}-{range_int[-1]}"
+            # The chunks are copied into the batch in slices. A slice ends where the
+            # batch is full.
+            start = 0
+            for stop, text in enumerate(chunks.texts, 1):
+                # This is only a rough estimate, since the actual memory depends on
+                # the representation of the text and embedding.
+                size += len(text) + self._embedding_dimensions * 8
+                if (
+                    len(batch) + stop - start >= self._STORE_BATCH_MAX_CHUNKS
+                    or size >= max_size
+                ):
+                    batch.extend(document, chunks, embeddings, start=start, stop=stop)
+                    yield batch
+                    batch = ChunkBatch()
+                    size = 0
+                    start = stop
+            batch.extend(document, chunks, embeddings, start=start, stop=len(chunks))
+
+        if batch:
+            yield batch
+
+    def preprocess(self, documents: list[Document]) -> None:
+        # The chunks are only reused if they are cached and a chat stores the documents
+        # with the same parameters. Since we cannot know the latter in advance, we go
+        # with the default parameters of store(), which most chats use.
+        if not ARTIFACT_CACHE.enabled:
+            return
+
+        parameters = inspect.signature(self.store).parameters
+        chunk_size = parameters["chunk_size"].default
+        chunk_overlap = parameters["chunk_overlap"].default
+
+        executor = _INGEST_PROCESS_POOL.executor()
+        if executor is None:
+            for document in documents:
+                self._chunk_document(
+                    document, chunk_size=chunk_size, chunk_overlap=chunk_overlap
                 )
-                range_int = []
+            return
+
+        futures = [
+            executor.submit(
+                _ingest_document,
+                document,
+                local_root=ragna.local_root(),
+                tokenizer_name=self._tokenizer_name,
+                chunk_size=chunk_size,
+                chunk_overlap=chunk_overlap,
+                embed=False,
+            )
+            for document in documents
+        ]
+        for future in futures:
+            future.result()
+
+    def _check_vector_compression(
+        self, vector_compression: VectorCompression, *, supported: set[str]
+    ) -> None:
+        if vector_compression not in supported:
+            raise RagnaException(
+                "Unsupported vector compression",
+                source_storage=self.display_name(),
+                vector_compression=vector_compression,
+                supported=sorted(supported),
+                http_status_code=status.HTTP_400_BAD_REQUEST,
+                http_detail=RagnaException.MESSAGE,
+            )
+
+    def _embed_prompts(self, prompts: list[str]) -> list[Any]:
+        return _QUERY_EMBEDDING_CACHE.get(
+            self._embedding_id, prompts, self._embedding_function
+        )
+
+    def _plan_retrieval(
+        self,
+        *,
+        corpus_name: str,
+        metadata_filter: MetadataFilter | None,
+        num_candidates: int,
+    ) -> RetrievalPlan:
+        plan = (
+            RetrievalPlan.EXACT
+            if num_candidates <= self._EXACT_SEARCH_MAX_CANDIDATES
+            else RetrievalPlan.INDEX
+        )
+        self._report_num_candidates(num_candidates)
+        _logger.debug(
+            "%s retrieves from corpus %r with plan %s: %d candidate(s) match %s",
+            self.display_name(),
+            corpus_name,
+            plan.value,
+            num_candidates,
+            metadata_filter,
+        )
+        return plan
+
+    def _group_by_metadata_filter(
+        self, metadata_filters: list[MetadataFilter | None], prompts: list[str]
+    ) -> list[tuple[MetadataFilter | None, list[int]]]:
+        # Prompts that share a metadata filter can be searched together in a single
+        # call. MetadataFilter is not hashable and thus we cannot use a dictionary here.
+        self._check_retrieve_many_inputs(metadata_filters, prompts)
+        groups: list[tuple[MetadataFilter | None, list[int]]] = []
+        for idx, metadata_filter in enumerate(metadata_filters):
+            for group_metadata_filter, idcs in groups:
+                if group_metadata_filter == metadata_filter:
+                    idcs.append(idx)
+                    break
+            else:
+                groups.append((metadata_filter, [idx]))
+        return groups
 
-        return ", ".join(ranges_str)
+    def _exact_search(
+        self, query_embeddings: Any, embeddings: Any, *, limit: int
+    ) -> list[list[tuple[int, float]]]:
+        import numpy as np
+
+        query_embeddings = np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32))
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if not (embeddings.size and limit > 0):
+            return [[] for _ in query_embeddings]
+
+        # The embedding function does not guarantee normalized vectors. Thus, we
+        # normalize them here so the scores are independent of the vector norm.
+        tiny = np.finfo(np.float32).tiny
+        embeddings = embeddings / np.maximum(
+            np.linalg.norm(embeddings, axis=1, keepdims=True), tiny
+        )
+        query_embeddings = query_embeddings / np.maximum(
+            np.linalg.norm(query_embeddings, axis=1, keepdims=True), tiny
+        )
+        distances = 1 - query_embeddings @ embeddings.T
+
+        limit = min(limit, embeddings.shape[0])
+        idcs = np.argpartition(distances, limit - 1, axis=1)[:, :limit]
+        idcs = np.take_along_axis(
+            idcs,
+            np.argsort(
+                np.take_along_axis(distances, idcs, axis=1), axis=1, kind="stable"
+            ),
+            axis=1,
+        )
+        return [
+            [(int(idx), float(query_distances[idx])) for idx in query_idcs]
+            for query_idcs, query_distances in zip(idcs, distances, strict=True)
+        ]
 
     def _take_sources_up_to_max_tokens(
         self, sources: Iterable[Source], *, max_tokens: int
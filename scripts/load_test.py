@@ -0,0 +1,313 @@
+"""Load generator for a Ragna deployment.
+
+Each simulated user creates chats, uploads documents, prepares the chats, and streams
+answers to a number of prompts. Afterwards, latency percentiles and error rates are
+reported per operation.
+
+To measure Ragna itself rather than an external LLM provider, start
+`scripts/mock_llm_server.py` and point the assistants to it, e.g.
+
+```bash
+python scripts/mock_llm_server.py --port 8000 &
+RAGNA_OPENAI_BASE_URL=http://127.0.0.1:8000 OPENAI_API_KEY=mock ragna deploy &
+python scripts/load_test.py --users 20 --assistant OpenAI/gpt-4
+```
+
+Unless an API key is passed, this only works if Ragna was deployed with
+`ragna.core.NoAuth`.
+"""
+
+import asyncio
+import collections
+import contextlib
+import datetime
+import json
+import time
+from collections.abc import AsyncIterator, Iterator
+from pathlib import Path
+from typing import Annotated, Any
+
+import httpx
+import typer
+from rich.console import Console
+from rich.table import Table
+
+from ragna._cli.eval import percentile
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.durations: dict[str, list[float]] = collections.defaultdict(list)
+        self.errors: dict[str, list[str]] = collections.defaultdict(list)
+
+    @contextlib.contextmanager
+    def measure(self, operation: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as exc:
+            self.errors[operation].append(f"{type(exc).__name__}: {exc}")
+            raise
+        self.durations[operation].append((time.perf_counter() - start) * 1e3)
+
+    def record(self, operation: str, ms: float) -> None:
+        self.durations[operation].append(ms)
+
+    def summary(self) -> list[dict[str, Any]]:
+        rows = []
+        for operation in sorted(self.durations.keys() | self.errors.keys()):
+            durations = sorted(self.durations[operation])
+            num_errors = len(self.errors[operation])
+            num_requests = len(durations) + num_errors
+            rows.append(
+                {
+                    "operation": operation,
+                    "num_requests": num_requests,
+                    "num_errors": num_errors,
+                    "error_rate": num_errors / num_requests if num_requests else 0.0,
+                    **{
+                        f"p{p}_ms": percentile(durations, p) if durations else None
+                        for p in (50, 95, 99)
+                    },
+                }
+            )
+        return rows
+
+
+async def _stream_answer(
+    client: httpx.AsyncClient, chat_id: str, prompt: str, *, recorder: Recorder
+) -> None:
+    start = time.perf_counter()
+    ttft_ms = None
+    async with client.stream(
+        "POST",
+        f"/api/chats/{chat_id}/answer",
+        json={"prompt": prompt, "stream": True},
+    ) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if not line:
+                continue
+            # The first chunk only carries the sources and is sent before the
+            # assistant is called.
+            if ttft_ms is None and json.loads(line)["content"]:
+                ttft_ms = (time.perf_counter() - start) * 1e3
+    if ttft_ms is not None:
+        recorder.record("answer (first chunk)", ttft_ms)
+
+
+async def _run_chat(
+    client: httpx.AsyncClient,
+    *,
+    user: int,
+    chat: int,
+    num_documents: int,
+    num_prompts: int,
+    source_storage: str,
+    assistant: str,
+    recorder: Recorder,
+) -> None:
+    with recorder.measure("register documents"):
+        documents = (
+            (
+                await client.post(
+                    "/api/documents",
+                    json=[
+                        {"name": f"user{user}-chat{chat}-document{idx}.txt"}
+                        for idx in range(num_documents)
+                    ],
+                )
+            )
+            .raise_for_status()
+            .json()
+        )
+
+    with recorder.measure("upload documents"):
+        (
+            await client.put(
+                "/api/documents",
+                files=[
+                    (
+                        "documents",
+                        (
+                            document["id"],
+                            f"Content of {document['name']}. ".encode() * 200,
+                        ),
+                    )
+                    for document in documents
+                ],
+            )
+        ).raise_for_status()
+
+    with recorder.measure("create chat"):
+        chat_data = (
+            (
+                await client.post(
+                    "/api/chats",
+                    json={
+                        "name": f"Load test {datetime.datetime.now():%x %X}",
+                        "input": [document["id"] for document in documents],
+                        "source_storage": source_storage,
+                        "assistant": assistant,
+                    },
+                )
+            )
+            .raise_for_status()
+            .json()
+        )
+
+    with recorder.measure("prepare chat"):
+        (await client.post(f"/api/chats/{chat_data['id']}/prepare")).raise_for_status()
+
+    for idx in range(num_prompts):
+        # A failed answer does not invalidate the chat. Thus, we keep going.
+        with contextlib.suppress(Exception), recorder.measure("answer (total)"):
+            await _stream_answer(
+                client, chat_data["id"], f"What is Ragna? ({idx})", recorder=recorder
+            )
+
+
+@contextlib.asynccontextmanager
+async def _make_client(
+    url: str, api_key: str | None
+) -> AsyncIterator[httpx.AsyncClient]:
+    async with httpx.AsyncClient(base_url=url, timeout=None) as client:
+        if api_key is not None:
+            client.headers["Authorization"] = f"Bearer {api_key}"
+        else:
+            (await client.get("/login", follow_redirects=True)).raise_for_status()
+        yield client
+
+
+async def _run_user(
+    url: str,
+    *,
+    user: int,
+    delay: float,
+    api_key: str | None,
+    num_chats: int,
+    recorder: Recorder,
+    **chat_kwargs: Any,
+) -> None:
+    await asyncio.sleep(delay)
+    async with contextlib.AsyncExitStack() as stack:
+        try:
+            with recorder.measure("login"):
+                client = await stack.enter_async_context(_make_client(url, api_key))
+        except Exception:
+            return
+
+        for chat in range(num_chats):
+            with contextlib.suppress(Exception):
+                await _run_chat(
+                    client, user=user, chat=chat, recorder=recorder, **chat_kwargs
+                )
+
+
+async def run(
+    url: str,
+    *,
+    num_users: int,
+    ramp_up: float,
+    **user_kwargs: Any,
+) -> tuple[Recorder, float]:
+    recorder = Recorder()
+    start = time.perf_counter()
+    await asyncio.gather(
+        *[
+            _run_user(
+                url,
+                user=user,
+                delay=ramp_up * user / num_users,
+                recorder=recorder,
+                **user_kwargs,
+            )
+            for user in range(num_users)
+        ]
+    )
+    return recorder, time.perf_counter() - start
+
+
+def main(
+    *,
+    url: Annotated[
+        str, typer.Option(help="URL of the Ragna API.")
+    ] = "http://127.0.0.1:31476",
+    users: Annotated[int, typer.Option(help="Number of concurrent users.")] = 10,
+    chats_per_user: Annotated[
+        int, typer.Option(help="Number of chats each user creates one after another.")
+    ] = 1,
+    prompts_per_chat: Annotated[
+        int, typer.Option(help="Number of prompts per chat.")
+    ] = 3,
+    documents_per_chat: Annotated[
+        int, typer.Option(help="Number of documents uploaded per chat.")
+    ] = 2,
+    source_storage: Annotated[
+        str, typer.Option(help="Display name of the source storage to use.")
+    ] = "Ragna/DemoSourceStorage",
+    assistant: Annotated[
+        str, typer.Option(help="Display name of the assistant to use.")
+    ] = "Ragna/DemoAssistant",
+    ramp_up: Annotated[
+        float, typer.Option(help="Seconds over which the users are started.")
+    ] = 0.0,
+    api_key: Annotated[
+        str | None,
+        typer.Option(help="API key to use. If omitted, log in through /login."),
+    ] = None,
+    output: Annotated[
+        Path | None, typer.Option(help="Write the summary as JSON to this file.")
+    ] = None,
+) -> None:
+    recorder, seconds = asyncio.run(
+        run(
+            url,
+            num_users=users,
+            ramp_up=ramp_up,
+            api_key=api_key,
+            num_chats=chats_per_user,
+            num_documents=documents_per_chat,
+            num_prompts=prompts_per_chat,
+            source_storage=source_storage,
+            assistant=assistant,
+        )
+    )
+    summary = recorder.summary()
+
+    table = Table(
+        "operation",
+        "requests",
+        "error rate",
+        "p50 (ms)",
+        "p95 (ms)",
+        "p99 (ms)",
+        title=f"{users} users in {seconds:.1f} s",
+    )
+    for row in summary:
+        table.add_row(
+            row["operation"],
+            str(row["num_requests"]),
+            f"{row['error_rate']:.1%}",
+            *[
+                "-" if row[key] is None else f"{row[key]:.1f}"
+                for key in ("p50_ms", "p95_ms", "p99_ms")
+            ],
+        )
+    console = Console()
+    console.print(table)
+
+    errors = collections.Counter(
+        error for errors in recorder.errors.values() for error in errors
+    )
+    for error, count in errors.most_common(5):
+        console.print(f"{count} x {error}", style="red", markup=False)
+
+    if output is not None:
+        output.write_text(
+            json.dumps({"users": users, "seconds": seconds, "operations": summary})
+        )
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,278 @@
+"""Local mock of the OpenAI, Anthropic, and Ollama chat APIs.
+
+The server streams canned answers with a configurable time to first token and token
+rate, and can inject errors. This allows load testing a Ragna deployment without any
+external service, e.g. with `scripts/load_test.py`.
+
+Start the server with
+
+```bash
+python scripts/mock_llm_server.py --port 8000 --ttft 0.5 --tokens-per-second 30
+```
+
+and point the builtin assistants to it with the following environment variables before
+running `ragna deploy`:
+
+- OpenAI: `RAGNA_OPENAI_BASE_URL=http://127.0.0.1:8000` and any `OPENAI_API_KEY`
+- Anthropic: `RAGNA_ANTHROPIC_BASE_URL=http://127.0.0.1:8000` and any
+  `ANTHROPIC_API_KEY`
+- Ollama: `RAGNA_OLLAMA_BASE_URL=http://127.0.0.1:8000`
+"""
+
+import asyncio
+import dataclasses
+import itertools
+import json
+import random
+import time
+import uuid
+from collections.abc import AsyncIterator
+from typing import Annotated, Any
+
+import typer
+import uvicorn
+from fastapi import FastAPI, Request, Response, status
+from fastapi.responses import JSONResponse, StreamingResponse
+
+_ANSWER = (
+    "Ragna is an open source RAG orchestration framework. It provides an intuitive "
+    "Python API for quick experimentation and a REST API as well as a web UI for "
+    "production deployments. This answer was generated by a mock LLM server and only "
+    "exists to put load onto the system under test, so it does not reflect the "
+    "content of the documents you uploaded."
+)
+
+
+@dataclasses.dataclass
+class MockSettings:
+    ttft: float = 0.2
+    tokens_per_second: float = 50.0
+    num_tokens: int = 128
+    error_rate: float = 0.0
+    stream_error_rate: float = 0.0
+    seed: int | None = None
+
+
+class MockLlm:
+    def __init__(self, settings: MockSettings) -> None:
+        self.settings = settings
+        self._random = random.Random(settings.seed)
+
+    def should_fail(self) -> bool:
+        return self._random.random() < self.settings.error_rate
+
+    def should_fail_stream(self) -> bool:
+        return self._random.random() < self.settings.stream_error_rate
+
+    async def tokens(self, max_tokens: int | None) -> AsyncIterator[str]:
+        num_tokens = self.settings.num_tokens
+        if max_tokens is not None:
+            num_tokens = min(num_tokens, max_tokens)
+
+        words = itertools.cycle(f"{word} " for word in _ANSWER.split())
+        await asyncio.sleep(self.settings.ttft)
+        start = time.perf_counter()
+        for idx in range(num_tokens):
+            # Sleeping until the due time rather than for a fixed interval keeps the
+            # token rate stable even if the event loop is busy.
+            if idx and self.settings.tokens_per_second > 0:
+                due = start + idx / self.settings.tokens_per_second
+                await asyncio.sleep(max(due - time.perf_counter(), 0))
+            yield next(words)
+
+
+def _sse(data: Any, *, event: str | None = None) -> str:
+    lines = []
+    if event is not None:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {data if isinstance(data, str) else json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def make_app(settings: MockSettings) -> FastAPI:
+    app = FastAPI(title="Mock LLM server")
+    llm = MockLlm(settings)
+
+    @app.get("/health")
+    async def health() -> Response:
+        return Response(b"", status_code=status.HTTP_200_OK)
+
+    @app.post("/v1/chat/completions")
+    async def openai(request: Request) -> Response:
+        # See https://platform.openai.com/docs/api-reference/chat/streaming
+        data = await request.json()
+        if llm.should_fail():
+            return JSONResponse(
+                {"error": {"message": "Injected error", "type": "mock"}},
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            )
+
+        id = f"chatcmpl-{uuid.uuid4()}"
+
+        def chunk(delta: dict[str, str], finish_reason: str | None) -> str:
+            return _sse(
+                {
+                    "id": id,
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": data.get("model", "mock"),
+                    "choices": [
+                        {"index": 0, "delta": delta, "finish_reason": finish_reason}
+                    ],
+                }
+            )
+
+        async def stream() -> AsyncIterator[str]:
+            fail = llm.should_fail_stream()
+            async for token in llm.tokens(data.get("max_tokens")):
+                if fail:
+                    # The OpenAI API has no error events. Thus, we simulate a dropped
+                    # connection.
+                    raise RuntimeError("Injected error")
+                yield chunk({"content": token}, None)
+            yield chunk({}, "stop")
+            yield _sse("[DONE]")
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    @app.post("/v1/messages")
+    async def anthropic(request: Request) -> Response:
+        # See https://docs.anthropic.com/claude/reference/messages-streaming
+        data = await request.json()
+        if llm.should_fail():
+            return JSONResponse(
+                {
+                    "type": "error",
+                    "error": {"type": "overloaded_error", "message": "Injected error"},
+                },
+                status_code=529,
+            )
+
+        async def stream() -> AsyncIterator[str]:
+            yield _sse(
+                {
+                    "type": "message_start",
+                    "message": {
+                        "id": f"msg_{uuid.uuid4().hex}",
+                        "type": "message",
+                        "role": "assistant",
+                        "model": data.get("model", "mock"),
+                        "content": [],
+                    },
+                },
+                event="message_start",
+            )
+            yield _sse(
+                {
+                    "type": "content_block_start",
+                    "index": 0,
+                    "content_block": {"type": "text", "text": ""},
+                },
+                event="content_block_start",
+            )
+
+            fail = llm.should_fail_stream()
+            async for token in llm.tokens(data.get("max_tokens")):
+                if fail:
+                    yield _sse(
+                        {
+                            "type": "error",
+                            "error": {
+                                "type": "overloaded_error",
+                                "message": "Injected error",
+                            },
+                        },
+                        event="error",
+                    )
+                    return
+                yield _sse(
+                    {
+                        "type": "content_block_delta",
+                        "index": 0,
+                        "delta": {"type": "text_delta", "text": token},
+                    },
+                    event="content_block_delta",
+                )
+
+            yield _sse(
+                {"type": "content_block_stop", "index": 0}, event="content_block_stop"
+            )
+            yield _sse({"type": "message_stop"}, event="message_stop")
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    @app.post("/api/chat")
+    async def ollama(request: Request) -> Response:
+        # See https://github.com/ollama/ollama/blob/main/docs/api.md#generate-a-chat-completion
+        data = await request.json()
+        if llm.should_fail():
+            return JSONResponse(
+                {"error": "Injected error"},
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+        model = data.get("model", "mock")
+
+        async def stream() -> AsyncIterator[str]:
+            fail = llm.should_fail_stream()
+            async for token in llm.tokens(data.get("max_tokens")):
+                if fail:
+                    yield f"{json.dumps({'error': 'Injected error'})}\n"
+                    return
+                chunk = {
+                    "model": model,
+                    "message": {"role": "assistant", "content": token},
+                    "done": False,
+                }
+                yield f"{json.dumps(chunk)}\n"
+            yield f"{json.dumps({'model': model, 'done': True})}\n"
+
+        return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+    return app
+
+
+def main(
+    *,
+    hostname: Annotated[str, typer.Option(help="Hostname to bind to.")] = "127.0.0.1",
+    port: Annotated[int, typer.Option(help="Port to bind to.")] = 8000,
+    ttft: Annotated[
+        float, typer.Option(help="Seconds until the first token is sent.")
+    ] = MockSettings.ttft,
+    tokens_per_second: Annotated[
+        float,
+        typer.Option(help="Token rate after the first token. 0 means no delay."),
+    ] = MockSettings.tokens_per_second,
+    num_tokens: Annotated[
+        int,
+        typer.Option(
+            help="Number of tokens per answer, unless the request asks for fewer."
+        ),
+    ] = MockSettings.num_tokens,
+    error_rate: Annotated[
+        float,
+        typer.Option(help="Fraction of requests that are rejected with an error."),
+    ] = MockSettings.error_rate,
+    stream_error_rate: Annotated[
+        float,
+        typer.Option(
+            help="Fraction of requests that fail after streaming has started."
+        ),
+    ] = MockSettings.stream_error_rate,
+    seed: Annotated[
+        int | None, typer.Option(help="Seed for the error injection.")
+    ] = None,
+) -> None:
+    settings = MockSettings(
+        ttft=ttft,
+        tokens_per_second=tokens_per_second,
+        num_tokens=num_tokens,
+        error_rate=error_rate,
+        stream_error_rate=stream_error_rate,
+        seed=seed,
+    )
+    uvicorn.run(make_app(settings), host=hostname, port=port)
+
+
+if __name__ == "__main__":
+    typer.run(main)
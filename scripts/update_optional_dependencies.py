@@ -35,7 +35,7 @@ def make_optional_dependencies(*optional_requirements):
 
 def extract_builtin_document_handler_requirements():
     requirements = defaultdict(list)
-    for obj in ragna.core.__dict__.values():
+    for obj in (getattr(ragna.core, name) for name in ragna.core.__all__):
         if (
             isinstance(obj, type) and issubclass(obj, ragna.core.DocumentHandler)
         ) and obj is not ragna.core.DocumentHandler:
@@ -50,7 +50,9 @@ def extract_builtin_component_requirements():
         (ragna.source_storages, SourceStorage),
         (ragna.assistants, Assistant),
     ]:
-        for obj in module.__dict__.values():
+        # The public packages import their objects lazily. Thus, we have to go through
+        # __all__ rather than __dict__.
+        for obj in (getattr(module, name) for name in module.__all__):
             if isinstance(obj, type) and issubclass(obj, cls):
                 append_version_specifiers(requirements, obj)
 
@@ -1,4 +1,5 @@
 import asyncio
+import functools
 import itertools
 import json
 import os
@@ -16,7 +17,7 @@ from tests.utils import get_available_port, skip_on_windows
 
 HTTP_API_ASSISTANTS = [
     assistant
-    for assistant in assistants.__dict__.values()
+    for assistant in (getattr(assistants, name) for name in assistants.__all__)
     if isinstance(assistant, type)
     and issubclass(assistant, HttpApiAssistant)
     and assistant is not HttpApiAssistant
@@ -135,3 +136,92 @@ def test_http_streaming_termination(streaming_server, streaming_protocol):
             next(expected_chunks)
 
     asyncio.run(main())
+
+
+@pytest.fixture
+def mock_llm_server(mocker):
+    def start(assistant, base_url_env_var, *args):
+        port = get_available_port()
+        base_url = f"http://127.0.0.1:{port}"
+
+        env = {base_url_env_var: base_url}
+        if assistant._API_KEY_ENV_VAR is not None:
+            env[assistant._API_KEY_ENV_VAR] = "SENTINEL"
+        mocker.patch.dict(os.environ, env)
+
+        def check_fn():
+            try:
+                return httpx.get(f"{base_url}/health").is_success
+            except httpx.ConnectError:
+                return False
+
+        return BackgroundSubprocess(
+            sys.executable,
+            str(Path(__file__).parents[2] / "scripts" / "mock_llm_server.py"),
+            f"--port={port}",
+            "--ttft=0",
+            "--tokens-per-second=0",
+            "--num-tokens=5",
+            *args,
+            startup_fn=check_fn,
+        )
+
+    return start
+
+
+MOCKED_ASSISTANTS = [
+    (assistants.Gpt4, "RAGNA_OPENAI_BASE_URL"),
+    (assistants.ClaudeHaiku, "RAGNA_ANTHROPIC_BASE_URL"),
+    (assistants.OllamaLlama2, "RAGNA_OLLAMA_BASE_URL"),
+]
+
+
+@skip_on_windows
+@pytest.mark.parametrize(("assistant", "base_url_env_var"), MOCKED_ASSISTANTS)
+async def test_mock_llm_server(mock_llm_server, assistant, base_url_env_var):
+    with mock_llm_server(assistant, base_url_env_var):
+        chunks = [
+            chunk
+            async for chunk in assistant().answer(
+                [Message(content="?", sources=[])], max_new_tokens=3
+            )
+        ]
+
+    assert len(chunks) == 3
+    assert all(chunks)
+
+
+@skip_on_windows
+@pytest.mark.parametrize(("assistant", "base_url_env_var"), MOCKED_ASSISTANTS)
+async def test_mock_llm_server_error_injection(
+    mock_llm_server, assistant, base_url_env_var
+):
+    with (
+        mock_llm_server(assistant, base_url_env_var, "--error-rate=1"),
+        pytest.raises(RagnaException, match="API call failed"),
+    ):
+        await anext(assistant().answer([Message(content="?", sources=[])]))
+
+
+@pytest.mark.parametrize(("assistant", "base_url_env_var"), MOCKED_ASSISTANTS)
+async def test_warmup(mocker, assistant, base_url_env_var):
+    env = {base_url_env_var: "http://llm.example.com:8000"}
+    if assistant._API_KEY_ENV_VAR is not None:
+        env[assistant._API_KEY_ENV_VAR] = "SENTINEL"
+    mocker.patch.dict(os.environ, env)
+
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200)
+
+    mocker.patch(
+        "ragna.assistants._http_api.httpx.AsyncClient",
+        functools.partial(httpx.AsyncClient, transport=httpx.MockTransport(handler)),
+    )
+
+    await assistant().warmup()
+
+    (request,) = requests
+    assert (request.url.host, request.url.port) == ("llm.example.com", 8000)
@@ -0,0 +1,39 @@
+from typer.testing import CliRunner
+
+from ragna._cli import app
+from ragna.core import LocalDocument
+from ragna.deploy import Config
+from ragna.source_storages import Chroma, LanceDB
+
+
+def test_optimize(tmp_local_root):
+    config_path = tmp_local_root / "ragna.toml"
+    Config(local_root=tmp_local_root, source_storages=[LanceDB, Chroma]).to_file(
+        config_path, force=True
+    )
+
+    document_root = tmp_local_root / "documents"
+    document_root.mkdir()
+    source_storage = LanceDB()
+    for idx in range(3):
+        path = document_root / f"document{idx}.txt"
+        path.write_text(f"The secret number of document {idx} is {idx * 11}!\n")
+        source_storage.store("default", [LocalDocument.from_path(path)])
+    source_storage._maintenance.shutdown()
+
+    table = source_storage._get_table("default")
+    num_versions = len(table.list_versions())
+
+    result = CliRunner().invoke(
+        app, ["corpus", "optimize", "--config", str(config_path)]
+    )
+    assert result.exit_code == 0, result.output
+    assert "Optimized LanceDB" in result.output
+    # Chroma has no optimization and thus must not claim it did one.
+    assert "Optimized Chroma" not in result.output
+    assert "Chroma has nothing to optimize" in result.output
+
+    table = source_storage._get_table("default")
+    assert table.count_rows() == 3
+    # Versions are only removed after a while, but optimizing adds a new one.
+    assert len(table.list_versions()) > num_versions
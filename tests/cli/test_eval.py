@@ -0,0 +1,70 @@
+import json
+
+import pyarrow.parquet as pq
+import pytest
+from typer.testing import CliRunner
+
+from ragna._cli import app
+from ragna.deploy import Config
+from ragna.source_storages import RagnaDemoSourceStorage
+
+
+@pytest.mark.parametrize("retrieval_only", [True, False])
+def test_eval(tmp_local_root, mocker, retrieval_only):
+    config_path = tmp_local_root / "ragna.toml"
+    Config().to_file(config_path)
+
+    document_path = tmp_local_root / "test.txt"
+    document_path.write_text("!\n")
+
+    questions_path = tmp_local_root / "questions.jsonl"
+    with open(questions_path, "w") as file:
+        for question in [
+            {"id": "with-documents", "prompt": "?", "documents": [str(document_path)]},
+            {"id": "same-documents", "prompt": "!", "documents": [str(document_path)]},
+            # The documents above are only stored in the default corpus. Thus, there
+            # are no sources to answer this prompt from.
+            {"id": "empty-corpus", "prompt": "?", "corpus_name": "empty"},
+        ]:
+            file.write(f"{json.dumps(question)}\n")
+
+    output_path = tmp_local_root / "results.parquet"
+
+    store = mocker.spy(RagnaDemoSourceStorage, "store")
+
+    result = CliRunner().invoke(
+        app,
+        [
+            "eval",
+            str(questions_path),
+            "--config",
+            str(config_path),
+            "--output-file",
+            str(output_path),
+            "--retrieval-only" if retrieval_only else "--answer",
+        ],
+    )
+    assert result.exit_code == 0, result.output
+
+    records = {
+        record["id"]: record for record in pq.read_table(output_path).to_pylist()
+    }
+    assert records.keys() == {"with-documents", "same-documents", "empty-corpus"}
+
+    # Documents that are shared by multiple questions are only stored once.
+    assert store.call_count == 1
+    assert records["same-documents"]["num_sources"] == 1
+
+    record = records["with-documents"]
+    assert record["error"] is None
+    assert record["num_sources"] == 1
+    assert record["retrieve_ms"] <= record["total_ms"]
+    if retrieval_only:
+        assert record["ttft_ms"] is None
+        assert record["num_answer_chunks"] is None
+    else:
+        assert record["retrieve_ms"] <= record["ttft_ms"] <= record["total_ms"]
+        assert record["num_answer_chunks"] > 0
+
+    if not retrieval_only:
+        assert records["empty-corpus"]["error"] is not None
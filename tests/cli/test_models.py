@@ -0,0 +1,137 @@
+import json
+import os
+
+from typer.testing import CliRunner
+
+from ragna._cli import app
+from ragna.core import ModelArtifact
+from ragna.deploy import Config
+from ragna.source_storages import Chroma, RagnaDemoSourceStorage
+
+
+class DummyArtifact(ModelArtifact):
+    name = "dummy"
+    num_pulls = 0
+
+    def _pull(self, path):
+        type(self).num_pulls += 1
+        (path / "weights.bin").write_bytes(b"\x00" * 16)
+
+
+class FailingArtifact(ModelArtifact):
+    name = "failing"
+
+    def _pull(self, path):
+        (path / "partial.bin").write_bytes(b"\x00")
+        raise RuntimeError("No network!")
+
+
+class DummySourceStorage(RagnaDemoSourceStorage):
+    @classmethod
+    def model_artifacts(cls):
+        return [DummyArtifact()]
+
+
+class FailingSourceStorage(RagnaDemoSourceStorage):
+    @classmethod
+    def model_artifacts(cls):
+        return [FailingArtifact()]
+
+
+def pull(tmp_local_root, *source_storages, force=False):
+    config_path = tmp_local_root / "ragna.toml"
+    Config(local_root=tmp_local_root, source_storages=list(source_storages)).to_file(
+        config_path, force=True
+    )
+    return CliRunner().invoke(
+        app,
+        [
+            "models",
+            "pull",
+            "--config",
+            str(config_path),
+            *(["--force"] if force else []),
+        ],
+    )
+
+
+def test_pull(tmp_local_root):
+    DummyArtifact.num_pulls = 0
+    artifact = DummyArtifact()
+    assert not artifact.is_available()
+
+    result = pull(tmp_local_root, DummySourceStorage)
+    assert result.exit_code == 0, result.output
+    assert DummyArtifact.num_pulls == 1
+    assert artifact.path == tmp_local_root / "models" / "dummy"
+    assert artifact.is_available()
+    assert artifact.verify()
+    with open(artifact.path / ".checksums.json") as file:
+        assert json.load(file).keys() == {"weights.bin"}
+
+    result = pull(tmp_local_root, DummySourceStorage)
+    assert result.exit_code == 0, result.output
+    assert DummyArtifact.num_pulls == 1
+
+    (artifact.path / "weights.bin").write_bytes(b"corrupted")
+    assert not artifact.verify()
+    result = pull(tmp_local_root, DummySourceStorage)
+    assert result.exit_code == 0, result.output
+    assert DummyArtifact.num_pulls == 2
+    assert artifact.verify()
+
+    result = pull(tmp_local_root, DummySourceStorage, force=True)
+    assert result.exit_code == 0, result.output
+    assert DummyArtifact.num_pulls == 3
+
+
+def test_pull_failure(tmp_local_root):
+    result = pull(tmp_local_root, FailingSourceStorage)
+    assert result.exit_code == 1
+    assert "No network!" in result.output
+
+    artifact = FailingArtifact()
+    assert not artifact.is_available()
+    assert not artifact.path.exists()
+    assert list((tmp_local_root / "models").iterdir()) == []
+
+
+def test_load_pulled_embedding_model(tmp_local_root, mocker):
+    # The embedding function downloads the model on first use
+    def embed(self, input):
+        (self.DOWNLOAD_PATH / self.ARCHIVE_FILENAME).write_bytes(b"archive")
+        (self.DOWNLOAD_PATH / self.EXTRACTED_FOLDER_NAME).mkdir()
+        (self.DOWNLOAD_PATH / self.EXTRACTED_FOLDER_NAME / "model.onnx").touch()
+        return [[0.0] for _ in input]
+
+    embedding_function_cls = type(Chroma()._embedding_function)
+    mocker.patch.object(embedding_function_cls, "__call__", embed)
+
+    artifact = next(
+        artifact
+        for artifact in Chroma.model_artifacts()
+        if artifact.name.startswith("chroma-onnx")
+    )
+    assert artifact.pull()
+    assert not (artifact.path / embedding_function_cls.ARCHIVE_FILENAME).exists()
+
+    assert artifact.path == Chroma()._embedding_function.DOWNLOAD_PATH
+
+
+def test_load_pulled_tokenizer(tmp_local_root, monkeypatch):
+    monkeypatch.delenv("TIKTOKEN_CACHE_DIR", raising=False)
+
+    artifact = next(
+        artifact
+        for artifact in Chroma.model_artifacts()
+        if artifact.name.startswith("tiktoken")
+    )
+    # Pretend the artifact was pulled. tiktoken falls back to downloading the
+    # encoding into its cache directory if it is missing there.
+    artifact.path.mkdir(parents=True)
+    (artifact.path / ".checksums.json").write_text("{}")
+
+    tokenizer = Chroma()._tokenizer
+
+    assert os.environ["TIKTOKEN_CACHE_DIR"] == str(artifact.path)
+    assert tokenizer.decode(tokenizer.encode("Ragna")) == "Ragna"
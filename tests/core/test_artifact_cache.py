@@ -0,0 +1,121 @@
+import os
+
+import pytest
+
+from ragna.core import Document, DocumentHandler, Page
+from ragna.core._artifact_cache import ArtifactCache
+
+
+class CountingDocumentHandler(DocumentHandler):
+    num_extractions = 0
+
+    @classmethod
+    def supported_suffixes(cls):
+        return [".txt"]
+
+    def extract_pages(self, document):
+        type(self).num_extractions += 1
+        for number, text in enumerate(document.read().decode().split("\f"), 1):
+            yield Page(text=text, number=number)
+
+
+class InMemoryDocument(Document):
+    def __init__(self, content, **kwargs):
+        kwargs.setdefault("name", "document.txt")
+        kwargs.setdefault("metadata", {})
+        kwargs.setdefault("handler", CountingDocumentHandler())
+        super().__init__(**kwargs)
+        self._content = content
+
+    def read(self):
+        return self._content
+
+
+@pytest.fixture(autouse=True)
+def reset_num_extractions():
+    CountingDocumentHandler.num_extractions = 0
+
+
+def test_get_set():
+    cache = ArtifactCache()
+    assert cache.get("key") is None
+
+    cache.set("key", {"foo": ["bar"]})
+    assert cache.get("key") == {"foo": ["bar"]}
+    assert cache.get("other-key") is None
+
+
+def test_disabled():
+    cache = ArtifactCache(max_size=0)
+    cache.set("key", "value")
+
+    assert cache.get("key") is None
+    assert not cache.path.exists()
+
+
+def test_corrupted():
+    cache = ArtifactCache()
+    cache.set("key", "value")
+    (path,) = cache.path.glob("*/*.json.gz")
+    path.write_bytes(b"corrupted")
+
+    assert cache.get("key") is None
+    assert not path.exists()
+
+
+def test_eviction():
+    cache = ArtifactCache()
+    cache.set("probe", "x" * 100)
+    (probe,) = cache.path.glob("*/*.json.gz")
+    cache.max_size = probe.stat().st_size * 2
+    cache.clear()
+
+    cache.set("old", "x" * 100)
+    cache.set("used", "x" * 100)
+    # Make sure "old" is the least recently used, even on file systems with a coarse
+    # modification time resolution.
+    os.utime(cache._artifact_path("old"), (0, 0))
+    assert cache.get("used") is not None
+
+    cache.set("new", "x" * 100)
+
+    assert cache.get("old") is None
+    assert cache.get("used") is not None
+    assert cache.get("new") is not None
+    assert sum(path.stat().st_size for path in cache.path.glob("*/*.json.gz")) <= (
+        cache.max_size
+    )
+
+
+def test_extract_pages_cached():
+    content = b"first page\fsecond page"
+
+    pages = list(InMemoryDocument(content).extract_pages())
+    assert CountingDocumentHandler.num_extractions == 1
+
+    # The cache is keyed by the contents and not by the document ID or name.
+    cached_pages = list(InMemoryDocument(content, name="other.txt").extract_pages())
+    assert CountingDocumentHandler.num_extractions == 1
+    assert cached_pages == pages
+
+    list(InMemoryDocument(b"other content").extract_pages())
+    assert CountingDocumentHandler.num_extractions == 2
+
+
+def test_extract_pages_cached_version(mocker):
+    content = b"content"
+    list(InMemoryDocument(content).extract_pages())
+
+    mocker.patch.object(CountingDocumentHandler, "version", return_value="2")
+    list(InMemoryDocument(content).extract_pages())
+
+    assert CountingDocumentHandler.num_extractions == 2
+
+
+def test_extract_pages_partial():
+    content = b"first page\fsecond page"
+
+    next(InMemoryDocument(content).extract_pages())
+    assert len(list(InMemoryDocument(content).extract_pages())) == 2
+
+    assert CountingDocumentHandler.num_extractions == 2
@@ -1,7 +1,16 @@
 import docx
+import fitz
 import pptx
+import pytest
 
-from ragna.core import DocxDocumentHandler, LocalDocument, PptxDocumentHandler
+from ragna.core import (
+    Document,
+    DocxDocumentHandler,
+    LocalDocument,
+    PdfDocumentHandler,
+    PptxDocumentHandler,
+)
+from ragna.core._document import _PDF_PROCESS_POOL
 
 
 def get_docx_document(tmp_path, docx_text):
@@ -42,3 +51,124 @@ def test_pptx(tmp_path):
     assert len(pages) == 2
     for page in pages:
         assert page.text == pptx_text
+
+
+def get_pdf_document(tmp_path, num_pages):
+    document = fitz.open()
+    for number in range(1, num_pages + 1):
+        document.new_page().insert_text((72, 72), f"This is page {number}.")
+    path = tmp_path / "test_document.pdf"
+    document.save(path)
+    return LocalDocument.from_path(path)
+
+
+@pytest.mark.parametrize("num_processes", [0, 2])
+def test_pdf_parallel(tmp_path, monkeypatch, mocker, num_processes):
+    monkeypatch.setenv("RAGNA_PDF_EXTRACTION_PROCESSES", str(num_processes))
+    mocker.patch.object(PdfDocumentHandler, "_PAGES_PER_TASK", 3)
+    extract_pages_parallel = mocker.spy(PdfDocumentHandler, "_extract_pages_parallel")
+    document = get_pdf_document(tmp_path, num_pages=10)
+
+    try:
+        pages = list(document.handler.extract_pages(document))
+    finally:
+        monkeypatch.delenv("RAGNA_PDF_EXTRACTION_PROCESSES")
+        _PDF_PROCESS_POOL.executor()
+
+    assert extract_pages_parallel.call_count == int(num_processes > 1)
+    assert [page.number for page in pages] == list(range(1, 11))
+    for page in pages:
+        assert page.text.strip() == f"This is page {page.number}."
+
+
+def test_pdf_parallel_default(tmp_path, mocker):
+    extract_pages_parallel = mocker.spy(PdfDocumentHandler, "_extract_pages_parallel")
+    document = get_pdf_document(
+        tmp_path, num_pages=2 * PdfDocumentHandler._PAGES_PER_TASK
+    )
+
+    list(document.handler.extract_pages(document))
+
+    extract_pages_parallel.assert_not_called()
+
+
+def test_pdf_parallel_bounded(tmp_path, monkeypatch, mocker):
+    monkeypatch.setenv("RAGNA_PDF_EXTRACTION_PROCESSES", "2")
+    mocker.patch.object(PdfDocumentHandler, "_PAGES_PER_TASK", 1)
+    document = get_pdf_document(tmp_path, num_pages=10)
+
+    try:
+        submit = mocker.spy(_PDF_PROCESS_POOL.executor(), "submit")
+        pages = document.handler.extract_pages(document)
+
+        assert next(pages).number == 1
+        # Two ranges per process are in flight and the first one was topped up.
+        assert submit.call_count == 5
+
+        assert [page.number for page in pages] == list(range(2, 11))
+        assert submit.call_count == 10
+    finally:
+        monkeypatch.delenv("RAGNA_PDF_EXTRACTION_PROCESSES")
+        _PDF_PROCESS_POOL.executor()
+
+
+class InMemoryDocument(Document):
+    def __init__(self, content, **kwargs):
+        kwargs.setdefault("metadata", {})
+        super().__init__(**kwargs)
+        self._content = content
+
+    def read(self):
+        return self._content
+
+
+@pytest.mark.parametrize("content", [b"", b"ragna is neat!"])
+def test_local_document_open_buffer(tmp_path, content):
+    path = tmp_path / "document.txt"
+    path.write_bytes(content)
+    document = LocalDocument.from_path(path)
+
+    with document.open() as file:
+        assert file.read() == content
+
+    with document.buffer() as buffer:
+        assert buffer.readonly
+        assert bytes(buffer) == content
+
+
+def test_document_open_buffer_fallback():
+    content = b"ragna is neat!"
+    document = InMemoryDocument(content, name="document.txt")
+
+    with document.open() as file:
+        assert file.read() == content
+
+    with document.buffer() as buffer:
+        assert bytes(buffer) == content
+
+
+@pytest.mark.parametrize(
+    ("get_document", "text"),
+    [
+        (get_docx_document, "ragna is neat!"),
+        (get_pptx_document, "ragna is neat!"),
+        (lambda tmp_path, _: get_pdf_document(tmp_path, num_pages=1), None),
+    ],
+)
+def test_extract_pages_without_read(tmp_path, mocker, get_document, text):
+    document = get_document(tmp_path, text)
+    read = mocker.spy(LocalDocument, "read")
+
+    assert list(document.handler.extract_pages(document))
+    read.assert_not_called()
+
+
+def test_pdf_in_memory(tmp_path):
+    local_document = get_pdf_document(tmp_path, num_pages=3)
+    document = InMemoryDocument(local_document.read(), name="document.pdf")
+
+    pages = list(document.handler.extract_pages(document))
+
+    assert [page.text.strip() for page in pages] == [
+        f"This is page {number}." for number in range(1, 4)
+    ]
@@ -48,3 +48,11 @@ def test_e2e(tmp_local_root, input_type):
     assert isinstance(answer, Message)
     assert answer.role is MessageRole.ASSISTANT
     assert {source.document_name for source in answer.sources} == {document.name}
+
+    timings = answer.timings
+    assert timings.num_candidates == timings.num_sources == len(answer.sources)
+    assert timings.num_source_tokens == sum(
+        source.num_tokens for source in answer.sources
+    )
+    assert timings.num_answer_chunks >= 1
+    assert 0 <= timings.retrieve_ms <= timings.ttft_ms <= timings.total_ms
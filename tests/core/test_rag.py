@@ -1,7 +1,11 @@
+import asyncio
+import time
+import uuid
+
 import pytest
 
 from ragna import Rag, assistants, source_storages
-from ragna.core import Assistant, LocalDocument, RagnaException
+from ragna.core import Assistant, LocalDocument, RagnaException, Source, SourceStorage
 
 
 @pytest.fixture()
@@ -98,3 +102,166 @@ class TestChat:
         assert isinstance(document, LocalDocument)
         assert document.path == demo_document.path
         assert document.name == demo_document.name
+
+    @pytest.mark.asyncio
+    async def test_retrieve(self, demo_document):
+        chat = self.chat(documents=[demo_document])
+        with pytest.raises(RagnaException, match="not prepared"):
+            await chat.retrieve("?")
+
+        await chat.prepare()
+        sources = await chat.retrieve("?")
+        assert [source.document_name for source in sources] == [demo_document.name]
+        # Retrieving does not add to the chat history.
+        assert len(chat._messages) == 1
+
+        message = await chat.answer("?")
+        assert message.sources == sources
+
+
+def make_source(content, *, document_id=None):
+    return Source(
+        id=str(uuid.uuid4()),
+        document_id=document_id or uuid.uuid4(),
+        document_name="document.txt",
+        location="",
+        content=content,
+        num_tokens=len(content),
+    )
+
+
+class TestTargets:
+    def make_source_storage(self, sources_by_corpus, *, delay=0.0):
+        class FixedSourceStorage(SourceStorage):
+            def store(self, corpus_name, documents):
+                pass
+
+            async def retrieve(self, corpus_name, metadata_filter, prompt):
+                await asyncio.sleep(delay)
+                return sources_by_corpus[corpus_name]
+
+        return FixedSourceStorage()
+
+    @pytest.mark.asyncio
+    async def test_reciprocal_rank_fusion(self):
+        a, b, c = (make_source(content) for content in "abc")
+        # Same chunk as b, but stored under a different ID in another target
+        b_duplicate = make_source("b", document_id=b.document_id)
+
+        legacy = self.make_source_storage({"legacy": [a, b]})
+        new = self.make_source_storage({"hr": [c, b_duplicate], "finance": [c]})
+
+        chat = Rag().chat(
+            assistant=assistants.RagnaDemoAssistant,
+            targets=[(legacy, "legacy"), (new, "hr"), (new, "finance")],
+        )
+        assert chat.source_storage is legacy
+        assert chat.corpus_name == "legacy"
+
+        message = await chat.answer("?")
+
+        assert [source.content for source in message.sources] == ["c", "b", "a"]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_retrieval(self):
+        delay = 0.2
+        source_storages_ = [
+            self.make_source_storage({"default": [make_source(str(idx))]}, delay=delay)
+            for idx in range(5)
+        ]
+
+        chat = Rag().chat(
+            assistant=assistants.RagnaDemoAssistant,
+            targets=[
+                (source_storage, "default") for source_storage in source_storages_
+            ],
+        )
+
+        start = time.perf_counter()
+        message = await chat.answer("?")
+        stop = time.perf_counter()
+
+        assert len(message.sources) == len(source_storages_)
+        assert stop - start < delay * len(source_storages_) / 2
+
+    @pytest.mark.parametrize(
+        ("params", "expected_contents"),
+        [
+            pytest.param({}, ["aa", "bb"], id="default"),
+            pytest.param({"num_tokens": 6}, ["aa", "bb", "cc"], id="explicit"),
+        ],
+    )
+    @pytest.mark.asyncio
+    async def test_fused_token_budget(self, params, expected_contents):
+        def make_source_storage(sources, *, default_num_tokens):
+            class BudgetSourceStorage(SourceStorage):
+                def store(self, corpus_name, documents):
+                    pass
+
+                def retrieve(
+                    self,
+                    corpus_name,
+                    metadata_filter,
+                    prompt,
+                    *,
+                    num_tokens: int = default_num_tokens,
+                ):
+                    return sources
+
+            return BudgetSourceStorage()
+
+        aa, bb, cc = (make_source(content * 2) for content in "abc")
+        chat = Rag().chat(
+            assistant=assistants.RagnaDemoAssistant,
+            targets=[
+                (make_source_storage([aa, cc], default_num_tokens=100), "default"),
+                (make_source_storage([bb], default_num_tokens=4), "default"),
+            ],
+            **params,
+        )
+
+        message = await chat.answer("?")
+
+        assert [source.content for source in message.sources] == expected_contents
+
+    @pytest.mark.asyncio
+    async def test_num_candidates(self):
+        class ReportingSourceStorage(SourceStorage):
+            def store(self, corpus_name, documents):
+                pass
+
+            def retrieve(self, corpus_name, metadata_filter, prompt):
+                self._report_num_candidates(100)
+                return [make_source("a")]
+
+        chat = Rag().chat(
+            assistant=assistants.RagnaDemoAssistant,
+            targets=[
+                (ReportingSourceStorage(), "default"),
+                # Source storages that do not report the number of candidates count
+                # with the number of retrieved sources.
+                (self.make_source_storage({"default": [make_source("b")]}), "default"),
+            ],
+        )
+
+        message = await chat.answer("?")
+
+        assert message.timings.num_candidates == 101
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            pytest.param({}, id="none"),
+            pytest.param(
+                {
+                    "source_storage": source_storages.RagnaDemoSourceStorage,
+                    "targets": [(source_storages.RagnaDemoSourceStorage, "default")],
+                },
+                id="both",
+            ),
+            pytest.param({"targets": []}, id="empty"),
+        ],
+    )
+    def test_invalid(self, kwargs):
+        with pytest.raises(RagnaException):
+            Rag().chat(assistant=assistants.RagnaDemoAssistant, **kwargs)
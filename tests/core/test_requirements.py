@@ -0,0 +1,50 @@
+import importlib
+
+import pytest
+
+from ragna.core import EnvVarRequirement, PackageRequirement
+from ragna.core._utils import RequirementsMixin
+
+
+@pytest.mark.parametrize(
+    ("requirement_string", "available"),
+    [
+        ("pytest", True),
+        ("pytest>=1", True),
+        ("pytest<1", False),
+        ("ragna-not-an-actual-package", False),
+    ],
+)
+def test_package_requirement(requirement_string, available):
+    assert PackageRequirement(requirement_string).is_available() is available
+
+
+def test_package_requirement_does_not_import(mocker):
+    import_module = mocker.spy(importlib, "import_module")
+
+    assert PackageRequirement("pluggy").is_available()
+    import_module.assert_not_called()
+
+
+def test_package_requirement_deep(mocker):
+    mocker.patch.object(
+        importlib, "import_module", side_effect=ImportError("broken installation")
+    )
+
+    requirement = PackageRequirement("iniconfig")
+    assert requirement.is_available()
+    assert not requirement.is_available(deep=True)
+
+
+def test_requirements_mixin_deep(mocker):
+    mocker.patch.object(
+        importlib, "import_module", side_effect=ImportError("broken installation")
+    )
+
+    class Component(RequirementsMixin):
+        @classmethod
+        def requirements(cls):
+            return [PackageRequirement("packaging"), EnvVarRequirement("PATH")]
+
+    assert Component.is_available()
+    assert not Component.is_available(deep=True)
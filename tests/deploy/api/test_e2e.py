@@ -141,20 +141,29 @@ def test_e2e(tmp_local_root, multiple_answer_chunks, stream_answer, corpus_name)
             with client.stream(
                 "POST",
                 f"/api/chats/{chat['id']}/answer",
-                json={"prompt": prompt, "stream": True},
+                json={"prompt": prompt, "stream": True, "timings": True},
             ) as response:
                 chunks = [json.loads(chunk) for chunk in response.iter_lines()]
             message = chunks[0]
             assert all(chunk["sources"] is None for chunk in chunks[1:])
+            assert all(chunk["timings"] is None for chunk in chunks[1:-1])
             message["content"] = "".join(chunk["content"] for chunk in chunks)
+            message["timings"] = chunks[-1]["timings"]
         else:
             message = (
-                client.post(f"/api/chats/{chat['id']}/answer", json={"prompt": prompt})
+                client.post(
+                    f"/api/chats/{chat['id']}/answer",
+                    json={"prompt": prompt, "timings": True},
+                )
                 .raise_for_status()
                 .json()
             )
 
         assert message["role"] == "assistant"
+        timings = message["timings"]
+        assert timings["num_sources"] == len(message["sources"])
+        assert timings["num_answer_chunks"] >= 1
+        assert 0 <= timings["retrieve_ms"] <= timings["ttft_ms"] <= timings["total_ms"]
         assert {source["document_name"] for source in message["sources"]} == {
             document_path.name
         }
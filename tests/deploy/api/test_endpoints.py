@@ -1,8 +1,12 @@
+import hashlib
 import mimetypes
+import queue
+import time
 
 import pytest
 
 from ragna.deploy import Config
+from ragna.source_storages import RagnaDemoSourceStorage
 from tests.deploy.api.utils import upload_documents
 from tests.deploy.utils import make_api_client
 
@@ -109,3 +113,172 @@ def test_get_document_content(tmp_local_root, mime_type):
             else mimetypes.guess_type(document_path.name)[0]
         )
     )
+
+
+@pytest.fixture
+def document_content_client(tmp_local_root):
+    config = Config(local_root=tmp_local_root)
+
+    document_root = config.local_root / "documents"
+    document_root.mkdir()
+    document_path = document_root / "test.txt"
+    with open(document_path, "w") as file:
+        file.write("".join(_document_content_text))
+
+    with make_api_client(config=config, ignore_unavailable_components=False) as client:
+        document = upload_documents(client=client, document_paths=[document_path])[0]
+        yield client, f"/api/documents/{document['id']}/content"
+
+
+def test_get_document_content_range(document_content_client):
+    client, url = document_content_client
+    content = "".join(_document_content_text).encode()
+
+    response = client.get(url, headers={"Range": "bytes=6-9"})
+
+    assert response.status_code == 206
+    assert response.content == content[6:10]
+    assert response.headers["content-range"] == f"bytes 6-9/{len(content)}"
+    assert response.headers["accept-ranges"] == "bytes"
+
+
+def test_get_document_content_conditional(document_content_client):
+    client, url = document_content_client
+
+    response = client.get(url).raise_for_status()
+    etag = response.headers["etag"]
+    last_modified = response.headers["last-modified"]
+
+    for headers in [
+        {"If-None-Match": etag},
+        {"If-None-Match": f'"other", W/{etag}'},
+        {"If-None-Match": "*"},
+        {"If-Modified-Since": last_modified},
+    ]:
+        response = client.get(url, headers=headers)
+        assert response.status_code == 304, headers
+        assert not response.content
+        assert response.headers["etag"] == etag
+
+    for headers in [
+        {"If-None-Match": '"other"'},
+        {"If-Modified-Since": "Thu, 01 Jan 1970 00:00:00 GMT"},
+        # If-None-Match takes precedence over If-Modified-Since.
+        {"If-None-Match": '"other"', "If-Modified-Since": last_modified},
+    ]:
+        response = client.get(url, headers=headers)
+        assert response.status_code == 200, headers
+        assert response.content == "".join(_document_content_text).encode()
+
+
+def put_documents(client, contents):
+    documents = (
+        client.post(
+            "/api/documents",
+            json=[{"name": f"test{idx}.txt"} for idx in range(len(contents))],
+        )
+        .raise_for_status()
+        .json()
+    )
+    response = client.put(
+        "/api/documents",
+        files=[
+            ("documents", (document["id"], content))
+            for document, content in zip(documents, contents, strict=True)
+        ],
+    )
+    return documents, response
+
+
+def test_upload_documents(tmp_local_root):
+    config = Config(local_root=tmp_local_root, upload_concurrency=2)
+    contents = [f"content {idx}\n".encode() * 1_000 for idx in range(5)]
+
+    with make_api_client(config=config, ignore_unavailable_components=False) as client:
+        documents, response = put_documents(client, contents)
+        response.raise_for_status()
+
+    for document, content in zip(documents, contents, strict=True):
+        assert (config.local_root / "documents" / document["id"]).read_bytes() == (
+            content
+        )
+    assert not list((config.local_root / "documents").glob(".*.part"))
+
+
+@pytest.mark.parametrize(
+    ("config_kwargs", "status_code"),
+    [
+        ({"upload_max_document_size": 4}, 413),
+        ({"upload_min_free_disk_space": 2**62}, 507),
+    ],
+)
+def test_upload_documents_limits(tmp_local_root, config_kwargs, status_code):
+    config = Config(local_root=tmp_local_root, **config_kwargs)
+
+    with make_api_client(config=config, ignore_unavailable_components=False) as client:
+        documents, response = put_documents(client, [b"content"])
+
+    assert response.status_code == status_code
+    assert list((config.local_root / "documents").iterdir()) == []
+
+
+class PreprocessingSourceStorage(RagnaDemoSourceStorage):
+    preprocessed = queue.Queue()
+
+    def preprocess(self, documents):
+        for document in documents:
+            self.preprocessed.put(document)
+
+
+def test_ingest_on_upload(tmp_local_root):
+    config = Config(
+        local_root=tmp_local_root,
+        source_storages=[PreprocessingSourceStorage],
+        ingest_on_upload=True,
+    )
+    content = b"content"
+
+    with make_api_client(config=config, ignore_unavailable_components=False) as client:
+        documents, response = put_documents(client, [content])
+        response.raise_for_status()
+
+        document = PreprocessingSourceStorage.preprocessed.get(timeout=10)
+
+    assert str(document.id) == documents[0]["id"]
+    # The hash is computed while writing and thus the document is not read again to
+    # look up the artifact cache.
+    assert document._content_hash == hashlib.sha256(content).hexdigest()
+
+
+class FailingPreprocessingSourceStorage(RagnaDemoSourceStorage):
+    def preprocess(self, documents):
+        raise RuntimeError("Preprocessing failed!")
+
+
+def test_ingest_on_upload_failure(tmp_local_root, caplog):
+    config = Config(
+        local_root=tmp_local_root,
+        source_storages=[FailingPreprocessingSourceStorage],
+        ingest_on_upload=True,
+    )
+
+    with make_api_client(config=config, ignore_unavailable_components=False) as client:
+        documents, response = put_documents(client, [b"content"])
+        response.raise_for_status()
+
+        for _ in range(100):
+            records = [
+                record
+                for record in caplog.records
+                if record.name == "ragna.deploy._engine"
+            ]
+            if records:
+                break
+            time.sleep(0.05)
+        else:
+            raise AssertionError("Failed preprocessing was not logged")
+
+    (record,) = records
+    assert documents[0]["id"] in record.getMessage()
+    assert FailingPreprocessingSourceStorage.display_name() in record.getMessage()
+    assert "Preprocessing failed!" in caplog.text
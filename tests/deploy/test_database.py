@@ -0,0 +1,69 @@
+import sqlite3
+import uuid
+
+from ragna.core import MessageRole, MessageTimings
+from ragna.deploy._database import Database
+
+# Schema and content of a database created by Ragna before the messages.timings
+# column was added. The tables that were not changed since are omitted and will be
+# created by the Database.
+LEGACY_DATABASE = """
+CREATE TABLE users (
+    id CHAR(32) NOT NULL,
+    name VARCHAR NOT NULL,
+    PRIMARY KEY (id),
+    UNIQUE (name)
+);
+CREATE TABLE chats (
+    id CHAR(32) NOT NULL,
+    user_id CHAR(32),
+    name VARCHAR NOT NULL,
+    source_storage VARCHAR NOT NULL,
+    assistant VARCHAR NOT NULL,
+    corpus_name VARCHAR NOT NULL,
+    params VARCHAR NOT NULL,
+    prepared BOOLEAN NOT NULL,
+    created_at DATETIME NOT NULL,
+    PRIMARY KEY (id),
+    FOREIGN KEY(user_id) REFERENCES users (id)
+);
+CREATE TABLE messages (
+    id CHAR(32) NOT NULL,
+    chat_id CHAR(32),
+    content VARCHAR NOT NULL,
+    role VARCHAR(9) NOT NULL,
+    timestamp DATETIME NOT NULL,
+    PRIMARY KEY (id),
+    FOREIGN KEY(chat_id) REFERENCES chats (id)
+);
+INSERT INTO "users" VALUES('7a042b83f1ae46c9a167e5821d426d69','user');
+INSERT INTO "chats" VALUES('b6c923615ca74a5ebd4648bde08c6faa','7a042b83f1ae46c9a167e5821d426d69','chat','S','A','default','{}',0,'2026-10-19 02:55:03.597782');
+INSERT INTO "messages" VALUES('83f923aff626495e82c2565d5284397c','b6c923615ca74a5ebd4648bde08c6faa','hello','USER','2026-10-19 02:55:03.604473');
+"""
+
+
+def test_legacy_database(tmp_path):
+    path = tmp_path / "ragna.db"
+    with sqlite3.connect(path) as connection:
+        connection.executescript(LEGACY_DATABASE)
+
+    database = Database(f"sqlite:///{path}")
+
+    with database.get_session() as session:
+        (chat,) = database.get_chats(session, user="user")
+        assert chat.id == uuid.UUID("b6c923615ca74a5ebd4648bde08c6faa")
+
+        (message,) = chat.messages
+        assert message.content == "hello"
+        assert message.role == MessageRole.USER
+        assert message.timings is None
+
+        message.timings = MessageTimings(retrieve_ms=1.0)
+        database.update_chat(session, user="user", chat=chat)
+
+    with database.get_session() as session:
+        (chat,) = database.get_chats(session, user="user")
+        assert chat.messages[0].timings == MessageTimings(retrieve_ms=1.0)
+
+    # Opening the database again must not try to add the column a second time
+    Database(f"sqlite:///{path}")
@@ -0,0 +1,93 @@
+from prometheus_client.parser import text_string_to_metric_families
+
+from ragna.deploy import Config
+from ragna.deploy import _metrics as metrics
+from tests.deploy.api.utils import upload_documents
+from tests.deploy.utils import TestAssistant, make_api_client
+
+
+def get_sample_value(name, **labels):
+    return metrics.get_registry().get_sample_value(name, labels) or 0.0
+
+
+def test_metrics(tmp_local_root):
+    config = Config(local_root=tmp_local_root, assistants=[TestAssistant], metrics=True)
+    source_storage = config.source_storages[0].display_name()
+    assistant = TestAssistant.display_name()
+
+    document_path = tmp_local_root / "test.txt"
+    document_path.write_text("!\n")
+
+    samples = {
+        "store": (
+            "ragna_source_storage_store_duration_seconds_count",
+            {"source_storage": source_storage},
+        ),
+        "retrieve": (
+            "ragna_source_storage_retrieve_duration_seconds_count",
+            {"source_storage": source_storage},
+        ),
+        "ttft": (
+            "ragna_answer_time_to_first_chunk_seconds_count",
+            {"assistant": assistant},
+        ),
+        "answers": ("ragna_answers_total", {"assistant": assistant}),
+        "request": (
+            "ragna_http_request_duration_seconds_count",
+            {
+                "method": "POST",
+                "route": "/api/chats/{id}/answer",
+                "status_code": "200",
+            },
+        ),
+        "database": ("ragna_database_query_duration_seconds_count", {}),
+    }
+
+    with make_api_client(config=config, ignore_unavailable_components=False) as client:
+        before = {
+            key: get_sample_value(name, **labels)
+            for key, (name, labels) in samples.items()
+        }
+
+        document = upload_documents(client=client, document_paths=[document_path])[0]
+        chat = (
+            client.post(
+                "/api/chats",
+                json={
+                    "name": "test-chat",
+                    "input": [document["id"]],
+                    "source_storage": source_storage,
+                    "assistant": assistant,
+                },
+            )
+            .raise_for_status()
+            .json()
+        )
+        client.post(f"/api/chats/{chat['id']}/prepare").raise_for_status()
+        client.post(
+            f"/api/chats/{chat['id']}/answer", json={"prompt": "?"}
+        ).raise_for_status()
+
+        response = client.get("/metrics").raise_for_status()
+
+    after = {
+        key: get_sample_value(name, **labels) for key, (name, labels) in samples.items()
+    }
+    for key in ["store", "retrieve", "ttft", "answers", "request"]:
+        assert after[key] == before[key] + 1, key
+    assert after["database"] > before["database"]
+
+    assert response.headers["content-type"].startswith("text/plain")
+    families = {
+        family.name: family for family in text_string_to_metric_families(response.text)
+    }
+    assert families["ragna_active_answer_streams"].samples[0].value == 0
+    assert families["ragna_threadpool_max_threads"].samples[0].value > 0
+
+
+def test_metrics_disabled(tmp_local_root):
+    config = Config(local_root=tmp_local_root)
+
+    with make_api_client(config=config, ignore_unavailable_components=False) as client:
+        assert not metrics.is_enabled()
+        assert client.get("/metrics").status_code == 404
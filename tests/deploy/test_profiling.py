@@ -0,0 +1,103 @@
+import json
+import tracemalloc
+
+import pytest
+from fastapi import status
+
+from ragna._utils import default_user
+from ragna.deploy import Config
+from tests.deploy.utils import make_api_client
+
+pytest.importorskip("pyinstrument")
+
+
+@pytest.fixture
+def config(tmp_local_root):
+    return Config(
+        local_root=tmp_local_root, profiling=True, admin_users=[default_user()]
+    )
+
+
+@pytest.mark.parametrize(
+    ("format", "suffix"), [("html", ".html"), ("speedscope", ".speedscope.json")]
+)
+@pytest.mark.parametrize("trigger", ["header", "query"])
+def test_profile_request(config, format, suffix, trigger):
+    kwargs = (
+        {"headers": {"X-Ragna-Profile": format}}
+        if trigger == "header"
+        else {"params": {"ragna_profile": format}}
+    )
+    with make_api_client(config=config, ignore_unavailable_components=False) as client:
+        response = client.get("/api/components", **kwargs).raise_for_status()
+
+    name = response.headers["X-Ragna-Profile-File"]
+    assert name.endswith(suffix)
+
+    path = config.profiling_dir / name
+    assert path.is_file()
+    if format == "speedscope":
+        assert json.loads(path.read_text())["$schema"].startswith(
+            "https://www.speedscope.app"
+        )
+
+
+def test_profile_request_non_admin(config):
+    config.admin_users = []
+    with make_api_client(config=config, ignore_unavailable_components=False) as client:
+        response = client.get("/api/components", headers={"X-Ragna-Profile": "html"})
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    assert not config.profiling_dir.exists()
+
+
+def test_profiling_disabled(tmp_local_root):
+    config = Config(local_root=tmp_local_root, admin_users=[default_user()])
+    with make_api_client(config=config, ignore_unavailable_components=False) as client:
+        response = client.get(
+            "/api/components", headers={"X-Ragna-Profile": "html"}
+        ).raise_for_status()
+        assert "X-Ragna-Profile-File" not in response.headers
+
+        assert (
+            client.post("/debug/tracemalloc").status_code == status.HTTP_404_NOT_FOUND
+        )
+
+
+def test_tracemalloc(config):
+    assert not tracemalloc.is_tracing()
+
+    with make_api_client(config=config, ignore_unavailable_components=False) as client:
+        try:
+            diff = client.post("/debug/tracemalloc").raise_for_status().json()
+            assert diff["started"]
+            assert tracemalloc.is_tracing()
+
+            leak = [object() for _ in range(10_000)]  # noqa: F841
+
+            diff = (
+                client.post("/debug/tracemalloc", params={"limit": 5})
+                .raise_for_status()
+                .json()
+            )
+            assert not diff["started"]
+            assert diff["total_size_diff"] > 0
+            assert len(diff["statistics"]) == 5
+            assert any(
+                __file__ in line
+                for statistic in diff["statistics"]
+                for line in statistic["traceback"]
+            )
+        finally:
+            client.delete("/debug/tracemalloc").raise_for_status()
+
+    assert not tracemalloc.is_tracing()
+
+
+def test_tracemalloc_non_admin(config):
+    config.admin_users = []
+    with make_api_client(config=config, ignore_unavailable_components=False) as client:
+        response = client.post("/debug/tracemalloc")
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    assert not tracemalloc.is_tracing()
@@ -0,0 +1,90 @@
+import threading
+import time
+
+from fastapi import status
+
+from ragna.assistants import RagnaDemoAssistant
+from ragna.deploy import Config
+from ragna.source_storages import RagnaDemoSourceStorage
+from tests.deploy.utils import make_api_client
+
+_WARMUP_EVENT = threading.Event()
+
+
+class SlowWarmupAssistant(RagnaDemoAssistant):
+    def warmup(self):
+        if not _WARMUP_EVENT.wait(timeout=10):
+            raise TimeoutError
+
+
+class FailingWarmupSourceStorage(RagnaDemoSourceStorage):
+    async def warmup(self):
+        raise RuntimeError("Warmup failed!")
+
+
+class ShutdownAssistant(RagnaDemoAssistant):
+    shut_down = False
+
+    def shutdown(self):
+        type(self).shut_down = True
+
+
+class FailingShutdownSourceStorage(RagnaDemoSourceStorage):
+    async def shutdown(self):
+        raise RuntimeError("Shutdown failed!")
+
+
+def test_ready(tmp_local_root):
+    config = Config(
+        local_root=tmp_local_root,
+        source_storages=[FailingWarmupSourceStorage],
+        assistants=[SlowWarmupAssistant],
+    )
+    source_storage = FailingWarmupSourceStorage.display_name()
+    assistant = SlowWarmupAssistant.display_name()
+
+    _WARMUP_EVENT.clear()
+    with make_api_client(config=config, ignore_unavailable_components=False) as client:
+        try:
+            response = client.get("/ready")
+            assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+            readiness = response.json()
+            assert not readiness["ready"]
+            assert readiness["components"][assistant]["status"] == "pending"
+        finally:
+            _WARMUP_EVENT.set()
+
+        for _ in range(100):
+            response = client.get("/ready")
+            if response.status_code == status.HTTP_200_OK:
+                break
+            time.sleep(0.05)
+        else:
+            raise AssertionError("Components did not finish warming up")
+
+    readiness = response.json()
+    assert readiness["ready"]
+
+    components = readiness["components"]
+    assert components[assistant]["status"] == "ready"
+    assert components[assistant]["warmup_ms"] > 0
+    assert components[assistant]["error"] is None
+
+    assert components[source_storage]["status"] == "failed"
+    assert "Warmup failed!" in components[source_storage]["error"]
+
+
+def test_shutdown(tmp_local_root, caplog):
+    config = Config(
+        local_root=tmp_local_root,
+        source_storages=[FailingShutdownSourceStorage],
+        assistants=[ShutdownAssistant],
+    )
+
+    ShutdownAssistant.shut_down = False
+    with make_api_client(config=config, ignore_unavailable_components=False):
+        assert not ShutdownAssistant.shut_down
+
+    # A failing component must not keep the others from shutting down.
+    assert ShutdownAssistant.shut_down
+    assert "Shutdown failed!" in caplog.text
@@ -0,0 +1,115 @@
+import json
+
+import httpx
+import pytest
+
+from ragna import _tracing
+from ragna.assistants._http_api import HttpApiCaller
+from ragna.deploy import Config
+from ragna.deploy import _core as deploy_core
+from tests.deploy.api.utils import upload_documents
+from tests.deploy.utils import TestAssistant, make_api_client
+
+pytest.importorskip("opentelemetry.sdk.trace")
+
+
+@pytest.fixture
+def setup_tracing_spy(mocker):
+    spy = mocker.spy(deploy_core, "setup_tracing")
+    try:
+        yield spy
+    finally:
+        if spy.spy_return is not None:
+            spy.spy_return.shutdown()
+        _tracing.set_tracer_provider(None)
+
+
+def test_file_export(tmp_local_root, setup_tracing_spy):
+    config = Config(
+        local_root=tmp_local_root, assistants=[TestAssistant], tracing="file"
+    )
+    source_storage = config.source_storages[0].display_name()
+    assistant = TestAssistant.display_name()
+
+    document_path = tmp_local_root / "test.txt"
+    document_path.write_text("!\n")
+
+    trace_id = "0af7651916cd43dd8448eb211c80319c"
+    with make_api_client(config=config, ignore_unavailable_components=False) as client:
+        document = upload_documents(client=client, document_paths=[document_path])[0]
+        chat = (
+            client.post(
+                "/api/chats",
+                json={
+                    "name": "test-chat",
+                    "input": [document["id"]],
+                    "source_storage": source_storage,
+                    "assistant": assistant,
+                },
+            )
+            .raise_for_status()
+            .json()
+        )
+        client.post(f"/api/chats/{chat['id']}/prepare").raise_for_status()
+        client.post(
+            f"/api/chats/{chat['id']}/answer",
+            json={"prompt": "?"},
+            headers={"traceparent": f"00-{trace_id}-b7ad6b7169203331-01"},
+        ).raise_for_status()
+
+    setup_tracing_spy.spy_return.force_flush()
+
+    with open(config.tracing_file) as file:
+        spans = [json.loads(line) for line in file]
+    spans = {
+        span["name"]: span
+        for span in spans
+        if span["context"]["trace_id"] == f"0x{trace_id}"
+    }
+
+    assert {
+        "HTTP POST /api/chats/{id}/answer",
+        "Engine.answer_stream",
+        "Chat.answer",
+        "SourceStorage.retrieve",
+        "Assistant.answer",
+        "Database.update_chat",
+    } <= spans.keys()
+
+    retrieve = spans["SourceStorage.retrieve"]["attributes"]
+    assert retrieve["ragna.source_storage"] == source_storage
+    assert retrieve["ragna.corpus_name"] == "default"
+    assert retrieve["ragna.num_sources"] == 1
+
+    assert spans["Assistant.answer"]["attributes"]["ragna.assistant"] == assistant
+    assert (
+        spans["HTTP POST /api/chats/{id}/answer"]["attributes"][
+            "ragna.http_status_code"
+        ]
+        == 200
+    )
+
+
+async def test_http_api_caller_propagation():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={})
+
+    from opentelemetry.sdk.trace import TracerProvider
+
+    tracer_provider = TracerProvider()
+    _tracing.set_tracer_provider(tracer_provider)
+    try:
+        async with (
+            httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client,
+            HttpApiCaller(client)("GET", "http://ragna.test") as stream,
+        ):
+            async for _ in stream:
+                pass
+    finally:
+        _tracing.set_tracer_provider(None)
+        tracer_provider.shutdown()
+
+    assert "traceparent" in requests[0].headers
@@ -1,6 +1,13 @@
+import array
+import asyncio
+import datetime
 import random
 import string
+import threading
+import uuid
 from collections import defaultdict
+from collections.abc import Callable
+from typing import Any
 
 import pytest
 
@@ -9,10 +16,22 @@ from ragna.core import (
     LocalDocument,
     MetadataFilter,
     MetadataOperator,
+    Page,
     PlainTextDocumentHandler,
     RagnaException,
 )
-from ragna.source_storages import Chroma, LanceDB, Qdrant, RagnaDemoSourceStorage
+from ragna.source_storages import (
+    Chroma,
+    LanceDB,
+    Qdrant,
+    RagnaDemoSourceStorage,
+    _vector_database,
+)
+from ragna.source_storages._vector_database import (
+    _INGEST_PROCESS_POOL,
+    RetrievalPlan,
+)
+from tests.utils import skip_on_windows
 
 SOURCE_STORAGES = [Chroma, LanceDB, Qdrant, RagnaDemoSourceStorage]
 
@@ -104,6 +123,34 @@ metadata_filters = pytest.mark.parametrize(
 )
 
 
+@pytest.fixture
+def make_documents(tmp_local_root):
+    document_root = tmp_local_root / "documents"
+    document_root.mkdir()
+
+    def make_documents(
+        num_documents: int = 1,
+        *,
+        metadata: Callable[[int], dict[str, Any]] = lambda idx: {},
+        repeat: int = 1,
+    ) -> list[LocalDocument]:
+        # Document idx is named document{idx}.txt and holds the secret number idx * 11.
+        documents = []
+        for idx in range(num_documents):
+            path = document_root / f"document{idx}.txt"
+            path.write_text(
+                f"The secret number of document {idx} is {idx * 11}!\n" * repeat
+            )
+            documents.append(LocalDocument.from_path(path, metadata=metadata(idx)))
+        return documents
+
+    return make_documents
+
+
+def document_names(sources):
+    return sorted(source.document_name for source in sources)
+
+
 @metadata_filters
 @pytest.mark.parametrize(
     "source_storage_cls", set(SOURCE_STORAGES) - {RagnaDemoSourceStorage}
@@ -174,6 +221,79 @@ async def test_smoke(
     )
 
 
+@metadata_filters
+async def test_lancedb_metadata_fields_after_creation(
+    make_documents, metadata_filter, expected_idcs
+):
+    documents = make_documents(
+        len(METADATAS), metadata=lambda idx: METADATAS[idx] | {"idx": idx}
+    )
+
+    source_storage = LanceDB()
+    corpus_name = "default"
+    # Storing the documents one by one means that the fields of the first document
+    # are stored as columns, while the other fields are stored in the metadata
+    # column.
+    for idx, document in enumerate(documents):
+        await as_awaitable(source_storage.store, corpus_name, [document])
+        if idx == 0:
+            schema = source_storage._get_table(corpus_name).schema
+
+    assert source_storage._get_table(corpus_name).schema == schema
+    metadata = await as_awaitable(source_storage.list_metadata, corpus_name)
+    assert metadata[corpus_name]["other_key"] == ("str", ["other_value", "value"])
+
+    sources = await as_awaitable(
+        source_storage.retrieve,
+        corpus_name=corpus_name,
+        metadata_filter=metadata_filter,
+        prompt="What is the secret number?",
+        num_tokens=4096,
+    )
+
+    assert document_names(sources) == [documents[idx].name for idx in expected_idcs]
+
+
+@pytest.mark.parametrize(
+    ("metadata_filter", "expected_idcs"),
+    [
+        pytest.param(MetadataFilter.gt("number", 1), [2, 3], id="gt"),
+        pytest.param(MetadataFilter.le("number", 1.5), [1], id="le-float"),
+        pytest.param(MetadataFilter.eq("flag", True), [2], id="eq-bool"),
+        pytest.param(MetadataFilter.eq("text", 'it\'s "3"'), [3], id="eq-escaped"),
+        pytest.param(MetadataFilter.in_("number", [1, 3]), [1, 3], id="in"),
+        pytest.param(MetadataFilter.not_in("number", [1, 3]), [2], id="not_in"),
+    ],
+)
+async def test_lancedb_metadata_column_types(
+    make_documents, metadata_filter, expected_idcs
+):
+    documents = make_documents(
+        4,
+        # The first document creates the corpus without any metadata columns.
+        metadata=lambda idx: (
+            {"number": idx, "flag": idx % 2 == 0, "text": f'it\'s "{idx}"'}
+            if idx
+            else {}
+        ),
+    )
+
+    source_storage = LanceDB()
+    corpus_name = "default"
+    for document in documents:
+        await as_awaitable(source_storage.store, corpus_name, [document])
+
+    sources = await as_awaitable(
+        source_storage.retrieve,
+        corpus_name=corpus_name,
+        metadata_filter=metadata_filter,
+        prompt="What is the secret number?",
+        num_tokens=4096,
+    )
+
+    assert document_names(sources) == [documents[idx].name for idx in expected_idcs]
+
+
 @pytest.mark.parametrize(
     ("metadata_filter", "expected_idcs"),
     [
@@ -361,3 +481,552 @@ async def test_list_metadata(tmp_local_root, cls):
     }
 
     assert actual_metadata == expected_metadata
+
+
+@pytest.mark.parametrize(
+    "source_storage_cls", set(SOURCE_STORAGES) - {RagnaDemoSourceStorage}
+)
+@pytest.mark.asyncio
+async def test_retrieval_plans(make_documents, mocker, source_storage_cls):
+    documents = make_documents(10, metadata=lambda idx: {"idx": idx})
+
+    source_storage = source_storage_cls()
+    corpus_name = "default"
+    await as_awaitable(source_storage.store, corpus_name, documents)
+
+    plan_retrieval = mocker.spy(source_storage, "_plan_retrieval")
+
+    async def retrieve(max_candidates):
+        mocker.patch.object(
+            source_storage, "_EXACT_SEARCH_MAX_CANDIDATES", max_candidates
+        )
+        return await as_awaitable(
+            source_storage.retrieve,
+            corpus_name=corpus_name,
+            metadata_filter=MetadataFilter.in_("idx", [2, 3, 5, 7]),
+            prompt="What is the secret number?",
+            num_tokens=4096,
+        )
+
+    exact_sources = await retrieve(len(documents))
+    index_sources = await retrieve(0)
+
+    assert plan_retrieval.spy_return_list == [
+        RetrievalPlan.EXACT,
+        RetrievalPlan.INDEX,
+    ]
+    assert (
+        document_names(exact_sources)
+        == document_names(index_sources)
+        == [documents[idx].name for idx in [2, 3, 5, 7]]
+    )
+
+
+@pytest.mark.parametrize("source_storage_cls", [Chroma, LanceDB, Qdrant])
+async def test_exact_search_too_many_candidates(
+    make_documents, mocker, source_storage_cls
+):
+    documents = make_documents(10)
+
+    source_storage = source_storage_cls()
+    await as_awaitable(source_storage.store, "default", documents)
+
+    # Simulate that the number of candidates was underestimated, e.g. since it is
+    # outdated. The exact search must not silently drop the other candidates.
+    mocker.patch.object(source_storage, "_EXACT_SEARCH_MAX_CANDIDATES", 4)
+    mocker.patch.object(
+        source_storage, "_plan_retrieval", return_value=RetrievalPlan.EXACT
+    )
+
+    sources = await as_awaitable(
+        source_storage.retrieve,
+        "default",
+        None,
+        "What is the secret number?",
+        num_tokens=4096,
+    )
+    assert {source.document_name for source in sources} == {
+        document.name for document in documents
+    }
+
+
+@pytest.mark.parametrize("max_candidates", [0, 1_000])
+@pytest.mark.parametrize("source_storage_cls", SOURCE_STORAGES)
+@pytest.mark.asyncio
+async def test_retrieve_many(
+    make_documents, mocker, source_storage_cls, max_candidates
+):
+    documents = make_documents(
+        len(METADATAS), metadata=lambda idx: METADATAS[idx] | {"idx": idx}
+    )
+
+    source_storage = source_storage_cls()
+    mocker.patch.object(
+        source_storage, "_EXACT_SEARCH_MAX_CANDIDATES", max_candidates, create=True
+    )
+    corpus_name = "default"
+    await as_awaitable(source_storage.store, corpus_name, documents)
+
+    metadata_filters = [
+        None,
+        MetadataFilter.eq("key", "value"),
+        None,
+        MetadataFilter.in_("key", ["foo", "bar"]),
+        MetadataFilter.eq("key", "value"),
+    ]
+    prompts = [f"What is the secret number {idx}?" for idx in range(5)]
+    # The documents only differ in their secret number. Thus, many of them are equally
+    # similar to the prompts and the order of those is arbitrary. By retrieving all
+    # candidates, we only compare which sources are retrieved.
+    retrieve_params = (
+        {} if source_storage_cls is RagnaDemoSourceStorage else {"num_tokens": 4096}
+    )
+
+    expected = [
+        await as_awaitable(
+            source_storage.retrieve,
+            corpus_name,
+            metadata_filter,
+            prompt,
+            **retrieve_params,
+        )
+        for metadata_filter, prompt in zip(metadata_filters, prompts, strict=True)
+    ]
+    actual = await as_awaitable(
+        source_storage.retrieve_many,
+        corpus_name,
+        metadata_filters,
+        prompts,
+        **retrieve_params,
+    )
+
+    assert [{source.id for source in sources} for sources in actual] == [
+        {source.id for source in sources} for sources in expected
+    ]
+
+    with pytest.raises(RagnaException, match="does not match"):
+        await as_awaitable(
+            source_storage.retrieve_many, corpus_name, metadata_filters, prompts[:-1]
+        )
+
+
+@pytest.mark.asyncio
+async def test_shared_query_embedding(make_documents, mocker):
+    (document,) = make_documents()
+
+    source_storages = [Chroma(), LanceDB(), Qdrant()]
+    for source_storage in source_storages:
+        await as_awaitable(source_storage.store, "default", [document])
+
+    embedding_function_types = {
+        type(source_storage._embedding_function) for source_storage in source_storages
+    }
+    assert len(embedding_function_types) == 1
+    embed = mocker.spy(embedding_function_types.pop(), "__call__")
+
+    prompt = f"What is the secret number? {uuid.uuid4()}"
+    await asyncio.gather(
+        *[
+            as_awaitable(source_storage.retrieve, "default", None, prompt)
+            for source_storage in source_storages
+        ]
+    )
+
+    assert embed.call_count == 1
+
+
+@pytest.mark.parametrize("source_storage_cls", [Chroma, LanceDB, Qdrant])
+async def test_corpus_cache(make_documents, mocker, source_storage_cls):
+    documents = make_documents(2)
+
+    source_storage = source_storage_cls()
+    await as_awaitable(source_storage.store, "default", documents[:1])
+
+    prompt = "What is the secret number?"
+    await as_awaitable(source_storage.retrieve, "default", None, prompt)
+
+    list_corpuses = mocker.spy(source_storage, "list_corpuses")
+    await as_awaitable(source_storage.retrieve, "default", None, prompt)
+    list_corpuses.assert_not_called()
+
+    # Storing invalidates the cached number of chunks. Otherwise, the new chunks
+    # would not be found.
+    await as_awaitable(source_storage.store, "default", documents[1:])
+    sources = await as_awaitable(source_storage.retrieve, "default", None, prompt)
+    assert {source.document_name for source in sources} == {
+        document.name for document in documents
+    }
+
+    # Missing corpuses are not cached.
+    with pytest.raises(RagnaException, match="Corpus does not exist"):
+        await as_awaitable(source_storage.retrieve, "other", None, prompt)
+    await as_awaitable(source_storage.store, "other", documents)
+    assert await as_awaitable(source_storage.retrieve, "other", None, prompt)
+
+
+def test_corpus_cache_ttl(mocker):
+    monotonic = mocker.patch(
+        "ragna.source_storages._vector_database.time.monotonic", return_value=0.0
+    )
+    cache = _vector_database._CorpusCache(ttl=10.0)
+
+    cache.set_handle("default", "handle")
+    cache.set_count("default", None, 3)
+    assert cache.get_handle("default") == "handle"
+    assert cache.get_count("default", None) == 3
+
+    cache.invalidate("default")
+    assert cache.get_handle("default") == "handle"
+    assert cache.get_count("default", None) is None
+
+    cache.set_count("default", None, 3)
+    monotonic.return_value = 10.0
+    assert cache.get_handle("default") is None
+    assert cache.get_count("default", None) is None
+
+    cache = _vector_database._CorpusCache(ttl=0)
+    cache.set_handle("default", "handle")
+    assert cache.get_handle("default") is None
+
+
+async def test_qdrant_embeds_prompts_off_the_event_loop(make_documents, mocker):
+    source_storage = Qdrant()
+    await source_storage.store("default", make_documents())
+
+    embed_prompts = source_storage._embed_prompts
+    threads = []
+
+    def spy(prompts):
+        threads.append(threading.current_thread())
+        return embed_prompts(prompts)
+
+    mocker.patch.object(source_storage, "_embed_prompts", side_effect=spy)
+
+    assert await source_storage.retrieve("default", None, "What is the number?")
+    assert threads
+    assert threading.main_thread() not in threads
+
+
+@pytest.mark.parametrize("source_storage_cls", SOURCE_STORAGES)
+async def test_warmup(tmp_local_root, mocker, source_storage_cls):
+    source_storage = source_storage_cls()
+    embedding_function = getattr(source_storage, "_embedding_function", None)
+    if embedding_function is not None:
+        embed = mocker.spy(type(embedding_function), "__call__")
+
+    await as_awaitable(source_storage.warmup)
+
+    if embedding_function is not None:
+        assert embed.call_count == 1
+
+
+@pytest.mark.parametrize("source_storage_cls", [Chroma, LanceDB, Qdrant])
+async def test_chunk_cache(make_documents, mocker, source_storage_cls):
+    (document,) = make_documents(repeat=100)
+
+    source_storage = source_storage_cls()
+    chunk_pages = mocker.spy(_vector_database, "_chunk_pages")
+
+    # The chunks are cached by the contents of the document rather than its ID.
+    for corpus_name in ["first", "second"]:
+        await as_awaitable(
+            source_storage.store,
+            corpus_name,
+            [LocalDocument.from_path(document.path)],
+            chunk_size=50,
+            chunk_overlap=10,
+        )
+    assert chunk_pages.call_count == 1
+
+    await as_awaitable(
+        source_storage.store,
+        "third",
+        [document],
+        chunk_size=100,
+        chunk_overlap=10,
+    )
+    assert chunk_pages.call_count == 2
+
+    for corpus_name in ["first", "second"]:
+        sources = await as_awaitable(
+            source_storage.retrieve, corpus_name, None, "What is the secret number?"
+        )
+        assert sources
+        assert all("is 0!" in source.content for source in sources)
+
+
+@pytest.mark.parametrize("source_storage_cls", [Chroma, LanceDB, Qdrant])
+async def test_preprocess(make_documents, mocker, source_storage_cls):
+    documents = make_documents(repeat=100)
+
+    source_storage = source_storage_cls()
+    chunk_pages = mocker.spy(_vector_database, "_chunk_pages")
+
+    await as_awaitable(source_storage.preprocess, documents)
+    assert chunk_pages.call_count == 1
+
+    # Storing with the default parameters reuses the chunks of the preprocessing.
+    await as_awaitable(source_storage.store, "corpus", documents)
+    assert chunk_pages.call_count == 1
+
+
+def test_chunk_batch():
+    documents = [
+        LocalDocument(name=f"document{idx}.txt", metadata={"idx": idx})
+        for idx in range(2)
+    ]
+    chunks = [
+        _vector_database.DocumentChunks(
+            texts=["foo", "bar"],
+            num_tokens=array.array("q", [1, 1]),
+            page_starts=array.array("q", [1, 2]),
+            page_stops=array.array("q", [2, 5]),
+        ),
+        _vector_database.DocumentChunks(
+            texts=["baz", "qux"],
+            num_tokens=array.array("q", [1, 1]),
+            page_starts=array.array("q", [_vector_database._NO_PAGE, 3]),
+            page_stops=array.array("q", [_vector_database._NO_PAGE, 3]),
+        ),
+    ]
+    batch = _vector_database.ChunkBatch()
+    batch.extend(documents[0], chunks[0], [[0.0], [1.0]], start=0, stop=2)
+    batch.extend(documents[1], chunks[1], [[2.0], [3.0]], start=0, stop=1)
+    batch.extend(documents[1], chunks[1], [[2.0], [3.0]], start=1, stop=2)
+
+    assert len(batch) == 4
+    # Every document is only referenced once.
+    assert batch.documents == documents
+    assert list(batch.document_indices) == [0, 0, 1, 1]
+    assert batch.texts == ["foo", "bar", "baz", "qux"]
+    assert batch.embeddings == [[0.0], [1.0], [2.0], [3.0]]
+    assert batch.page_numbers() == ["1, 2", "2-5", "", "3"]
+    assert [metadata["idx"] for metadata in batch.metadatas()] == [0, 0, 1, 1]
+    assert [metadata["document_name"] for metadata in batch.metadatas()] == [
+        "document0.txt",
+        "document0.txt",
+        "document1.txt",
+        "document1.txt",
+    ]
+
+
+def test_chunk_pages():
+    source_storage = Chroma()
+    text = "The secret number is 42!\n"
+    pages = [Page(text=text, number=number) for number in [1, 2, 3]] + [Page(text=text)]
+    num_tokens = len(source_storage._tokenizer.encode(text))
+
+    # Each chunk spans exactly two pages.
+    chunks = source_storage._chunk_pages(
+        pages, chunk_size=2 * num_tokens, chunk_overlap=0
+    )
+
+    assert list(chunks.num_tokens) == [2 * num_tokens] * 2
+    assert list(chunks.page_starts) == [1, 3]
+    assert list(chunks.page_stops) == [2, 3]
+
+
+@pytest.mark.parametrize("limit", ["chunks", "size"])
+@pytest.mark.parametrize("source_storage_cls", [Chroma, LanceDB, Qdrant])
+async def test_store_in_batches(make_documents, monkeypatch, source_storage_cls, limit):
+    if limit == "chunks":
+        monkeypatch.setattr(source_storage_cls, "_STORE_BATCH_MAX_CHUNKS", 3)
+    else:
+        monkeypatch.setenv("RAGNA_STORE_BATCH_MAX_SIZE", "1")
+
+    documents = make_documents(3, repeat=20)
+
+    source_storage = source_storage_cls()
+
+    batch_sizes = []
+    ingest_batches = source_storage._ingest_batches
+
+    def spy(*args, **kwargs):
+        for batch in ingest_batches(*args, **kwargs):
+            batch_sizes.append(len(batch))
+            yield batch
+
+    monkeypatch.setattr(source_storage, "_ingest_batches", spy)
+
+    await as_awaitable(
+        source_storage.store, "default", documents, chunk_size=50, chunk_overlap=10
+    )
+
+    assert len(batch_sizes) > 1
+    assert max(batch_sizes) == (3 if limit == "chunks" else 1)
+
+    for idx, document in enumerate(documents):
+        sources = await as_awaitable(
+            source_storage.retrieve,
+            "default",
+            MetadataFilter.eq("document_name", document.name),
+            "What is the secret number?",
+        )
+        assert sources
+        assert all(f"is {idx * 11}!" in source.content for source in sources)
+
+
+@pytest.mark.parametrize(
+    ("source_storage_cls", "vector_compression"),
+    [
+        (LanceDB, "none"),
+        (LanceDB, "float16"),
+        (LanceDB, "pq"),
+        (Qdrant, "none"),
+        (Qdrant, "float16"),
+        (Qdrant, "scalar"),
+        (Qdrant, "binary"),
+    ],
+)
+# The local mode of Qdrant warns about the quantization search parameters that we pass.
+@pytest.mark.filterwarnings("ignore:Local mode performs exact:UserWarning")
+async def test_vector_compression(
+    make_documents, monkeypatch, mocker, source_storage_cls, vector_compression
+):
+    # Make sure the retrieval goes through the index rather than an exact search.
+    monkeypatch.setattr(source_storage_cls, "_EXACT_SEARCH_MAX_CANDIDATES", 0)
+
+    documents = make_documents(3, repeat=200)
+
+    source_storage = source_storage_cls()
+    if source_storage_cls is Qdrant and vector_compression in {"scalar", "binary"}:
+        # The local mode of Qdrant drops the quantization config of collections. Thus,
+        # we put back the one that the collection was created with.
+        create_collection = mocker.spy(source_storage._client, "create_collection")
+        get_collection = source_storage._client.get_collection
+
+        async def get_collection_with_quantization(collection_name):
+            info = await get_collection(collection_name)
+            info.config.quantization_config = create_collection.call_args.kwargs[
+                "quantization_config"
+            ]
+            return info
+
+        mocker.patch.object(
+            source_storage._client, "get_collection", get_collection_with_quantization
+        )
+
+    await as_awaitable(
+        source_storage.store,
+        "default",
+        documents,
+        chunk_size=20,
+        chunk_overlap=0,
+        vector_compression=vector_compression,
+    )
+    # The choice is only applied when the corpus is created.
+    await as_awaitable(
+        source_storage.store, "default", documents, chunk_size=20, chunk_overlap=0
+    )
+
+    if source_storage_cls is LanceDB:
+        table = source_storage._get_table("default")
+        assert source_storage._get_vector_compression(table) == vector_compression
+        assert any(index.index_type == "IvfPq" for index in table.list_indices()) == (
+            vector_compression == "pq"
+        )
+    else:
+        assert (
+            await source_storage._get_vector_compression("default")
+        ) == vector_compression
+
+    sources = await as_awaitable(
+        source_storage.retrieve,
+        "default",
+        MetadataFilter.eq("document_name", "document2.txt"),
+        "What is the secret number?",
+        chunk_size=20,
+    )
+    assert sources
+    assert all("is 22!" in source.content for source in sources)
+
+
+@pytest.mark.parametrize(
+    "threshold", ["_MAINTENANCE_MAX_VERSIONS", "_MAINTENANCE_MAX_SMALL_FRAGMENTS"]
+)
+async def test_lancedb_maintenance(make_documents, monkeypatch, mocker, threshold):
+    monkeypatch.setattr(LanceDB, threshold, 2)
+    monkeypatch.setattr(
+        LanceDB, "_MAINTENANCE_CLEANUP_OLDER_THAN", datetime.timedelta(0)
+    )
+
+    source_storage = LanceDB()
+    optimize_table = mocker.spy(source_storage, "_optimize_table")
+    invalidate = mocker.spy(source_storage._corpus_cache, "invalidate")
+
+    for document in make_documents(4):
+        await as_awaitable(source_storage.store, "default", [document])
+        # Wait for the scheduled maintenance to finish.
+        source_storage._maintenance.submit(lambda: None).result()
+
+    optimize_table.assert_called()
+    # The handle is opened again after optimizing.
+    invalidate.assert_any_call("default", handle=True)
+    table = source_storage._get_table("default")
+    assert table.stats()["fragment_stats"]["num_fragments"] < 4
+    assert table.count_rows() == 4
+
+    sources = await as_awaitable(
+        source_storage.retrieve,
+        "default",
+        MetadataFilter.eq("document_name", "document3.txt"),
+        "What is the secret number?",
+    )
+    assert sources
+    assert all("33" in source.content for source in sources)
+
+
+async def test_lancedb_shutdown(make_documents, monkeypatch, mocker):
+    monkeypatch.setattr(LanceDB, "_MAINTENANCE_MAX_VERSIONS", 0)
+
+    source_storage = LanceDB()
+    run_maintenance = mocker.spy(source_storage, "_run_maintenance")
+
+    await as_awaitable(source_storage.shutdown)
+    with pytest.raises(RuntimeError, match="after shutdown"):
+        source_storage._maintenance.submit(lambda: None)
+
+    # Storing documents still works, but does not schedule any maintenance.
+    await as_awaitable(source_storage.store, "default", make_documents())
+    run_maintenance.assert_not_called()
+
+
+@pytest.fixture
+def ingest_process_pool(monkeypatch):
+    monkeypatch.setenv("RAGNA_INGEST_PROCESSES", "2")
+    try:
+        yield _INGEST_PROCESS_POOL
+    finally:
+        monkeypatch.delenv("RAGNA_INGEST_PROCESSES")
+        _INGEST_PROCESS_POOL.executor()
+
+
+@skip_on_windows
+@pytest.mark.parametrize("embed", [False, True])
+@pytest.mark.parametrize("source_storage_cls", [Chroma, LanceDB, Qdrant])
+async def test_store_in_process_pool(
+    make_documents, monkeypatch, ingest_process_pool, source_storage_cls, embed
+):
+    if embed:
+        monkeypatch.setenv("RAGNA_INGEST_EMBED_IN_PROCESSES", "1")
+
+    documents = make_documents(4, repeat=20)
+
+    source_storage = source_storage_cls()
+    ingested = list(source_storage._ingest(documents, chunk_size=50, chunk_overlap=10))
+    assert ingest_process_pool.executor() is not None
+    assert [document for document, _, _ in ingested] == documents
+    for _, chunks, embeddings in ingested:
+        assert chunks
+        assert len(embeddings) == len(chunks)
+
+    await as_awaitable(source_storage.store, "default", documents)
+
+    sources = await as_awaitable(
+        source_storage.retrieve,
+        "default",
+        MetadataFilter.eq("document_name", "document3.txt"),
+        "What is the secret number?",
+    )
+    assert sources
+    assert all("33" in source.content for source in sources)
@@ -0,0 +1,82 @@
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+import ragna
+
+HEAVY_MODULES = ["fastapi", "panel", "sqlalchemy", "tornado"]
+
+
+def imported_modules(code):
+    script = textwrap.dedent(
+        f"""
+        import sys
+
+        {code}
+
+        print("\\n".join(sys.modules))
+        """
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True
+    )
+    return set(result.stdout.splitlines())
+
+
+@pytest.mark.parametrize(
+    ("code", "unexpected_modules"),
+    [
+        pytest.param(
+            "import ragna",
+            [
+                "ragna.assistants",
+                "ragna.core",
+                "ragna.deploy",
+                "ragna.source_storages",
+                *HEAVY_MODULES,
+            ],
+            id="ragna",
+        ),
+        pytest.param(
+            "from ragna import Rag", ["ragna.deploy", *HEAVY_MODULES], id="Rag"
+        ),
+        pytest.param(
+            "from ragna.assistants import RagnaDemoAssistant",
+            ["ragna.assistants._openai", "ragna.deploy", *HEAVY_MODULES],
+            id="assistant",
+        ),
+        pytest.param(
+            "from ragna.deploy import Config",
+            ["panel", "sqlalchemy", "tornado"],
+            id="Config",
+        ),
+    ],
+)
+def test_lazy_imports(code, unexpected_modules):
+    assert imported_modules(code).isdisjoint(unexpected_modules)
+
+
+@pytest.mark.parametrize(
+    "package",
+    [
+        ragna,
+        pytest.param("assistants", id="ragna.assistants"),
+        pytest.param("deploy", id="ragna.deploy"),
+        pytest.param("source_storages", id="ragna.source_storages"),
+    ],
+)
+def test_public_attributes(package):
+    if isinstance(package, str):
+        package = getattr(ragna, package)
+
+    assert set(package.__all__) <= set(dir(package))
+
+    for name in package.__all__:
+        obj = getattr(package, name)
+        if isinstance(obj, type) and package is not ragna:
+            assert obj.__module__ == package.__name__
+
+    with pytest.raises(AttributeError, match="no attribute 'Unknown'"):
+        package.Unknown  # noqa: B018